@@ -0,0 +1,135 @@
+"""Compara o servidor WSGI síncrono (gunicorn main:app) com o servidor assíncrono
+(async_app.py) sob a mesma carga, usando o fake_rawg.py como upstream.
+
+Cada requisição pede uma página diferente de /api/games, então todas são miss de
+cache e o tempo é dominado pela latência do RAWG (o cenário em que o worker
+síncrono fica bloqueado).
+
+Uso:
+    python compare_async.py --requests 400 --concurrency 100 --latency 0.2
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+# Feeds de notícias gravados: os servidores do benchmark não buscam os RSS de verdade
+NEWS_FIXTURES_DIR = os.path.join(os.path.dirname(BENCH_DIR), "fixtures", "news")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def wait_until_up(url, timeout=20):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.time() < deadline:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def run_load(base_url, total, concurrency, page_offset):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=120)
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.get(f"{base_url}/api/games", params={"page": page_offset + i, "page_size": 20}) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(total)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99)
+    }
+
+
+def start(cmd, env, cwd):
+    return subprocess.Popen(cmd, env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2, help="latência do RAWG falso, em segundos")
+    parser.add_argument("--workers", type=int, default=1, help="workers do gunicorn síncrono")
+    args = parser.parse_args()
+
+    fake_port, sync_port, async_port = 18181, 18182, 18183
+    env = dict(
+        os.environ,
+        RAWG_BASE_URL=f"http://127.0.0.1:{fake_port}/api",
+        RAWG_API_KEY="bench",
+        RATELIMIT_ENABLED="0",
+        CACHE_L2="off",
+        DATA_DIR=tempfile.mkdtemp(prefix="bench-"),
+        PORT=str(async_port),
+        NEWS_FIXTURES=NEWS_FIXTURES_DIR
+    )
+
+    processes = [
+        start([sys.executable, os.path.join(BENCH_DIR, "fake_rawg.py"), "--port", str(fake_port),
+               "--latency", str(args.latency)], env, BENCH_DIR),
+        start(["gunicorn", "-w", str(args.workers), "-b", f"127.0.0.1:{sync_port}", "--timeout", "120", "main:app"], env, SRC_DIR),
+        start([sys.executable, "async_app.py"], env, SRC_DIR)
+    ]
+    try:
+        for port in (sync_port, async_port):
+            asyncio.run(wait_until_up(f"http://127.0.0.1:{port}/api/health"))
+
+        results = {
+            f"sync (gunicorn -w {args.workers})": asyncio.run(run_load(f"http://127.0.0.1:{sync_port}", args.requests, args.concurrency, 1)),
+            "async (aiohttp, 1 process)": asyncio.run(run_load(f"http://127.0.0.1:{async_port}", args.requests, args.concurrency, 1 + args.requests))
+        }
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, upstream latency {args.latency * 1000:.0f} ms")
+    print(f"{'server':<28}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.1f}"
+              f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Servidor falso da API RAWG para benchmarks locais (sem rede e sem gastar quota).
+
+Responde games, games/{id}, games/{id}/screenshots, genres e platforms. Com
+--fixtures, reproduz respostas gravadas do RAWG:
+
+    games_page_<n>.json      páginas da listagem (os jogos viram o acervo do servidor)
+    game_<id>.json           detalhes de um jogo
+    screenshots_<id>.json    screenshots de um jogo
+    genres.json, platforms.json
+
+O que não estiver gravado é gerado a partir do acervo: a listagem continua além
+dos jogos gravados com cópias de ids novos (para o scroll infinito não acabar) e
+os detalhes de um jogo do acervo são o registro da listagem com descrição e
+estúdios. A busca (`search`) filtra o acervo pelo nome.
+
+Latência, variação (jitter) e erros injetados são configuráveis. Conta as
+chamadas recebidas em /__stats; /__reset zera a contagem.
+
+Uso:
+    python fake_rawg.py --port 18181 --latency 0.2
+    python fake_rawg.py --fixtures ../fixtures/rawg --latency 0.15 --jitter 0.1 --error-rate 0.02
+"""
+import os
+import json
+import glob
+import random
+import argparse
+import asyncio
+from collections import Counter
+
+from aiohttp import web
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(BENCH_DIR), "fixtures", "rawg")
+
+# Ids gerados para jogos além do acervo gravado (não colidem com ids reais do RAWG)
+SYNTHETIC_ID_BASE = 10_000_000
+
+calls = Counter()
+
+
+def make_game(game_id):
+    return {
+        "id": game_id,
+        "slug": f"game-{game_id}",
+        "name": f"Game {game_id}",
+        "released": "2024-05-01",
+        "background_image": f"https://media.rawg.io/media/games/000/{game_id}.jpg",
+        "rating": 4.2,
+        "metacritic": 70 + game_id % 30,
+        "added": 10000 - game_id % 10000,
+        "playtime": 12,
+        "genres": [{"id": 4, "name": "Action", "slug": "action"}],
+        "platforms": [{"platform": {"id": 4, "name": "PC", "slug": "pc"}}],
+        "description_raw": "Lorem ipsum dolor sit amet. " * 40,
+        "developers": [{"id": 1, "name": "Studio"}],
+        "publishers": [{"id": 1, "name": "Publisher"}],
+        "esrb_rating": {"id": 4, "name": "Mature"}
+    }
+
+
+class Fixtures:
+    """Respostas gravadas do RAWG; sem diretório, tudo é gerado por make_game()"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.games = []
+        if directory:
+            for path in sorted(glob.glob(os.path.join(directory, "games_page_*.json")),
+                               key=lambda p: int(p.rsplit("_", 1)[1].split(".")[0])):
+                self.games.extend(self._load(path)["results"])
+        self._by_id = {game["id"]: game for game in self.games}
+
+    def _load(self, path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def recorded(self, name):
+        if not self.directory:
+            return None
+        path = os.path.join(self.directory, name)
+        return self._load(path) if os.path.exists(path) else None
+
+    def listing_game(self, index):
+        """Jogo na posição `index` da listagem; além do acervo, cópias com ids novos"""
+        if not self.games:
+            return make_game(index + 1)
+        game = self.games[index % len(self.games)]
+        if index < len(self.games):
+            return game
+        game_id = SYNTHETIC_ID_BASE + index
+        return dict(game, id=game_id, slug=f"{game['slug']}-{game_id}", name=f"{game['name']} #{index // len(self.games)}")
+
+    def search(self, term):
+        term = term.lower()
+        return [game for game in self.games if term in game["name"].lower()]
+
+    def details(self, game_id):
+        recorded = self.recorded(f"game_{game_id}.json")
+        if recorded is not None:
+            return recorded
+        base = self._by_id.get(game_id)
+        if base is None and self.games and game_id >= SYNTHETIC_ID_BASE:
+            base = self.listing_game(game_id - SYNTHETIC_ID_BASE)
+        if base is None:
+            return make_game(game_id) if not self.games else None
+        return dict(make_game(game_id), **base)
+
+    def screenshots(self, game_id):
+        recorded = self.recorded(f"screenshots_{game_id}.json")
+        if recorded is not None:
+            return recorded
+        return {
+            "count": 6,
+            "results": [{"id": i, "image": f"https://media.rawg.io/media/screenshots/{game_id}/{i}.jpg"} for i in range(6)]
+        }
+
+    def named_list(self, name):
+        recorded = self.recorded(f"{name}.json")
+        if recorded is not None:
+            return recorded
+        return {
+            "count": 20,
+            "results": [{"id": i, "name": f"{name.title()} {i}", "slug": f"{name}-{i}"} for i in range(20)]
+        }
+
+
+def create_app(latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, fixtures_dir=None, seed=None):
+    """`latency` ± `jitter` segundos por resposta; `error_rate` das respostas falha com `error_status`"""
+    fixtures = Fixtures(fixtures_dir)
+    rng = random.Random(seed)
+
+    async def delay():
+        wait = latency + (rng.uniform(-jitter, jitter) if jitter else 0.0)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def failure(name):
+        if error_rate and rng.random() < error_rate:
+            calls[f"{name}:error"] += 1
+            return web.json_response({"error": "injected failure"}, status=error_status)
+        return None
+
+    async def games(request):
+        calls["games"] += 1
+        await delay()
+        error = failure("games")
+        if error is not None:
+            return error
+        page = int(request.query.get("page", 1))
+        page_size = min(int(request.query.get("page_size", 20)), 40)
+        start = (page - 1) * page_size
+        search = request.query.get("search")
+        if search:
+            matches = fixtures.search(search) if fixtures.games else [make_game(start + i + 1) for i in range(page_size)]
+            return web.json_response({
+                "count": len(matches),
+                "next": None,
+                "previous": None,
+                "results": matches[:page_size]
+            })
+        return web.json_response({
+            "count": 100000,
+            "next": "next",
+            "previous": "previous" if page > 1 else None,
+            "results": [fixtures.listing_game(start + i) for i in range(page_size)]
+        })
+
+    async def game_details(request):
+        calls["games/{id}"] += 1
+        await delay()
+        error = failure("games/{id}")
+        if error is not None:
+            return error
+        game = fixtures.details(int(request.match_info["game_id"]))
+        if game is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        return web.json_response(game)
+
+    async def screenshots(request):
+        calls["games/{id}/screenshots"] += 1
+        await delay()
+        error = failure("games/{id}/screenshots")
+        if error is not None:
+            return error
+        return web.json_response(fixtures.screenshots(request.match_info["game_id"]))
+
+    async def named_list(request):
+        name = request.match_info["name"]
+        calls[name] += 1
+        await delay()
+        error = failure(name)
+        if error is not None:
+            return error
+        return web.json_response(fixtures.named_list(name))
+
+    async def stats(request):
+        return web.json_response(dict(calls))
+
+    async def reset(request):
+        calls.clear()
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/api/games", games)
+    app.router.add_get(r"/api/games/{game_id:\d+}", game_details)
+    app.router.add_get(r"/api/games/{game_id:\d+}/screenshots", screenshots)
+    app.router.add_get("/api/{name:genres|platforms}", named_list)
+    app.router.add_get("/__stats", stats)
+    app.router.add_post("/__reset", reset)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=18181)
+    parser.add_argument("--latency", type=float, default=0.2, help="latência de cada resposta, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="variação máxima (±) da latência, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração das respostas que falham (0 a 1)")
+    parser.add_argument("--error-status", type=int, default=503, help="status HTTP das falhas injetadas")
+    parser.add_argument("--fixtures", default=None, nargs="?", const=DEFAULT_FIXTURES,
+                        help=f"diretório com respostas gravadas (sem valor: {DEFAULT_FIXTURES})")
+    parser.add_argument("--seed", type=int, default=None, help="semente do jitter e dos erros, para repetir uma execução")
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, args.error_rate, args.error_status, args.fixtures, args.seed)
+    web.run_app(app, host="127.0.0.1", port=args.port, print=None)
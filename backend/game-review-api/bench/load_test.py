@@ -0,0 +1,298 @@
+"""Teste de carga da API com jornadas de usuário, contra o fake_rawg.py como upstream.
+
+Cada jornada imita um visitante: abre a home, digita uma busca no typeahead
+(uma requisição por tecla), rola a listagem (N páginas de /api/games, seguindo o cursor) e abre
+os detalhes de um jogo da última página vista. As jornadas começam em ritmo
+aberto (chegadas de Poisson a --rate jornadas por segundo, durante --duration
+segundos), então um servidor lento acumula requisições em vez de frear a carga.
+
+Roda uma matriz de cenários (cache frio/quente × classe de worker × número de
+workers, e opcionalmente o async_app.py) e reporta por cenário: vazão, p50/p95/p99
+geral e por etapa, erros e chamadas feitas ao RAWG falso.
+
+    cold  processo novo, diretório de dados vazio e sem warm-up do cache
+    warm  warm-up padrão e uma passada não medida das mesmas jornadas antes da medição
+
+Com --output os resultados vão para um JSON; com --baseline, cada cenário é
+comparado com o mesmo cenário de uma execução anterior.
+
+Uso:
+    python load_test.py --rate 10 --duration 20
+    python load_test.py --workers 1,4 --worker-class sync,gthread --cache cold,warm --async
+    python load_test.py --latency 0.15 --jitter 0.1 --error-rate 0.02 --output after.json --baseline before.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import itertools
+from collections import defaultdict
+
+import aiohttp
+
+from compare_async import BENCH_DIR, SRC_DIR, NEWS_FIXTURES_DIR, percentile, wait_until_up, start
+from fake_rawg import DEFAULT_FIXTURES
+
+# Termos digitados no typeahead (nomes presentes nas fixtures gravadas)
+SEARCH_TERMS = ["grand theft", "witcher", "portal", "tomb raider", "skyrim", "bioshock",
+                "god of war", "payday", "red dead", "elden ring", "astro bot", "civilization"]
+ORDERINGS = ["-added", "-added", "-rating", "-released"]
+STEPS = ("home", "suggest", "scroll", "details")
+SCROLL_PAGE_SIZE = 60
+
+
+class Recorder:
+    """Latência e status de cada requisição, por etapa da jornada"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def get(self, session, base_url, step, path, params=None):
+        started = time.perf_counter()
+        data = None
+        try:
+            async with session.get(base_url + path, params=params) as response:
+                body = await response.read()
+                if response.status >= 500 or response.status == 429:
+                    self.errors[step] += 1
+                elif response.status == 200 and step == "scroll":
+                    data = json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.errors[step] += 1
+        self.latencies[step].append((time.perf_counter() - started) * 1000)
+        return data
+
+    def summary(self, elapsed):
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        requests = len(all_latencies)
+        return {
+            "requests": requests,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": requests / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(all_latencies, 50),
+            "p95_ms": percentile(all_latencies, 95),
+            "p99_ms": percentile(all_latencies, 99),
+            "steps": {
+                step: {
+                    "requests": len(self.latencies[step]),
+                    "errors": self.errors[step],
+                    "p50_ms": percentile(self.latencies[step], 50),
+                    "p95_ms": percentile(self.latencies[step], 95),
+                    "p99_ms": percentile(self.latencies[step], 99)
+                }
+                for step in STEPS if self.latencies[step]
+            }
+        }
+
+
+def plan_journeys(seed, rate, duration, scroll_depth):
+    """Instante de início e roteiro de cada jornada; a mesma semente gera o mesmo plano"""
+    rng = random.Random(seed)
+    journeys = []
+    at = 0.0
+    while True:
+        at += rng.expovariate(rate)
+        if at >= duration:
+            return journeys
+        term = rng.choice(SEARCH_TERMS)
+        journeys.append({
+            "at": at,
+            "keystrokes": [term[:n] for n in range(2, len(term) + 1)],
+            "ordering": rng.choice(ORDERINGS),
+            "pages": rng.randint(1, scroll_depth),
+            "pick": rng.random()
+        })
+
+
+async def run_journey(session, base_url, journey, recorder, think):
+    await recorder.get(session, base_url, "home", "/api/home")
+    await asyncio.sleep(think)
+    for query in journey["keystrokes"]:
+        await recorder.get(session, base_url, "suggest", "/api/games/suggest", {"q": query})
+        await asyncio.sleep(0.05)  # intervalo entre teclas (o frontend não usa debounce longo)
+    await asyncio.sleep(think)
+
+    # Como o GamesPage: páginas de 60 e, depois da primeira, o cursor da resposta anterior
+    games = []
+    cursor = None
+    for _ in range(journey["pages"]):
+        params = {"ordering": journey["ordering"], "page_size": SCROLL_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        data = await recorder.get(session, base_url, "scroll", "/api/games", params)
+        if data and data.get("games"):
+            games = data["games"]
+        cursor = data and data["pagination"].get("next_cursor")
+        await asyncio.sleep(think)
+        if not cursor:
+            break
+
+    if games:
+        game = games[int(journey["pick"] * len(games))]
+        await recorder.get(session, base_url, "details", f"/api/games/{game['id']}")
+
+
+async def run_load(base_url, journeys, think, max_connections):
+    recorder = Recorder()
+    timeout = aiohttp.ClientTimeout(total=60)
+    connector = aiohttp.TCPConnector(limit=max_connections)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        started = time.perf_counter()
+
+        async def delayed(journey):
+            await asyncio.sleep(journey["at"])
+            await run_journey(session, base_url, journey, recorder, think)
+
+        await asyncio.gather(*[delayed(journey) for journey in journeys])
+        elapsed = time.perf_counter() - started
+    return recorder.summary(elapsed)
+
+
+async def upstream_calls(fake_url, reset=False):
+    async with aiohttp.ClientSession() as session:
+        if reset:
+            async with session.post(f"{fake_url}/__reset") as response:
+                await response.read()
+            return {}
+        async with session.get(f"{fake_url}/__stats") as response:
+            return await response.json()
+
+
+def server_command(worker_class, workers, threads, port):
+    if worker_class == "async":
+        return [sys.executable, "async_app.py"]
+    command = ["gunicorn", "-k", worker_class, "-w", str(workers), "-b", f"127.0.0.1:{port}", "--timeout", "120"]
+    if worker_class == "gthread":
+        command += ["--threads", str(threads)]
+    return command + ["main:app"]
+
+
+def run_scenario(args, fake_url, port, worker_class, workers, cache_mode, journeys):
+    env = dict(
+        os.environ,
+        RAWG_BASE_URL=f"{fake_url}/api",
+        RAWG_API_KEY="bench",
+        RATELIMIT_ENABLED="0",
+        DATA_DIR=tempfile.mkdtemp(prefix="load-"),
+        PORT=str(port),
+        LOG_LEVEL="WARNING",
+        NEWS_FIXTURES=NEWS_FIXTURES_DIR,
+        # O benchmark mede o servidor, não o governador de quota
+        RAWG_DAILY_BUDGET="100000000",
+        RAWG_MONTHLY_BUDGET="100000000",
+        RAWG_RATE_PER_SECOND="100000",
+        RAWG_RATE_BURST="100000"
+    )
+    if cache_mode == "cold":
+        env["WARMUP_PATHS"] = ""
+
+    base_url = f"http://127.0.0.1:{port}"
+    server = start(server_command(worker_class, workers, args.threads, port), env, SRC_DIR)
+    try:
+        asyncio.run(wait_until_up(f"{base_url}/api/health", timeout=60))
+        if cache_mode == "warm":
+            time.sleep(args.warmup_wait)
+            asyncio.run(run_load(base_url, journeys, 0, args.max_connections))
+        asyncio.run(upstream_calls(fake_url, reset=True))
+        result = asyncio.run(run_load(base_url, journeys, args.think, args.max_connections))
+        calls = asyncio.run(upstream_calls(fake_url))
+    finally:
+        server.terminate()
+        server.wait()
+
+    result["upstream_calls"] = sum(count for name, count in calls.items() if ":error" not in name)
+    result["upstream_errors"] = sum(count for name, count in calls.items() if ":error" in name)
+    result["upstream_by_endpoint"] = calls
+    return result
+
+
+def scenario_name(worker_class, workers, threads, cache_mode):
+    if worker_class == "async":
+        return f"async x1 {cache_mode}"
+    suffix = f"x{workers}" + (f"t{threads}" if worker_class == "gthread" else "")
+    return f"{worker_class} {suffix} {cache_mode}"
+
+
+def print_results(results, baseline=None):
+    print(f"{'scenario':<24}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'rawg':>7}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['throughput_rps']:>9.1f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+              f"{result['p99_ms']:>9.1f}{result['errors']:>8}{result['upstream_calls']:>7}")
+        for step, stats in result["steps"].items():
+            print(f"  {step:<22}{'':>9}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+                  f"{stats['errors']:>8}")
+        before = (baseline or {}).get(name)
+        if before:
+            def delta(key):
+                return f"{(result[key] - before[key]) / before[key] * 100:+.0f}%" if before[key] else "n/a"
+            print(f"  vs baseline: rps {delta('throughput_rps')}, p95 {delta('p95_ms')}, p99 {delta('p99_ms')}, "
+                  f"rawg calls {before['upstream_calls']} -> {result['upstream_calls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=5, help="jornadas iniciadas por segundo")
+    parser.add_argument("--duration", type=float, default=20, help="segundos durante os quais novas jornadas começam")
+    parser.add_argument("--scroll-depth", type=int, default=5, help="máximo de páginas roladas por jornada")
+    parser.add_argument("--think", type=float, default=0.3, help="pausa entre etapas da jornada, em segundos")
+    parser.add_argument("--seed", type=int, default=1, help="semente do plano de jornadas e do fake RAWG")
+    parser.add_argument("--workers", default="1,4", help="números de workers do gunicorn, separados por vírgula")
+    parser.add_argument("--worker-class", default="sync,gthread", help="classes de worker do gunicorn (sync, gthread)")
+    parser.add_argument("--threads", type=int, default=8, help="threads por worker gthread")
+    parser.add_argument("--cache", default="cold,warm", help="estados do cache: cold, warm")
+    parser.add_argument("--async", dest="include_async", action="store_true", help="inclui o async_app.py na matriz")
+    parser.add_argument("--warmup-wait", type=float, default=3, help="espera pelo warm-up de boot (cenários warm)")
+    parser.add_argument("--max-connections", type=int, default=200, help="conexões simultâneas do gerador de carga")
+    parser.add_argument("--latency", type=float, default=0.15, help="latência do RAWG falso, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.05, help="variação (±) da latência do RAWG falso")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas com erro do RAWG falso")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="respostas gravadas do RAWG")
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    fake_port, server_port = 18181, 18184
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    fake = start([sys.executable, os.path.join(BENCH_DIR, "fake_rawg.py"), "--port", str(fake_port),
+                  "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+                  "--fixtures", args.fixtures, "--seed", str(args.seed)], os.environ, BENCH_DIR)
+
+    journeys = plan_journeys(args.seed, args.rate, args.duration, args.scroll_depth)
+    matrix = list(itertools.product(
+        args.cache.split(","), args.worker_class.split(","), [int(n) for n in args.workers.split(",")]
+    ))
+    if args.include_async:
+        matrix += [(cache_mode, "async", 1) for cache_mode in args.cache.split(",")]
+
+    results = {}
+    try:
+        asyncio.run(wait_until_up(f"{fake_url}/__stats"))
+        for cache_mode, worker_class, workers in matrix:
+            name = scenario_name(worker_class, workers, args.threads, cache_mode)
+            print(f"running {name} ({len(journeys)} journeys)...", file=sys.stderr)
+            results[name] = run_scenario(args, fake_url, server_port, worker_class, workers, cache_mode, journeys)
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+
+    print(f"{len(journeys)} journeys at {args.rate}/s, upstream latency {args.latency * 1000:.0f}"
+          f"±{args.jitter * 1000:.0f} ms, upstream error rate {args.error_rate:.0%}")
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "scenarios": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
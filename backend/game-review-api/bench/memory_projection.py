@@ -0,0 +1,174 @@
+"""Compara o custo de manter em cache o JSON completo do RAWG com o dos registros
+compactos de games.py (Game/GamePage), para páginas da listagem de games.
+
+Mede a memória retida (tracemalloc), o tamanho serializado no cache L2 (pickle)
+e o tempo para montar o payload de /api/games a partir de cada formato.
+
+Os itens sintéticos imitam a listagem real do RAWG: ratings, tags, stores,
+short_screenshots, parent_platforms etc., que as rotas não usam.
+
+Uso:
+    python memory_projection.py --pages 50
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+from games import project  # noqa: E402
+
+GENRES = ["Action", "Adventure", "RPG", "Shooter", "Indie", "Strategy", "Puzzle", "Racing"]
+PLATFORMS = ["PC", "PlayStation 5", "PlayStation 4", "Xbox One", "Xbox Series S/X", "Nintendo Switch"]
+TAGS = ["Singleplayer", "Multiplayer", "Atmospheric", "Great Soundtrack", "Open World", "Co-op",
+        "Story Rich", "First-Person", "Third Person", "Sci-fi", "Fantasy", "Horror", "Sandbox",
+        "Funny", "Difficult", "Exploration", "Controller support", "Steam Achievements"]
+
+
+def raw_game(game_id):
+    """Item da listagem do RAWG com os campos que a API realmente devolve"""
+    genres = [GENRES[(game_id + i) % len(GENRES)] for i in range(2)]
+    platforms = [PLATFORMS[(game_id + i) % len(PLATFORMS)] for i in range(3)]
+    return {
+        "id": game_id,
+        "slug": f"game-{game_id}",
+        "name": f"Game {game_id}",
+        "released": "2023-10-12",
+        "tba": False,
+        "background_image": f"https://media.rawg.io/media/games/{game_id % 999:03d}/{game_id:032x}.jpg",
+        "rating": 4.12,
+        "rating_top": 5,
+        "ratings": [
+            {"id": i, "title": title, "count": 1000 + i * game_id % 500, "percent": 25.3}
+            for i, title in enumerate(["exceptional", "recommended", "meh", "skip"], start=2)
+        ],
+        "ratings_count": 4321,
+        "reviews_text_count": 32,
+        "added": 20000 - game_id,
+        "added_by_status": {"yet": 500, "owned": 12000, "beaten": 4000, "toplay": 700, "dropped": 900, "playing": 600},
+        "metacritic": 70 + game_id % 30,
+        "playtime": 18,
+        "suggestions_count": 650,
+        "updated": "2025-01-10T08:20:14",
+        "user_game": None,
+        "reviews_count": 4400,
+        "saturated_color": "0f0f0f",
+        "dominant_color": "0f0f0f",
+        "platforms": [
+            {
+                "platform": {"id": i, "name": name, "slug": name.lower().replace(" ", "-"), "image": None,
+                             "year_end": None, "year_start": None, "games_count": 500000, "image_background": "https://media.rawg.io/media/games/x.jpg"},
+                "released_at": "2023-10-12",
+                "requirements_en": None,
+                "requirements_ru": None
+            }
+            for i, name in enumerate(platforms)
+        ],
+        "parent_platforms": [{"platform": {"id": i, "name": name, "slug": name.lower()}} for i, name in enumerate(platforms)],
+        "genres": [
+            {"id": i, "name": name, "slug": name.lower(), "games_count": 180000,
+             "image_background": "https://media.rawg.io/media/games/y.jpg"}
+            for i, name in enumerate(genres)
+        ],
+        "stores": [
+            {"id": i, "store": {"id": i, "name": store, "slug": store.lower(), "domain": f"{store.lower()}.com",
+                                "games_count": 90000, "image_background": "https://media.rawg.io/media/games/z.jpg"}}
+            for i, store in enumerate(["Steam", "PlayStation Store", "Xbox Store"])
+        ],
+        "clip": None,
+        "tags": [
+            {"id": i, "name": tag, "slug": tag.lower().replace(" ", "-"), "language": "eng",
+             "games_count": 200000, "image_background": "https://media.rawg.io/media/games/t.jpg"}
+            for i, tag in enumerate(TAGS)
+        ],
+        "esrb_rating": {"id": 4, "name": "Mature", "slug": "mature"},
+        "short_screenshots": [
+            {"id": i, "image": f"https://media.rawg.io/media/screenshots/{game_id}/{i:032x}.jpg"} for i in range(7)
+        ]
+    }
+
+
+def raw_page(page, page_size=40):
+    start = (page - 1) * page_size
+    return {
+        "count": 900000,
+        "next": f"https://api.rawg.io/api/games?page={page + 1}",
+        "previous": None if page == 1 else f"https://api.rawg.io/api/games?page={page - 1}",
+        "results": [raw_game(start + i + 1) for i in range(page_size)]
+    }
+
+
+def retained_bytes(build):
+    """Memória retida pelos objetos criados por `build()`"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kept
+
+
+def legacy_payload(data):
+    # Montagem antiga de /api/games, a partir do JSON do RAWG
+    return [
+        {
+            "id": game.get("id"),
+            "name": game.get("name"),
+            "background_image": game.get("background_image"),
+            "rating": game.get("rating", 0),
+            "released": game.get("released"),
+            "genres": [genre["name"] for genre in game.get("genres", [])],
+            "platforms": [platform["platform"]["name"] for platform in game.get("platforms", [])],
+            "metacritic": game.get("metacritic"),
+            "playtime": game.get("playtime", 0)
+        }
+        for game in data.get("results", [])
+    ]
+
+
+def projected_payload(data):
+    return [game.to_dict(FIELDS) for game in data.games]
+
+
+FIELDS = ("id", "name", "background_image", "rating", "released", "genres", "platforms", "metacritic", "playtime")
+
+
+def timed(fn, pages, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            fn(page)
+    return (time.perf_counter() - started) / (repeat * len(pages)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50, help="páginas de 40 jogos mantidas em cache")
+    args = parser.parse_args()
+
+    # Como no cache: o JSON chega como texto e é decodificado
+    bodies = [json.dumps(raw_page(page)) for page in range(1, args.pages + 1)]
+
+    raw_bytes, raw_pages = retained_bytes(lambda: [json.loads(body) for body in bodies])
+    projected_bytes, projected_pages = retained_bytes(lambda: [project("games", json.loads(body)) for body in bodies])
+
+    raw_pickle = sum(len(pickle.dumps(page, pickle.HIGHEST_PROTOCOL)) for page in raw_pages)
+    projected_pickle = sum(len(pickle.dumps(page, pickle.HIGHEST_PROTOCOL)) for page in projected_pages)
+
+    games = args.pages * 40
+    print(f"{args.pages} pages, {games} games")
+    print(f"{'':<28}{'raw RAWG JSON':>16}{'projected':>14}{'ratio':>8}")
+    print(f"{'memory per game (bytes)':<28}{raw_bytes / games:>16.0f}{projected_bytes / games:>14.0f}{raw_bytes / projected_bytes:>8.1f}")
+    print(f"{'pickle per game (bytes)':<28}{raw_pickle / games:>16.0f}{projected_pickle / games:>14.0f}{raw_pickle / projected_pickle:>8.1f}")
+    legacy_ms = timed(legacy_payload, raw_pages)
+    projected_ms = timed(projected_payload, projected_pages)
+    print(f"{'payload build per page (ms)':<28}{legacy_ms:>16.3f}{projected_ms:>14.3f}{legacy_ms / projected_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
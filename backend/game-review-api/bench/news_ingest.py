@@ -0,0 +1,148 @@
+"""Benchmark da coleta de notícias (news.py), sem rede: feeds sintéticos em disco.
+
+Mede:
+- leitura de um feed grande: iterparse em streaming (iter_feed_items) contra
+  montar a árvore inteira com ElementTree.parse (tempo e pico de memória);
+- coleta fria de vários feeds (tudo novo), a recoleta sem mudanças (GET
+  condicional -> 304) e a recoleta incremental com alguns itens novos no topo
+  de cada feed (a leitura para ao encontrar itens já conhecidos);
+- leitura de páginas no banco: primeira página, página profunda e página de uma tag.
+
+Uso:
+    python news_ingest.py --feeds 20 --items 200 --big-items 20000
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from xml.etree import ElementTree
+from email.utils import formatdate
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+from news import (NewsStore, FeedSource, RecordedFeedFetcher, ingest_feeds, iter_feed_items,  # noqa: E402
+                  _item_from_element, CONSOLE_TAG)
+
+CATEGORIES = ["PlayStation", "Xbox", "Nintendo Switch", "PC", "Indie", "Trailers", "Reviews", "Esports"]
+STARTED_AT = 1_718_000_000  # data do item mais novo dos feeds gerados
+
+
+def rss_item(feed_index, item_index):
+    published = STARTED_AT - item_index * 600 - feed_index
+    category = CATEGORIES[(feed_index + item_index) % len(CATEGORIES)]
+    return (
+        "<item>"
+        f"<title>Feed {feed_index} story {item_index}: {category} news roundup</title>"
+        f"<link>https://news{feed_index}.example.com/articles/{item_index}?utm_source=rss</link>"
+        f"<pubDate>{formatdate(published)}</pubDate>"
+        f"<category>{category}</category>"
+        f"<description><![CDATA[<p>{'Lorem ipsum dolor sit amet. ' * 12}</p>"
+        f"<img src=\"https://img.example.com/{feed_index}/{item_index}.jpg\">]]></description>"
+        "</item>"
+    )
+
+
+def write_feed(path, feed_index, items, first=0):
+    """Feed RSS com `items` itens, do mais novo (índice `first`) para o mais antigo"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>')
+        f.write(f"<title>Feed {feed_index}</title><link>https://news{feed_index}.example.com</link>")
+        for item_index in range(first, first + items):
+            f.write(rss_item(feed_index, item_index))
+        f.write("</channel></rss>")
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def peak_memory(fn):
+    """Pico de memória (MB) de fn(); roda à parte porque o tracemalloc deixa tudo mais lento"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def parse_full_tree(path):
+    """Alternativa sem streaming: a árvore inteira em memória, depois os itens"""
+    root = ElementTree.parse(path).getroot()
+    return sum(1 for element in root.iter("item") if _item_from_element(element, "games").title)
+
+
+def parse_streaming(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in iter_feed_items(f, "games"))
+
+
+def timed_queries(store, runs=200):
+    results = []
+    total = store.page(1, 10)[1]
+    deep_page = max(total // 10 - 1, 1)
+    for label, args in (("page 1", (1, 10)), (f"page {deep_page}", (deep_page, 10)),
+                        (f"tag '{CONSOLE_TAG}' page 1", (1, 10, CONSOLE_TAG))):
+        started = time.perf_counter()
+        for _ in range(runs):
+            store.page(*args)
+        results.append((label, (time.perf_counter() - started) / runs * 1e6))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=20, help="feeds coletados")
+    parser.add_argument("--items", type=int, default=200, help="itens por feed")
+    parser.add_argument("--new-items", type=int, default=5, help="itens novos por feed na recoleta incremental")
+    parser.add_argument("--big-items", type=int, default=20000, help="itens do feed grande (comparação de leitura)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="news-bench-")
+    try:
+        big = os.path.join(workdir, "big.xml")
+        write_feed(big, 0, args.big_items)
+        size_mb = os.path.getsize(big) / 1024 / 1024
+        print(f"feed grande: {args.big_items} itens, {size_mb:.1f} MB")
+        for label, fn in (("ElementTree.parse", parse_full_tree), ("iter_feed_items", parse_streaming)):
+            count, elapsed = timed(lambda: fn(big))
+            peak = peak_memory(lambda: fn(big))
+            print(f"  {label:<20} {count:>7} itens  {elapsed * 1000:8.0f} ms  pico {peak:7.1f} MB")
+
+        feeds_dir = os.path.join(workdir, "feeds")
+        os.makedirs(feeds_dir)
+        feeds = [FeedSource(f"Feed {i}", "consoles" if i % 4 == 0 else "games", f"https://news{i}.example.com/rss")
+                 for i in range(args.feeds)]
+        fetch = RecordedFeedFetcher(feeds_dir)
+        for i, feed in enumerate(feeds):
+            write_feed(fetch.path(feed), i, args.items, first=args.new_items)
+        store = NewsStore(os.path.join(workdir, "news.sqlite3"))
+
+        print(f"\ncoleta de {args.feeds} feeds x {args.items} itens")
+        for label in ("fria", "sem mudanças (304)"):
+            summary, elapsed = timed(lambda: ingest_feeds(store, feeds, fetch))
+            print(f"  {label:<22} {elapsed * 1000:8.0f} ms  novos {summary['new_items']:>6}  "
+                  f"304 {summary['not_modified']:>3}")
+
+        # Itens novos no topo de cada feed (arquivo muda -> novo ETag)
+        for i, feed in enumerate(feeds):
+            write_feed(fetch.path(feed), i, args.items + args.new_items)
+        summary, elapsed = timed(lambda: ingest_feeds(store, feeds, fetch))
+        print(f"  {'incremental':<22} {elapsed * 1000:8.0f} ms  novos {summary['new_items']:>6}  "
+              f"304 {summary['not_modified']:>3}")
+
+        print(f"\nleituras ({store.stats()['items']} notícias no banco)")
+        for label, micros in timed_queries(store):
+            print(f"  {label:<22} {micros:8.0f} µs")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,545 @@
+"""Servidor assíncrono (aiohttp) para as rotas de leitura da API.
+
+Roda ao lado do app WSGI (main:app) e reaproveita o cache, as políticas de cache
+e a montagem dos payloads de main.py; só a camada de I/O com o RAWG muda. Com o
+AsyncRawgClient um único processo mantém centenas de chamadas ao RAWG em andamento,
+em vez de bloquear um worker inteiro por requisição.
+
+Login, registro, POST de reviews e rotas protegidas continuam apenas no app WSGI.
+
+Uso:
+    python async_app.py
+    gunicorn async_app:create_app --worker-class aiohttp.GunicornWebWorker -b 0.0.0.0:5000
+"""
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import asyncio
+import contextvars
+import functools
+
+from aiohttp import web
+from limits import parse_many, storage, strategies
+from werkzeug.datastructures import MultiDict
+
+import main
+from main import (
+    cache, get_cache_key, get_cache_policy, CORS_ORIGINS, DEFAULT_RATE_LIMITS
+)
+from cache_keys import canonical_params
+from response_cache import canonical_key, etag_matches, cache_control, negotiate_encoding, encoded_etag
+from json_provider import dumps
+from pagination import Assembly, InvalidCursor
+from rawg_async import AsyncRawgClient
+from rawg_client import RawgError, CircuitBreaker
+from quota import LOW, QuotaExceeded
+from applog import request_id_var
+
+logger = logging.getLogger("game_review.async")
+
+# web.json_response com o mesmo serializador rápido do app Flask
+json_response = functools.partial(web.json_response, dumps=dumps)
+
+_upstream_timing = contextvars.ContextVar("upstream_timing", default=None)
+
+async def _blocking(fn, *args):
+    """Roda uma chamada bloqueante numa thread, fora do event loop.
+
+    Tudo que toca SQLite (cache L2, catálogo, reviews, notícias, quota e rate
+    limit) passa por aqui: uma espera de disco ou de lock (timeout de 5s) não
+    pode parar as outras requisições do processo. O contexto (id da requisição
+    nos logs, tempo gasto no RAWG) acompanha a chamada.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(context.run, fn, *args))
+
+def _record_upstream_timing(timing):
+    """Acumula o tempo gasto no RAWG durante a requisição atual (para o header Server-Timing)"""
+    main.quota.record_calls(timing.attempts)
+    main.UPSTREAM_LATENCY.observe(timing.elapsed_ms / 1000, main.endpoint_group(timing.endpoint),
+                                  "ok" if timing.ok else "error")
+    current = _upstream_timing.get()
+    if current is not None:
+        current[0] += timing.elapsed_ms
+        current[1] += 1
+
+rawg = AsyncRawgClient(
+    main.RAWG_BASE_URL,
+    main.RAWG_API_KEY,
+    pool_size=int(os.getenv("RAWG_ASYNC_POOL_SIZE", 100)),
+    connect_timeout=float(os.getenv("RAWG_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("RAWG_READ_TIMEOUT", 10)),
+    max_retries=int(os.getenv("RAWG_MAX_RETRIES", 2)),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("RAWG_BREAKER_THRESHOLD", 5)),
+        reset_timeout=float(os.getenv("RAWG_BREAKER_RESET", 30))
+    ),
+    on_call=_record_upstream_timing
+)
+
+# Chamadas ao RAWG em andamento por chave de cache (coalescência no event loop)
+_in_flight = {}
+_coalesced = 0
+
+def _start_fetch(endpoint, params, cache_key, policy, priority):
+    """Retorna a task que busca a chave no RAWG, criando-a se ainda não existir"""
+    task = _in_flight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store(endpoint, params, cache_key, policy, priority))
+        _in_flight[cache_key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(cache_key, None))
+    return task
+
+async def _fetch_and_store(endpoint, params, cache_key, policy, priority):
+    before_retry = functools.partial(_blocking, main.quota.acquire, priority)
+    await before_retry()
+    data = main.project(endpoint, await rawg.get(endpoint, params, before_retry=before_retry))
+    main.index_fetched_games(endpoint, data)
+    stale_ttl = max(policy.hard_ttl - policy.ttl, policy.max_stale)
+    await _blocking(functools.partial(cache.set, cache_key, data, ttl=policy.ttl, stale_ttl=stale_ttl))
+    logger.info("RAWG call", extra={"endpoint": endpoint})
+    return data
+
+def _log_refresh_error(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background refresh failed", extra={"error": str(task.exception())})
+
+async def _cache_entry(cache_key):
+    """cache.get_entry com o L1 (memória) no event loop e o L2 (SQLite) numa thread"""
+    l1 = getattr(cache, "l1", None)
+    if l1 is None:
+        return cache.get_entry(cache_key)
+    entry = l1.get_entry(cache_key)
+    if entry is None:
+        entry = await _blocking(cache.get_entry_l2, cache_key)
+    return entry
+
+async def fetch_from_rawg(endpoint, params=None, priority=None):
+    """Equivalente assíncrono de main.fetch_from_rawg (mesmo cache, políticas e quota)"""
+    global _coalesced
+    params = canonical_params(endpoint, params)
+    if priority is None:
+        priority = main.call_priority(endpoint, params)
+
+    cache_key = get_cache_key(endpoint, params)
+    policy = get_cache_policy(endpoint, params)
+    started = time.perf_counter()
+    entry = await _cache_entry(cache_key)
+    main.CACHE_LOOKUP_LATENCY.observe(time.perf_counter() - started, "data")
+    if entry is not None:
+        main.prefetcher.record_use(cache_key)
+        now = time.time()
+        if entry.is_fresh(now):
+            main.CACHE_RESULTS.inc("fresh")
+            return entry.data
+        if now - entry.stored_at < policy.hard_ttl:
+            # Stale-while-revalidate: responde na hora e atualiza em segundo plano
+            main.CACHE_RESULTS.inc("stale")
+            if cache_key not in _in_flight:
+                _start_fetch(endpoint, params, cache_key, policy, LOW).add_done_callback(_log_refresh_error)
+            return entry.data
+
+    derived = await _blocking(main.derived_listing, endpoint, params)
+    if derived is not None:
+        main.CACHE_RESULTS.inc("derived")
+        return derived
+    if await _blocking(main.recent_failure, cache_key):
+        main.CACHE_RESULTS.inc("negative")
+        return main.stale_fallback(entry, policy, endpoint)
+
+    main.CACHE_RESULTS.inc("miss")
+    if cache_key in _in_flight:
+        _coalesced += 1
+    try:
+        # shield: se este cliente desconectar, a busca continua para os demais
+        return await asyncio.shield(_start_fetch(endpoint, params, cache_key, policy, priority))
+    except RawgError as e:
+        logger.warning("Error fetching from RAWG API", extra={"endpoint": endpoint, "error": str(e)})
+        await _blocking(main.remember_failure, cache_key, e)
+        data = main.stale_fallback(entry, policy, endpoint, e)
+        if data is None and isinstance(e, QuotaExceeded):
+            raise
+        return data
+
+async def fetch_games_listing(params):
+    """Listagem de games pelo catálogo local, com o RAWG como fallback para o que não temos"""
+    data = await _blocking(main.query_catalog, params)
+    if data is not None:
+        return data
+    try:
+        data = await fetch_from_rawg("games", params)
+    except QuotaExceeded:
+        data = await _blocking(main.query_local_fallback, params)
+        if data is None:
+            raise
+        return data
+    if data is None:
+        data = await _blocking(main.query_local_fallback, params)
+    return data
+
+def _args(request):
+    """Converte a query string para o MultiDict do werkzeug usado pelas funções de main.py"""
+    return MultiDict(list(request.query.items()))
+
+def _error(message, status):
+    return json_response({"status": "error", "message": message}, status=status)
+
+def cached_response(max_age, stale_while_revalidate=0, ttl=None):
+    """Equivalente de main.cached_response: mesmo cache de respostas serializadas e mesmos headers"""
+    server_ttl = max_age if ttl is None else ttl
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            key = canonical_key(request.path, request.query.items())
+            started = time.perf_counter()
+            cached = main.response_cache.get(key) if main.RESPONSE_CACHE_ENABLED else None
+            main.CACHE_LOOKUP_LATENCY.observe(time.perf_counter() - started, "response")
+            if cached is None:
+                main.RESPONSE_CACHE_RESULTS.inc("miss")
+                response = await handler(request)
+                if response.status != 200:
+                    return response
+                ttl = request.get("response_cache_ttl", server_ttl)
+                cached = main.response_cache.put(key, response.body, ttl if main.RESPONSE_CACHE_ENABLED else 0,
+                                                 main.degraded_max_age(ttl, server_ttl, max_age))
+            else:
+                main.RESPONSE_CACHE_RESULTS.inc("hit")
+            if cached.max_age is not None:
+                client_max_age, client_swr = cached.max_age, 0
+            else:
+                client_max_age, client_swr = max_age, stale_while_revalidate
+            # Versão comprimida já pronta (gzip ou brotli), conforme o Accept-Encoding
+            encoding = negotiate_encoding(request.headers.get("Accept-Encoding"), cached.encodings)
+            headers = {
+                "ETag": encoded_etag(cached.etag, encoding),
+                "Cache-Control": cache_control(client_max_age, client_swr),
+                "Vary": "Accept-Encoding"
+            }
+            if etag_matches(request.headers.get("If-None-Match"), cached.etag):
+                main.RESPONSE_CACHE_RESULTS.inc("not_modified")
+                return web.Response(status=304, headers=headers)
+            body = cached.body
+            if encoding:
+                body = cached.encodings[encoding]
+                headers["Content-Encoding"] = encoding
+            main.RESPONSE_BYTES.inc(encoding or "identity", amount=len(body))
+            return web.Response(body=body, content_type="application/json", headers=headers)
+        return wrapper
+    return decorator
+
+# Rotas
+
+async def health(request):
+    payload = await _blocking(main.health_payload)
+    payload["rawg"] = rawg.stats()
+    payload["singleflight"] = {"in_flight": len(_in_flight), "coalesced": _coalesced}
+    return json_response(payload)
+
+@cached_response(60, 300)
+async def get_popular_games(request):
+    params = main.popular_games_params(_args(request))
+    data = await fetch_games_listing(params)
+    if data:
+        return json_response(main.popular_games_payload(data, params, main.media_options(request.query)))
+    return _error("Failed to fetch popular games", 500)
+
+async def _ranked_list_page(name, params):
+    # Normalmente uma fatia em memória; só na primeira leitura a lista é calculada (em uma thread)
+    return await _blocking(main.ranked_list_page, name, params)
+
+@cached_response(60, 300)
+async def get_recent_games(request):
+    params = main.ranked_list_params(_args(request))
+    data = await _ranked_list_page("recent", params)
+    if data:
+        return json_response(main.popular_games_payload(data, params, main.media_options(request.query)))
+    return _error("Failed to fetch recent games", 500)
+
+@cached_response(60, 300)
+async def get_recent_popular_games(request):
+    params = main.ranked_list_params(_args(request))
+    data = await _ranked_list_page("recent-popular", params)
+    if data:
+        return json_response(main.popular_games_payload(data, params, main.media_options(request.query)))
+    return _error("Failed to fetch recent popular games", 500)
+
+async def assemble_games_page(params, cursor):
+    """Equivalente de main.assemble_games_page: páginas do upstream em paralelo com gather"""
+    assembly = Assembly(cursor, params["page_size"])
+    while True:
+        numbers = assembly.pages_needed()
+        if not numbers:
+            return assembly
+        pages = await asyncio.gather(*[fetch_games_listing(main.upstream_page_params(params, n)) for n in numbers])
+        assembly.merge(numbers, pages)
+
+@cached_response(60, 300)
+async def get_games(request):
+    args = _args(request)
+    params = main.games_params(args)
+    try:
+        cursor = main.games_cursor(args, params)
+    except InvalidCursor as e:
+        return _error(f"Invalid cursor: {e}", 400)
+    assembly = await assemble_games_page(params, cursor)
+    payload = main.games_page_response(params, assembly, main.media_options(request.query))
+    if payload:
+        return json_response(payload)
+    return _error("Failed to fetch games", 500)
+
+@cached_response(300, 600)
+async def suggest_games(request):
+    query, limit = main.suggest_params(_args(request))
+    if len(query) < 2:
+        return json_response(main.suggest_payload(query, []))
+
+    games = main.name_index.search(query, limit)
+    if not games and main.SUGGEST_UPSTREAM_FALLBACK:
+        try:
+            data = await fetch_from_rawg("games", {"search": query, "page_size": limit})
+        except QuotaExceeded:
+            data = None
+        if data:
+            games = [main.suggestion(game) for game in data.games[:limit]]
+        else:
+            request["response_cache_ttl"] = main.PARTIAL_RESPONSE_TTL
+    return json_response(main.suggest_payload(query, games, main.media_options(request.query)))
+
+@cached_response(300, 3600)
+async def get_critic_reviews(request):
+    data = await _ranked_list_page("critic-picks", main.ranked_list_params(_args(request), default_page_size=20))
+    if data:
+        return json_response(main.critic_reviews_payload(data, main.media_options(request.query)))
+    return _error("Failed to fetch critic reviews", 500)
+
+@cached_response(3600, 24 * 3600)
+async def get_genres(request):
+    data = await fetch_from_rawg("genres", {"page_size": 50})
+    if data:
+        return json_response(main.genres_payload(data))
+    return _error("Failed to fetch genres", 500)
+
+@cached_response(3600, 24 * 3600)
+async def get_platforms(request):
+    data = await fetch_from_rawg("platforms", {"page_size": 50})
+    if data:
+        return json_response(main.platforms_payload(data))
+    return _error("Failed to fetch platforms", 500)
+
+async def _game_details(game_id, media_opts):
+    """Busca detalhes e screenshots em paralelo; retorna o dict do jogo ou None"""
+    game_data, screenshots_data = await asyncio.gather(
+        fetch_from_rawg(f"games/{game_id}"),
+        fetch_from_rawg(f"games/{game_id}/screenshots")
+    )
+    if not game_data:
+        return None
+    return main.build_game_details(game_data, screenshots_data, media_opts)
+
+@cached_response(600, 3600)
+async def get_games_batch(request):
+    ids, error = main.parse_batch_ids(_args(request))
+    if error:
+        return _error(error, 400)
+
+    media_opts = main.media_options(request.query)
+    results = await asyncio.gather(*[_game_details(game_id, media_opts) for game_id in ids], return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, QuotaExceeded):
+            raise result
+    payload, status, headers = main.batch_payload(ids, results)
+    if payload.get("missing") or payload.get("throttled"):
+        request["response_cache_ttl"] = main.PARTIAL_RESPONSE_TTL
+    return json_response(payload, status=status, headers=headers)
+
+@cached_response(600, 3600)
+async def get_game_details(request):
+    game = await _game_details(int(request.match_info["game_id"]), main.media_options(request.query))
+    if game:
+        return json_response({"status": "success", "game": game})
+    return _error("Game not found", 404)
+
+@cached_response(0, ttl=0)
+async def get_game_reviews(request):
+    game_data = await fetch_from_rawg(f"games/{request.match_info['game_id']}")
+    if not game_data:
+        return _error("Game not found", 404)
+    user_reviews, user_rating = await _blocking(main.user_reviews_section, int(request.match_info["game_id"]),
+                                                _args(request))
+    return json_response(main.game_reviews_payload(game_data, user_reviews, user_rating,
+                                                   main.media_options(request.query)))
+
+@cached_response(60, 300)
+async def get_home(request):
+    section_params = {}
+    fetches = []
+    for name, ordering in main.HOME_LISTINGS.items():
+        section_params[name] = main.home_listing_params(ordering)
+        fetches.append(fetch_games_listing(section_params[name]))
+    for name, list_name in main.HOME_RANKED_LISTS.items():
+        section_params[name] = main.home_ranked_list_params()
+        fetches.append(_ranked_list_page(list_name, section_params[name]))
+    results = await asyncio.gather(*fetches, return_exceptions=True)
+
+    sections = {}
+    denied = {}
+    for (name, params), data in zip(section_params.items(), results):
+        if isinstance(data, Exception):
+            logger.warning("Home section failed", extra={"section": name, "error": str(data)})
+            if isinstance(data, QuotaExceeded):
+                denied[name] = data
+            data = None
+        sections[name] = main.home_listing_section(data, params, main.media_options(request.query))
+    sections.update(await _blocking(main.home_news_sections))
+
+    payload, status, headers = main.home_payload(sections, denied)
+    if payload.get("failed"):
+        request["response_cache_ttl"] = main.PARTIAL_RESPONSE_TTL
+    return json_response(payload, status=status, headers=headers)
+
+@cached_response(300, 3600)
+async def get_news(request):
+    payload = await _blocking(main.news_payload, _args(request))
+    if payload:
+        return json_response(payload)
+    return _error("Failed to fetch news", 500)
+
+@cached_response(300, 3600)
+async def get_console_news(request):
+    payload = await _blocking(main.console_news_payload, _args(request))
+    if payload:
+        return json_response(payload)
+    return _error("Failed to fetch console news", 500)
+
+async def get_metrics(request):
+    # Mesmo registro do app Flask: métricas deste processo
+    return web.Response(body=main.metrics.render().encode(),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+# Middlewares: métricas, rate limit, CORS e Server-Timing, equivalentes aos do app Flask
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Id da requisição, latência por rota e requisições em andamento"""
+    started = time.perf_counter()
+    incoming = request.headers.get("X-Request-ID", "")
+    request_id = incoming if main._REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    main.REQUESTS_IN_FLIGHT.inc()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        response.headers["X-Request-ID"] = request_id
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        main.REQUESTS_IN_FLIGHT.dec()
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else "unmatched"
+        main.REQUEST_LATENCY.observe(time.perf_counter() - started, route, request.method, str(status))
+        request_id_var.reset(token)
+
+# Mesmo storage compartilhado (SQLite), estratégia, custos e chaves do app Flask: o
+# Flask-Limiter conta os limites padrão por cliente e por rota (nome do endpoint,
+# que aqui é o nome do handler), e o orçamento do RAWG por cliente ("upstream").
+_rate_limiter = strategies.SlidingWindowCounterRateLimiter(storage.storage_from_string(main.RATELIMIT_STORAGE_URI))
+_rate_limits = [limit for value in DEFAULT_RATE_LIMITS for limit in parse_many(value)]
+
+def _check_rate_limits(client, endpoint, cost):
+    """Mensagem de erro se o cliente estourou algum limite, senão None (bloqueante: SQLite)"""
+    try:
+        for limit in _rate_limits:
+            if not _rate_limiter.hit(limit, client, endpoint, cost=cost):
+                return f"Rate limit exceeded: {limit}"
+        if (endpoint in main.UPSTREAM_ENDPOINTS and cost != main.CACHED_READ_COST
+                and not _rate_limiter.test(main.UPSTREAM_RATE_LIMIT, "upstream", client)):
+            return f"Rate limit exceeded: {main.UPSTREAM_RATE_LIMIT} upstream calls"
+    except sqlite3.Error as e:
+        logger.warning("Rate limit check failed", extra={"error": str(e)})
+    return None
+
+def _charge_upstream_calls(client, calls):
+    """Cobra do orçamento do cliente as chamadas ao RAWG feitas (bloqueante: SQLite)"""
+    try:
+        if not _rate_limiter.hit(main.UPSTREAM_RATE_LIMIT, "upstream", client, cost=calls):
+            # Mais chamadas que o saldo: consome o que resta
+            remaining = _rate_limiter.get_window_stats(main.UPSTREAM_RATE_LIMIT, "upstream", client).remaining
+            if remaining:
+                _rate_limiter.hit(main.UPSTREAM_RATE_LIMIT, "upstream", client, cost=remaining)
+    except sqlite3.Error as e:
+        logger.warning("Upstream budget charge failed", extra={"error": str(e)})
+
+@web.middleware
+async def rate_limit_middleware(request, handler):
+    resource = request.match_info.route.resource
+    if main.app.config["RATELIMIT_ENABLED"] and resource is not None and request.path != "/api/metrics":
+        cost = main.read_cost(request.method, canonical_key(request.path, request.query.items()))
+        error = await _blocking(_check_rate_limits, request.remote or "unknown",
+                                request.match_info.handler.__name__, cost)
+        if error:
+            return _error(error, 429)
+    return await handler(request)
+
+@web.middleware
+async def quota_middleware(request, handler):
+    """QuotaExceeded sem dados locais vira 503 com Retry-After, como no errorhandler do Flask"""
+    try:
+        return await handler(request)
+    except QuotaExceeded as e:
+        payload, headers = main.quota_exceeded_payload(e)
+        return json_response(payload, status=503, headers=headers)
+
+@web.middleware
+async def cors_middleware(request, handler):
+    response = await handler(request)
+    origin = request.headers.get("Origin")
+    if origin in CORS_ORIGINS:
+        response.headers["Access-Control-Allow-Origin"] = origin
+        vary = response.headers.get("Vary")
+        response.headers["Vary"] = f"{vary}, Origin" if vary else "Origin"
+    return response
+
+@web.middleware
+async def upstream_timing_middleware(request, handler):
+    timing = [0.0, 0]
+    _upstream_timing.set(timing)
+    response = await handler(request)
+    if timing[1] and main.app.config["RATELIMIT_ENABLED"]:
+        await _blocking(_charge_upstream_calls, request.remote or "unknown", timing[1])
+    if timing[1]:
+        response.headers["Server-Timing"] = f'rawg;dur={timing[0]:.1f};desc="{timing[1]} call(s)"'
+    return response
+
+async def _close_rawg(app):
+    await rawg.close()
+
+def create_app():
+    app = web.Application(middlewares=[metrics_middleware, cors_middleware, rate_limit_middleware,
+                                       upstream_timing_middleware, quota_middleware])
+    app.router.add_get("/api/health", health)
+    app.router.add_get("/api/games", get_games)
+    app.router.add_get("/api/games/popular", get_popular_games)
+    app.router.add_get("/api/games/recent", get_recent_games)
+    app.router.add_get("/api/games/recent-popular", get_recent_popular_games)
+    app.router.add_get("/api/games/critic-reviews", get_critic_reviews)
+    app.router.add_get("/api/games/suggest", suggest_games)
+    app.router.add_get("/api/games/genres", get_genres)
+    app.router.add_get("/api/games/platforms", get_platforms)
+    app.router.add_get("/api/games/batch", get_games_batch)
+    app.router.add_get(r"/api/games/{game_id:\d+}", get_game_details)
+    app.router.add_get(r"/api/games/{game_id:\d+}/reviews", get_game_reviews)
+    app.router.add_get("/api/home", get_home)
+    app.router.add_get("/api/news", get_news)
+    app.router.add_get("/api/news/consoles", get_console_news)
+    app.router.add_get("/api/metrics", get_metrics)
+    app.on_cleanup.append(_close_rawg)
+    return app
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
@@ -0,0 +1,381 @@
+import logging
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+_slot_names = {}
+
+
+def _slots(cls):
+    """Nomes de todos os __slots__ de uma classe, incluindo os das classes base"""
+    names = _slot_names.get(cls)
+    if names is None:
+        names = []
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            names.extend((slots,) if isinstance(slots, str) else slots)
+        names = _slot_names[cls] = tuple(name for name in names if name not in ("__dict__", "__weakref__"))
+    return names
+
+
+def approx_size(value):
+    """Estima o tamanho em bytes de um valor (dicts, listas, registros com __slots__ e escalares aninhados)"""
+    size = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            # Registros compactos (Game, GameDetails, GamePage): os campos ficam nos slots
+            for name in _slots(type(obj)):
+                try:
+                    stack.append(getattr(obj, name))
+                except AttributeError:
+                    pass
+    return size
+
+
+class CacheEntry:
+    """Valor em cache: fresco até `fresh_until`, mantido (como stale) até `expires_at`"""
+    __slots__ = ("data", "stored_at", "fresh_until", "expires_at", "size")
+
+    def __init__(self, data, stored_at, fresh_until, expires_at, size=0):
+        self.data = data
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+        self.size = size
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.fresh_until
+
+    def is_expired(self, now=None):
+        return (now or time.time()) >= self.expires_at
+
+
+class TTLCache:
+    """Cache LRU em memória com limite de entradas e de bytes e TTL por entrada.
+
+    Cada entrada tem um TTL (enquanto está fresca) e, opcionalmente, um período
+    extra `stale_ttl` durante o qual ainda é retornada, marcada como stale, para
+    quem quiser servi-la enquanto revalida. Entradas expiradas são removidas na
+    leitura e também por uma varredura amortizada, executada no máximo a cada
+    `sweep_interval` segundos durante as operações normais do cache.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, default_ttl=300, sweep_interval=60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get_entry(key, count=False) is not None
+
+    def get_entry(self, key, count=True):
+        """Retorna a CacheEntry válida para a chave ou None"""
+        now = time.time()
+        with self._lock:
+            self._maybe_sweep(now)
+            entry = self._data.get(key)
+            if entry is not None and entry.is_expired(now):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+                if not entry.is_fresh(now):
+                    self.stale_hits += 1
+            return entry
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return entry.data if entry is not None else default
+
+    def set(self, key, data, ttl=None, stale_ttl=0):
+        now = time.time()
+        fresh_until = now + (self.default_ttl if ttl is None else ttl)
+        self.set_entry(key, CacheEntry(data, now, fresh_until, fresh_until + stale_ttl))
+
+    def set_entry(self, key, entry):
+        now = time.time()
+        entry.size = entry.size or approx_size(entry.data)
+        size = entry.size
+        if size > self.max_bytes or entry.is_expired(now):
+            # Nunca caberia no cache; não vale a pena despejar tudo por ela
+            return
+        with self._lock:
+            self._maybe_sweep(now)
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = entry
+            self.bytes += size
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def sweep(self, now=None):
+        """Remove todas as entradas expiradas e retorna quantas foram removidas"""
+        now = now or time.time()
+        with self._lock:
+            expired = [key for key, entry in self._data.items() if entry.is_expired(now)]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            self._last_sweep = now
+            return len(expired)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def _maybe_sweep(self, now):
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+    def _remove(self, key):
+        entry = self._data.pop(key)
+        self.bytes -= entry.size
+
+    def _evict(self):
+        while self._data and (len(self._data) > self.max_entries or self.bytes > self.max_bytes):
+            key, entry = self._data.popitem(last=False)
+            self.bytes -= entry.size
+            self.evictions += 1
+
+
+class SQLiteCache:
+    """Cache compartilhado entre processos, persistido em um arquivo SQLite (modo WAL).
+
+    Todos os workers do gunicorn no mesmo host abrem o mesmo arquivo, então um
+    valor buscado por um worker fica disponível para os outros e sobrevive a
+    reinícios. Os valores são serializados com pickle; entradas que não puderem
+    ser lidas (por exemplo, após uma mudança de código) são tratadas como miss.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path, max_entries=50000, sweep_interval=300):
+        self.path = path
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+
+        self._local = threading.local()
+        self._last_sweep = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                # É só um cache: em caso de mudança de formato, recomeça do zero
+                conn.execute("DROP TABLE IF EXISTS cache")
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL, "
+                "fresh_until REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)")
+
+    def _connect(self):
+        # Conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Retorna a CacheEntry da chave se ela existir e não estiver expirada"""
+        now = time.time()
+        try:
+            row = self._connect().execute(
+                "SELECT value, stored_at, fresh_until, expires_at FROM cache "
+                "WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data = pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, AttributeError, ImportError, EOFError) as e:
+            logger.warning("L2 cache read error", extra={"key": key, "error": str(e)})
+            self.errors += 1
+            return None
+        self.hits += 1
+        return CacheEntry(data, row[1], row[2], row[3])
+
+    def set(self, key, entry):
+        now = time.time()
+        try:
+            value = pickle.dumps(entry.data, protocol=pickle.HIGHEST_PROTOCOL)
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, fresh_until, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, entry.stored_at, entry.fresh_until, entry.expires_at)
+            )
+            if now - self._last_sweep >= self.sweep_interval:
+                self.sweep(now)
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            logger.warning("L2 cache write error", extra={"key": key, "error": str(e)})
+            self.errors += 1
+
+    def delete(self, key):
+        try:
+            self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning("L2 cache delete error", extra={"key": key, "error": str(e)})
+            self.errors += 1
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
+
+    def sweep(self, now=None):
+        """Remove entradas expiradas e as mais antigas acima de max_entries"""
+        now = now or time.time()
+        self._last_sweep = now
+        conn = self._connect()
+        removed = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        return removed
+
+    def stats(self):
+        try:
+            entries = self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+class TieredCache:
+    """Cache em dois níveis: L1 em memória (TTLCache) na frente de um L2 compartilhado (SQLiteCache).
+
+    Expõe a mesma interface do TTLCache, então pode substituí-lo diretamente.
+    """
+
+    def __init__(self, l1, l2):
+        self.l1 = l1
+        self.l2 = l2
+
+    def __len__(self):
+        return len(self.l1)
+
+    def __contains__(self, key):
+        return self.get_entry(key, count=False) is not None
+
+    def get_entry(self, key, count=True):
+        entry = self.l1.get_entry(key, count=count)
+        if entry is not None:
+            return entry
+        return self.get_entry_l2(key)
+
+    def get_entry_l2(self, key):
+        """Segunda metade do get_entry, depois de um miss no L1: lê o L2 (SQLite, bloqueante)"""
+        entry = self.l2.get(key)
+        if entry is None:
+            return None
+        # Promove para o L1 mantendo os mesmos prazos do L2
+        self.l1.set_entry(key, entry)
+        return entry
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return entry.data if entry is not None else default
+
+    def set(self, key, data, ttl=None, stale_ttl=0):
+        now = time.time()
+        fresh_until = now + (self.l1.default_ttl if ttl is None else ttl)
+        self.set_entry(key, CacheEntry(data, now, fresh_until, fresh_until + stale_ttl))
+
+    def set_entry(self, key, entry):
+        self.l1.set_entry(key, entry)
+        self.l2.set(key, entry)
+
+    def delete(self, key):
+        self.l1.delete(key)
+        self.l2.delete(key)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def sweep(self, now=None):
+        return self.l1.sweep(now)
+
+    def stats(self):
+        stats = self.l1.stats()
+        stats["l2"] = self.l2.stats()
+        return stats
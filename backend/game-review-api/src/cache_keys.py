@@ -0,0 +1,84 @@
+import re
+
+# Valores que o RAWG usa quando o parâmetro não é enviado; iguais a eles, saem da chave
+LISTING_DEFAULTS = {"page": 1, "page_size": 20}
+# Parâmetros com listas separadas por vírgula, em que a ordem não muda o resultado
+LIST_PARAMS = ("genres", "platforms", "parent_platforms", "tags", "developers", "publishers", "stores")
+INT_PARAMS = ("page", "page_size")
+# Tamanhos de página em cache que podem conter uma página menor da mesma consulta,
+# do maior para o menor (40 é o das páginas montadas por /api/games e listas ranqueadas)
+COVERING_PAGE_SIZES = (40, 20)
+
+_spaces = re.compile(r"\s+")
+
+
+def _normalize_list(value):
+    items = {_spaces.sub(" ", item).strip().lower() for item in str(value).split(",")}
+    return ",".join(sorted(item for item in items if item))
+
+
+def canonical_params(endpoint, params):
+    """Forma canônica dos parâmetros de uma chamada ao RAWG.
+
+    Consultas equivalentes viram o mesmo dict (e a mesma chave de cache):
+    busca sem diferença de maiúsculas nem de espaços, listas de gêneros e
+    plataformas ordenadas e sem repetidos, números como int e, na listagem de
+    games, sem os parâmetros iguais ao padrão do RAWG.
+    """
+    canonical = {}
+    for name, value in (params or {}).items():
+        if value is None:
+            continue
+        if name in INT_PARAMS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                pass
+        elif name == "search":
+            value = _spaces.sub(" ", str(value)).strip().lower()
+        elif name in LIST_PARAMS:
+            value = _normalize_list(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        if value == "":
+            continue
+        canonical[name] = value
+    if endpoint == "games":
+        for name, default in LISTING_DEFAULTS.items():
+            if canonical.get(name) == default:
+                del canonical[name]
+    return canonical
+
+
+def page_window(params):
+    """(início, fim) dos itens de uma página da listagem, a partir de parâmetros canônicos"""
+    page = params.get("page", LISTING_DEFAULTS["page"])
+    page_size = params.get("page_size", LISTING_DEFAULTS["page_size"])
+    if not isinstance(page, int) or not isinstance(page_size, int) or page < 1 or page_size < 1:
+        return None
+    return (page - 1) * page_size, page * page_size
+
+
+def covering_pages(params):
+    """Páginas maiores da mesma consulta que contêm a página pedida: (params, deslocamento).
+
+    Cada candidata é uma página de COVERING_PAGE_SIZES, maior que a pedida e
+    alinhada de forma que [início, fim) caiba inteira nela.
+    """
+    window = page_window(params)
+    if window is None:
+        return []
+    start, end = window
+    candidates = []
+    for size in COVERING_PAGE_SIZES:
+        if size <= end - start:
+            continue
+        page = start // size + 1
+        if end > page * size:
+            continue
+        candidate = dict(params, page=page, page_size=size)
+        for name, default in LISTING_DEFAULTS.items():
+            if candidate[name] == default:
+                del candidate[name]
+        candidates.append((candidate, start - (page - 1) * size))
+    return candidates
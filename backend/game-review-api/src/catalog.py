@@ -0,0 +1,344 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from games import Game, GamePage, intern_names
+
+# Ordenações que o catálogo sabe responder (as mesmas aceitas pelo RAWG)
+ORDERINGS = {
+    "name": "name_folded ASC",
+    "-name": "name_folded DESC",
+    "released": "released IS NULL, released ASC",
+    "-released": "released IS NULL, released DESC",
+    "added": "added ASC",
+    "-added": "added DESC",
+    "rating": "rating ASC",
+    "-rating": "rating DESC",
+    "metacritic": "metacritic IS NULL, metacritic ASC",
+    "-metacritic": "metacritic IS NULL, metacritic DESC"
+}
+
+# Parâmetros de listagem do RAWG que o catálogo consegue filtrar localmente
+SUPPORTED_PARAMS = {"ordering", "page", "page_size", "search", "genres", "platforms", "dates", "metacritic"}
+# Páginas do preenchimento inicial (ordering=-added): enquanto ele não termina, o
+# catálogo tem completos só os (backfill_next_page - 1) * SYNC_PAGE_SIZE primeiros jogos
+SYNC_PAGE_SIZE = 40
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    slug TEXT,
+    name TEXT NOT NULL,
+    name_folded TEXT NOT NULL,
+    released TEXT,
+    rating REAL,
+    metacritic INTEGER,
+    added INTEGER NOT NULL DEFAULT 0,
+    playtime INTEGER,
+    background_image TEXT,
+    genres TEXT NOT NULL DEFAULT '[]',
+    platforms TEXT NOT NULL DEFAULT '[]',
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_games_released ON games (released);
+CREATE INDEX IF NOT EXISTS idx_games_rating ON games (rating);
+CREATE INDEX IF NOT EXISTS idx_games_metacritic ON games (metacritic);
+CREATE INDEX IF NOT EXISTS idx_games_added ON games (added);
+
+CREATE TABLE IF NOT EXISTS game_genres (
+    genre TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    PRIMARY KEY (genre, game_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_game_genres_game ON game_genres (game_id);
+
+CREATE TABLE IF NOT EXISTS game_platforms (
+    platform TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    PRIMARY KEY (platform, game_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_game_platforms_game ON game_platforms (game_id);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def fold(text):
+    """Normaliza texto para busca: sem acentos, minúsculo e com espaços simples"""
+    text = text or ""
+    if text.isascii():
+        # NFKD não muda texto ASCII: pula a decomposição caractere a caractere
+        return " ".join(text.casefold().split())
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def _filter_keys(item):
+    """Chaves pelas quais um gênero/plataforma pode ser filtrado: id, slug e nome"""
+    keys = {str(item.get("id")), (item.get("slug") or "").lower(), (item.get("name") or "").lower()}
+    keys.discard("")
+    keys.discard("none")
+    return keys
+
+
+class GameCatalog:
+    """Catálogo local de jogos em SQLite, com índices para filtrar, ordenar e paginar
+    listagens sem chamar o RAWG.
+
+    Guarda apenas os campos usados pelas rotas. Gêneros e plataformas ficam em
+    tabelas de índice (chave -> jogo), indexadas por id, slug e nome, para aceitar
+    os mesmos valores que o RAWG aceita nos filtros.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._count = 0
+        self._count_checked_at = 0
+        self._progress = (False, 0, None)
+        self._progress_checked_at = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        # Conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def count(self, max_age=60):
+        """Número de jogos no catálogo (recalculado no máximo a cada `max_age` segundos)"""
+        now = time.time()
+        if now - self._count_checked_at >= max_age:
+            self._count = self._connect().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+            self._count_checked_at = now
+        return self._count
+
+    def upsert_games(self, games):
+        """Insere ou atualiza jogos no formato da listagem do RAWG; retorna quantos foram gravados"""
+        conn = self._connect()
+        written = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for game in games:
+                game_id = game.get("id")
+                if not game_id or not game.get("name"):
+                    continue
+                genres = game.get("genres") or []
+                platforms = [p["platform"] for p in game.get("platforms") or [] if p.get("platform")]
+                conn.execute(
+                    "INSERT OR REPLACE INTO games (id, slug, name, name_folded, released, rating, metacritic, "
+                    "added, playtime, background_image, genres, platforms, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        game_id, game.get("slug"), game["name"], fold(game["name"]), game.get("released"),
+                        game.get("rating"), game.get("metacritic"), game.get("added") or 0, game.get("playtime"),
+                        game.get("background_image"),
+                        json.dumps([genre.get("name") for genre in genres]),
+                        json.dumps([platform.get("name") for platform in platforms]),
+                        game.get("updated")
+                    )
+                )
+                conn.execute("DELETE FROM game_genres WHERE game_id = ?", (game_id,))
+                conn.execute("DELETE FROM game_platforms WHERE game_id = ?", (game_id,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO game_genres (genre, game_id) VALUES (?, ?)",
+                    [(key, game_id) for genre in genres for key in _filter_keys(genre)]
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO game_platforms (platform, game_id) VALUES (?, ?)",
+                    [(key, game_id) for platform in platforms for key in _filter_keys(platform)]
+                )
+                written += 1
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._count_checked_at = 0
+        return written
+
+    def get_state(self, name, default=None):
+        row = self._connect().execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, name, value):
+        self._connect().execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)", (name, str(value)))
+
+    def backfill_progress(self, max_age=60):
+        """(preenchimento terminou, jogos do início da ordenação -added já completos, total no RAWG).
+
+        Relido do sync_state no máximo a cada `max_age` segundos, como o count().
+        """
+        now = time.time()
+        if now - self._progress_checked_at >= max_age:
+            next_page = int(self.get_state("backfill_next_page", 1))
+            upstream_total = self.get_state("backfill_total")
+            self._progress = (next_page == 0, max(next_page - 1, 0) * SYNC_PAGE_SIZE,
+                              int(upstream_total) if upstream_total else None)
+            self._progress_checked_at = now
+        return self._progress
+
+    def listing(self, params):
+        """Listagem que o catálogo tem por inteiro, ou None (quem chama vai ao RAWG).
+
+        Com o preenchimento inicial terminado, responde como query(). Enquanto ele
+        anda, o catálogo não sabe o total de uma busca ou de um filtro (faltam
+        jogos), então só responde a listagem sem filtros por -added dentro das
+        páginas já baixadas, com o total do RAWG.
+        """
+        done, prefix, upstream_total = self.backfill_progress()
+        if done:
+            return self.query(params)
+        if set(params) - {"ordering", "page", "page_size"} or (params.get("ordering") or "-added") != "-added":
+            return None
+        page = max(int(params.get("page", 1)), 1)
+        page_size = int(params.get("page_size", 20))
+        end = page * page_size
+        if not upstream_total or end > prefix:
+            return None
+        result = self.query(params)
+        if result is None:
+            return None
+        return GamePage(upstream_total, end < upstream_total, result.has_previous, result.games)
+
+    def query(self, params):
+        """Responde uma listagem de games com os mesmos parâmetros do RAWG.
+
+        Retorna um GamePage (os mesmos registros que o cache guarda para o RAWG)
+        ou None quando o catálogo não sabe responder: parâmetro ou ordenação não
+        suportados, nenhum resultado local ou página além do que temos.
+        """
+        if set(params) - SUPPORTED_PARAMS:
+            return None
+        ordering = params.get("ordering") or "-added"
+        if ordering not in ORDERINGS:
+            return None
+        page = max(int(params.get("page", 1)), 1)
+        page_size = int(params.get("page_size", 20))
+
+        where = []
+        args = []
+        if params.get("search"):
+            term = fold(params["search"]).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("name_folded LIKE ? ESCAPE '\\'")
+            args.append(f"%{term}%")
+        for param, table, column in (("genres", "game_genres", "genre"), ("platforms", "game_platforms", "platform")):
+            if params.get(param):
+                keys = [key.strip().lower() for key in str(params[param]).split(",") if key.strip()]
+                where.append(f"id IN (SELECT game_id FROM {table} WHERE {column} IN ({','.join('?' * len(keys))}))")
+                args.extend(keys)
+        if params.get("dates"):
+            start, _, end = str(params["dates"]).partition(",")
+            where.append("released BETWEEN ? AND ?")
+            args.extend([start, end or start])
+        if params.get("metacritic"):
+            low, _, high = str(params["metacritic"]).partition(",")
+            where.append("metacritic BETWEEN ? AND ?")
+            args.extend([int(low), int(high or low)])
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM games {where_sql}", args).fetchone()[0]
+        offset = (page - 1) * page_size
+        if total == 0 or offset >= total:
+            return None
+
+        rows = conn.execute(
+            f"SELECT id, slug, name, released, rating, metacritic, added, playtime, background_image, genres, platforms "
+            f"FROM games {where_sql} ORDER BY {ORDERINGS[ordering]}, id LIMIT ? OFFSET ?",
+            args + [page_size, offset]
+        ).fetchall()
+
+        return GamePage(total, offset + page_size < total, page > 1, tuple(self._row_to_game(row) for row in rows))
+
+    def iter_games(self):
+        """Percorre todos os jogos do catálogo como registros Game"""
+        rows = self._connect().execute(
+            "SELECT id, slug, name, released, rating, metacritic, added, playtime, background_image, genres, platforms "
+            "FROM games"
+        )
+        for row in rows:
+            yield self._row_to_game(row)
+
+    @staticmethod
+    def _row_to_game(row):
+        return Game(*row[:9], intern_names(json.loads(row[9])), intern_names(json.loads(row[10])))
+
+
+class RecordedFetcher:
+    """Substitui o RAWG no sync com páginas gravadas em disco (games_page_<n>.json)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self, params):
+        path = os.path.join(self.directory, f"games_page_{params.get('page', 1)}.json")
+        if not os.path.exists(path):
+            return {"count": 0, "next": None, "previous": None, "results": []}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def sync_catalog(catalog, fetch_page, max_pages=10, page_size=SYNC_PAGE_SIZE):
+    """Sincroniza o catálogo com a listagem paginada de games do RAWG.
+
+    Cada execução primeiro busca os jogos atualizados desde a última sincronização
+    (ordering=-updated, filtro updated) e depois continua o preenchimento inicial
+    (ordering=-added) da página em que a execução anterior parou, até gastar
+    `max_pages` páginas no total. `fetch_page(params)` retorna a resposta do RAWG;
+    pode ser o RawgClient ou um RecordedFetcher para rodar sem rede.
+    """
+    pages = 0
+    written = 0
+
+    watermark = catalog.get_state("updated_watermark")
+    newest = watermark
+    if watermark:
+        page = 1
+        while pages < max_pages:
+            data = fetch_page({
+                "ordering": "-updated",
+                "updated": f"{watermark[:10]},{time.strftime('%Y-%m-%d')}",
+                "page": page,
+                "page_size": page_size
+            })
+            pages += 1
+            results = data.get("results", [])
+            written += catalog.upsert_games(results)
+            newest = max([newest] + [game["updated"] for game in results if game.get("updated")])
+            if not data.get("next"):
+                break
+            page += 1
+
+    page = int(catalog.get_state("backfill_next_page", 1))
+    while pages < max_pages and page > 0:
+        data = fetch_page({"ordering": "-added", "page": page, "page_size": page_size})
+        pages += 1
+        results = data.get("results", [])
+        written += catalog.upsert_games(results)
+        updates = [game["updated"] for game in results if game.get("updated")]
+        if updates:
+            newest = max([newest or ""] + updates)
+        # 0 indica que o preenchimento inicial terminou
+        page = page + 1 if data.get("next") else 0
+        catalog.set_state("backfill_next_page", page)
+        if data.get("count"):
+            catalog.set_state("backfill_total", data["count"])
+
+    if newest:
+        catalog.set_state("updated_watermark", newest)
+    return {"pages": pages, "games": written, "total": catalog.count(max_age=0)}
@@ -0,0 +1,129 @@
+import sys
+
+# Quantos screenshots a página de detalhes exibe (o resto não é guardado)
+SCREENSHOTS_KEPT = 6
+
+# Campos de cada card nas listagens (popular, recent, critic reviews, /api/games)
+CARD_FIELDS = ("id", "name", "background_image", "rating", "released", "genres", "platforms")
+
+_shared_names = {}
+
+
+def intern_names(names):
+    """Tupla de nomes (gêneros, plataformas) compartilhada entre todos os jogos.
+
+    Os nomes são internados com sys.intern e a própria tupla é reaproveitada:
+    milhares de jogos "Action" + "PC" apontam para o mesmo objeto.
+    """
+    names = tuple(sys.intern(name) for name in names if name)
+    return _shared_names.setdefault(names, names)
+
+
+class Game:
+    """Registro compacto de um jogo, só com os campos que as rotas usam.
+
+    Substitui o item da listagem do RAWG (com stores, tags, ratings,
+    short_screenshots...) no cache, no catálogo e no índice de nomes.
+    """
+
+    FIELDS = ("id", "slug", "name", "released", "rating", "metacritic", "added", "playtime",
+              "background_image", "genres", "platforms")
+    __slots__ = FIELDS
+
+    def __init__(self, *values):
+        for field, value in zip(self.FIELDS, values):
+            setattr(self, field, value)
+
+    def __reduce__(self):
+        # Pickle como tupla de valores (o cache L2 grava os registros com pickle)
+        return (self.__class__, tuple(getattr(self, field) for field in self.FIELDS))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(id={self.id!r}, name={self.name!r})"
+
+    def to_dict(self, fields=CARD_FIELDS):
+        return {field: getattr(self, field) for field in fields}
+
+
+class GameDetails(Game):
+    """Jogo com os campos extras da página de detalhes"""
+
+    FIELDS = Game.FIELDS + ("description", "developers", "publishers", "esrb_rating")
+    __slots__ = FIELDS[len(Game.FIELDS):]
+
+
+class GamePage:
+    """Página de uma listagem de jogos (do RAWG ou do catálogo local)"""
+
+    __slots__ = ("count", "has_next", "has_previous", "games")
+
+    def __init__(self, count, has_next, has_previous, games):
+        self.count = count
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.games = games
+
+    def __reduce__(self):
+        return (GamePage, (self.count, self.has_next, self.has_previous, self.games))
+
+    def slice(self, start, size):
+        """Página menor contida nesta: os jogos [start, start + size)"""
+        end = start + size
+        return GamePage(self.count, end < len(self.games) or self.has_next, start > 0 or self.has_previous,
+                        self.games[start:end])
+
+
+def _common_values(raw):
+    return (
+        raw.get("id"),
+        raw.get("slug"),
+        raw.get("name"),
+        raw.get("released"),
+        raw.get("rating"),
+        raw.get("metacritic"),
+        raw.get("added") or 0,
+        raw.get("playtime"),
+        raw.get("background_image"),
+        intern_names(genre.get("name") for genre in raw.get("genres") or []),
+        intern_names((platform.get("platform") or {}).get("name") for platform in raw.get("platforms") or [])
+    )
+
+
+def project_game(raw):
+    """Item da listagem do RAWG -> Game"""
+    return Game(*_common_values(raw))
+
+
+def project_details(raw):
+    """Resposta de games/{id} do RAWG -> GameDetails"""
+    return GameDetails(
+        *_common_values(raw),
+        raw.get("description_raw") or "",
+        tuple(dev["name"] for dev in raw.get("developers") or []),
+        tuple(pub["name"] for pub in raw.get("publishers") or []),
+        (raw.get("esrb_rating") or {}).get("name")
+    )
+
+
+def project_page(data):
+    """Resposta paginada de games do RAWG -> GamePage"""
+    return GamePage(
+        data.get("count", 0),
+        data.get("next") is not None,
+        data.get("previous") is not None,
+        tuple(project_game(game) for game in data.get("results", []))
+    )
+
+
+def project(endpoint, data):
+    """Reduz a resposta do RAWG ao que as rotas usam; roda uma vez, antes de ir para o cache"""
+    if endpoint == "games":
+        return project_page(data)
+    if endpoint in ("genres", "platforms"):
+        return intern_names(item.get("name") for item in data.get("results", []))
+    if endpoint.startswith("games/"):
+        if endpoint.endswith("/screenshots"):
+            return tuple(shot.get("image") for shot in data.get("results", [])[:SCREENSHOTS_KEPT])
+        if endpoint.count("/") == 1:
+            return project_details(data)
+    return data
@@ -1,6 +1,27 @@
 import os
 import sys
+import json
+import math
+import time
+import hashlib
+import threading
+import fcntl
+import hmac
+import sqlite3
+import contextvars
+import logging
+import random
+import re
+import uuid
+import io
+import cProfile
+import pstats
+import functools
+import contextlib
+import click
 import requests
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 # from dotenv import load_dotenv # Comente ou remova esta linha
 
@@ -9,11 +30,39 @@ from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, g, has_request_context, make_response
+from werkzeug.datastructures import MultiDict
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from limits import parse as parse_rate_limit
+
+from cache import TTLCache, SQLiteCache, TieredCache
+from cache_keys import canonical_params, covering_pages
+from singleflight import SingleFlight
+from rawg_client import RawgClient, CircuitBreaker, RawgHTTPError, CircuitOpenError
+from catalog import GameCatalog, RecordedFetcher, sync_catalog
+from suggest import NameIndex, suggestion
+from response_cache import ResponseCache, canonical_key, etag_matches, cache_control, negotiate_encoding, encoded_etag
+from json_provider import FastJSONProvider
+from games import project, CARD_FIELDS
+import media
+from media import DEFAULT_MEDIA, media_options
+from prefetch import Prefetcher
+from quota import QuotaGovernor, QuotaExceeded, HIGH, NORMAL, LOW
+from ranked_lists import RankedList, RankedLists, UPSTREAM_PAGE_SIZE
+from pagination import Assembly, CursorCodec, InvalidCursor, query_fingerprint
+from applog import configure_logging, request_id_var
+from metrics import Registry, FAST_BUCKETS
+import ratelimit_storage  # registra o esquema sqlite:// no limits
+from news import (NewsStore, HttpFeedFetcher, RecordedFeedFetcher, ingest_feeds, parse_feeds, CONSOLE_TAG,
+                  FEED_ERRORS, fold as news_fold)
+from reviews import ReviewStore, ReviewQueueFull, MIN_RATING, MAX_RATING
+
+# Logs estruturados (JSON, uma linha por evento, com o id da requisição)
+configure_logging(os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger("game_review")
 
 # Configuração básica
 app = Flask(__name__)
@@ -27,185 +76,1003 @@ RAWG_API_KEY = os.getenv("RAWG_API_KEY")
 
 # Se a chave ainda for None, isso é um problema grave de configuração no Railway
 if RAWG_API_KEY is None:
-    print("ERRO CRÍTICO: RAWG_API_KEY não está definida!")
+    logger.critical("ERRO CRÍTICO: RAWG_API_KEY não está definida!")
     # Você pode optar por levantar uma exceção ou usar uma chave de fallback aqui
     # Por enquanto, vamos deixar assim para ver o erro claro nos logs
 
-RAWG_BASE_URL = "https://api.rawg.io/api"
+RAWG_BASE_URL = os.getenv("RAWG_BASE_URL", "https://api.rawg.io/api")
+
+# Diretório para os arquivos locais (cache compartilhado, etc.)
+# No Railway, monte um volume aqui para que o cache sobreviva a deploys
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
 
 # Inicializar extensões
-CORS(app, origins=["https://www.raykirogames.com"] )
+CORS_ORIGINS = ["https://www.raykirogames.com"]
+CORS(app, origins=CORS_ORIGINS)
 jwt = JWTManager(app)
+# Rate limit compartilhado entre os workers do gunicorn: contadores em SQLite
+# (ratelimit_storage.py) com janela deslizante, em vez da memória de cada worker.
+# O limite padrão é medido em custo: uma leitura que já está no cache de respostas
+# custa CACHED_READ_COST e as demais requisições custam REQUEST_COST. Com os
+# valores padrão, continuam valendo 100 requisições sem cache por hora por rota,
+# mas quem lê o que já está pronto pode fazer até 500.
+RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "sqlite:///" + os.path.join(DATA_DIR, "ratelimit.sqlite3"))
+REQUEST_COST = int(os.getenv("RATELIMIT_REQUEST_COST", 5))
+CACHED_READ_COST = int(os.getenv("RATELIMIT_CACHED_READ_COST", 1))
+DEFAULT_RATE_LIMITS = [os.getenv("RATELIMIT_DEFAULT", "500 per hour")]
+# Orçamento por cliente de chamadas ao RAWG causadas pelas suas requisições; é
+# cobrado depois da resposta, pelo número de chamadas feitas de fato
+UPSTREAM_RATE_LIMIT = parse_rate_limit(os.getenv("RATELIMIT_UPSTREAM", "60 per hour"))
+# Permite desligar o rate limit em benchmarks locais (RATELIMIT_ENABLED=0)
+app.config["RATELIMIT_ENABLED"] = os.getenv("RATELIMIT_ENABLED", "1") != "0"
+
+def read_cost(method, cache_key):
+    """Custo de uma requisição no rate limit: barato se a resposta já está em cache"""
+    if method == "GET" and RESPONSE_CACHE_ENABLED and cache_key in response_cache:
+        return CACHED_READ_COST
+    return REQUEST_COST
+
+def request_cost():
+    if "request_cost" not in g:
+        g.request_cost = read_cost(request.method, canonical_key(request.path, request.args.items(multi=True)))
+    return g.request_cost
+
 limiter = Limiter(
     key_func=get_remote_address,
-    default_limits=["100 per hour"]
+    default_limits=DEFAULT_RATE_LIMITS,
+    default_limits_cost=request_cost,
+    storage_uri=RATELIMIT_STORAGE_URI,
+    strategy="sliding-window-counter",
+    # Se o SQLite falhar, cada worker volta a contar em memória até ele voltar
+    in_memory_fallback_enabled=True
 )
 limiter.init_app(app)
 
-# Cache simples para evitar requisições desnecessárias
-cache = {}
-CACHE_DURATION = 300  # 5 minutos
+@limiter.request_filter
+def _is_internal_request():
+    """Requisições internas (warm-up do cache) não contam no rate limit"""
+    return request.environ.get("game_review.internal", False)
+
+# Rotas que podem chamar o RAWG (os nomes dos handlers do async_app.py são os mesmos).
+# Só elas são recusadas quando o orçamento de chamadas ao RAWG do cliente acaba:
+# login, registro, POST de reviews, notícias e rotas administrativas não gastam nada dele.
+UPSTREAM_ENDPOINTS = frozenset({
+    "get_games", "get_popular_games", "get_recent_games", "get_recent_popular_games", "get_critic_reviews",
+    "suggest_games", "get_genres", "get_platforms", "get_games_batch", "get_game_details", "get_game_reviews",
+    "get_home"
+})
+
+def _upstream_limit_applies():
+    return app.config["RATELIMIT_ENABLED"] and not _is_internal_request() and request.endpoint != "get_metrics"
+
+@app.before_request
+def check_upstream_budget():
+    """Recusa requisições sem cache de quem já esgotou o orçamento de chamadas ao RAWG"""
+    if request.method != "GET" or request.endpoint not in UPSTREAM_ENDPOINTS:
+        return None
+    if not _upstream_limit_applies() or request_cost() == CACHED_READ_COST:
+        return None
+    try:
+        allowed = limiter.limiter.test(UPSTREAM_RATE_LIMIT, "upstream", get_remote_address())
+    except sqlite3.Error:
+        return None
+    if allowed:
+        return None
+    response = jsonify({
+        "status": "error",
+        "message": f"Rate limit exceeded: {UPSTREAM_RATE_LIMIT} upstream calls"
+    })
+    response.status_code = 429
+    response.headers["Retry-After"] = str(UPSTREAM_RATE_LIMIT.get_expiry())
+    return response
+
+@app.after_request
+def charge_upstream_calls(response):
+    """Cobra do orçamento do cliente as chamadas ao RAWG feitas para esta requisição"""
+    calls = g.get("upstream_calls", 0)
+    if not calls or not _upstream_limit_applies():
+        return response
+    client = get_remote_address()
+    try:
+        if not limiter.limiter.hit(UPSTREAM_RATE_LIMIT, "upstream", client, cost=calls):
+            # Mais chamadas que o saldo: consome o que resta
+            remaining = limiter.limiter.get_window_stats(UPSTREAM_RATE_LIMIT, "upstream", client).remaining
+            if remaining:
+                limiter.limiter.hit(UPSTREAM_RATE_LIMIT, "upstream", client, cost=remaining)
+    except sqlite3.Error as e:
+        logger.warning("Upstream budget charge failed", extra={"error": str(e)})
+    return response
+
+# Instrumentação: métricas em memória por processo, exportadas em /api/metrics
+# no formato do Prometheus. Registrar uma observação custa poucos microssegundos.
+metrics = Registry()
+REQUEST_LATENCY = metrics.histogram(
+    "http_request_duration_seconds", "Latência das requisições por rota, método e status",
+    ("route", "method", "status")
+)
+REQUESTS_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Requisições em andamento neste processo")
+UPSTREAM_LATENCY = metrics.histogram(
+    "rawg_request_duration_seconds", "Latência das chamadas ao RAWG (com retries)", ("endpoint", "outcome")
+)
+CACHE_LOOKUP_LATENCY = metrics.histogram(
+    "cache_lookup_duration_seconds", "Tempo de busca nos caches", ("cache",), buckets=FAST_BUCKETS
+)
+CACHE_RESULTS = metrics.counter(
+    "rawg_cache_requests_total", "Resultado de cada busca de dados do RAWG: fresh, stale, derived, negative, miss, stale_fallback",
+    ("result",)
+)
+RESPONSE_CACHE_RESULTS = metrics.counter(
+    "response_cache_requests_total", "Resultado do cache de respostas (hit, miss) e respostas 304 (not_modified)", ("result",)
+)
+SERIALIZATION_LATENCY = metrics.histogram(
+    "json_serialization_duration_seconds", "Tempo de serialização JSON das respostas", buckets=FAST_BUCKETS
+)
+
+RESPONSE_BYTES = metrics.counter(
+    "response_body_bytes_total", "Bytes de corpo enviados pelas rotas com cache de respostas, por codificação",
+    ("encoding",)
+)
+
+class InstrumentedJSONProvider(FastJSONProvider):
+    """Provider JSON rápido (json_provider.py), medindo o tempo de cada serialização"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            SERIALIZATION_LATENCY.observe(time.perf_counter() - started)
+
+app.json = InstrumentedJSONProvider(app)
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Profiler opcional: uma fração das requisições (PROFILE_SAMPLE_RATE, 0 = desligado)
+# roda com cProfile; se passar de PROFILE_SLOW_MS, o perfil vai para o log.
+# Só a thread da requisição é perfilada (não as threads de fan-out).
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 500))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", 25))
+
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    incoming = request.headers.get("X-Request-ID", "")
+    g.request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex[:16]
+    g.request_id_token = request_id_var.set(g.request_id)
+    REQUESTS_IN_FLIGHT.inc()
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+# Roda antes de qualquer outro before_request (inclusive o rate limit), para medir tudo
+app.before_request_funcs.setdefault(None, []).insert(0, start_request_metrics)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("request_started")
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_LATENCY.observe(elapsed, route, request.method, str(response.status_code))
+    response.headers["X-Request-ID"] = g.request_id
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        if elapsed * 1000 >= PROFILE_SLOW_MS:
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            logger.warning("Slow request profile", extra={
+                "route": route, "duration_ms": round(elapsed * 1000, 1), "profile": output.getvalue()
+            })
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        REQUESTS_IN_FLIGHT.dec()
+        request_id_var.reset(token)
+
+def endpoint_group(endpoint):
+    """Endpoint do RAWG sem ids, para não criar uma série de métricas por jogo"""
+    return re.sub(r"/\d+", "/{id}", endpoint)
+
+_timing_lock = threading.Lock()
+
+def _record_upstream_timing(timing):
+    """Acumula o tempo gasto no RAWG durante a requisição atual (para o header Server-Timing)"""
+    if has_request_context():
+        with _timing_lock:
+            g.upstream_ms = g.get("upstream_ms", 0.0) + timing.elapsed_ms
+            g.upstream_calls = g.get("upstream_calls", 0) + 1
+
+# Governador de quota do RAWG: token bucket + orçamentos diário e mensal, com
+# prioridades. Quando a quota aperta, as chamadas de baixa prioridade são negadas
+# e as rotas respondem com dados do cache (mesmo stale) ou do catálogo local;
+# sem nada local, com 503 e Retry-After. O plano gratuito do RAWG tem 20 mil
+# chamadas por mês. As taxas são por worker: o burst cobre o maior fan-out de uma
+# requisição (o batch: 2 chamadas por id), e o trabalho em segundo plano tem um
+# bucket próprio, que não consome as fichas das requisições.
+RAWG_RATE_BURST = int(os.getenv("RAWG_RATE_BURST", 80))
+quota = QuotaGovernor(
+    os.getenv("QUOTA_DB_PATH", os.path.join(DATA_DIR, "quota.sqlite3")),
+    daily_budget=int(os.getenv("RAWG_DAILY_BUDGET", 1000)),
+    monthly_budget=int(os.getenv("RAWG_MONTHLY_BUDGET", 20000)),
+    rate=float(os.getenv("RAWG_RATE_PER_SECOND", 5)),
+    burst=RAWG_RATE_BURST,
+    background_rate=float(os.getenv("RAWG_BACKGROUND_RATE_PER_SECOND", 1)),
+    background_burst=int(os.getenv("RAWG_BACKGROUND_BURST", 40))
+)
+
+def _on_rawg_call(timing):
+    quota.record_calls(timing.attempts)
+    UPSTREAM_LATENCY.observe(timing.elapsed_ms / 1000, endpoint_group(timing.endpoint), "ok" if timing.ok else "error")
+    _record_upstream_timing(timing)
+
+# Trabalho em segundo plano (warm-up, listas ranqueadas) chama o RAWG com prioridade
+# LOW, mesmo passando pelas rotas normais; o contexto acompanha o fan-out.
+_background_work = contextvars.ContextVar("background_work", default=False)
+
+@contextlib.contextmanager
+def background_calls():
+    token = _background_work.set(True)
+    try:
+        yield
+    finally:
+        _background_work.reset(token)
+
+def call_priority(endpoint, params):
+    """Prioridade de uma chamada: detalhes e primeiras páginas antes de páginas profundas"""
+    if _background_work.get():
+        return LOW
+    if endpoint == "games":
+        if params.get("search"):
+            return NORMAL
+        return HIGH if int(params.get("page", 1)) <= 1 else LOW
+    return HIGH
+
+# Cliente HTTP do RAWG com pool de conexões, timeouts, retries e circuit breaker
+rawg = RawgClient(
+    RAWG_BASE_URL,
+    RAWG_API_KEY,
+    pool_size=int(os.getenv("RAWG_POOL_SIZE", 20)),
+    connect_timeout=float(os.getenv("RAWG_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("RAWG_READ_TIMEOUT", 10)),
+    max_retries=int(os.getenv("RAWG_MAX_RETRIES", 2)),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("RAWG_BREAKER_THRESHOLD", 5)),
+        reset_timeout=float(os.getenv("RAWG_BREAKER_RESET", 30))
+    ),
+    on_call=_on_rawg_call
+)
+
+@app.after_request
+def add_upstream_timing(response):
+    """Informa no header Server-Timing quanto da requisição foi gasto no RAWG"""
+    if "upstream_ms" in g:
+        response.headers["Server-Timing"] = f'rawg;dur={g.upstream_ms:.1f};desc="{g.upstream_calls} call(s)"'
+    return response
+
+# Cache LRU com política por endpoint para evitar requisições desnecessárias
+#   ttl:       tempo em que a entrada é considerada fresca
+#   hard_ttl:  até essa idade uma entrada stale é servida na hora enquanto é
+#              revalidada em segundo plano; depois disso a requisição espera o RAWG
+#   max_stale: quanto tempo após o ttl o último valor bom ainda pode ser servido
+#              se o RAWG falhar
+CachePolicy = namedtuple("CachePolicy", ["ttl", "hard_ttl", "max_stale"])
+
+def _cache_policy(name, ttl, hard_ttl, max_stale):
+    """Cria a política do endpoint, permitindo sobrescrever cada valor por variável de ambiente"""
+    return CachePolicy(
+        int(os.getenv(f"CACHE_TTL_{name}", ttl)),
+        int(os.getenv(f"CACHE_HARD_TTL_{name}", hard_ttl)),
+        int(os.getenv(f"CACHE_MAX_STALE_{name}", max_stale))
+    )
+
+CACHE_DURATION = 300  # 5 minutos (TTL padrão)
+CACHE_POLICIES = {
+    "default": _cache_policy("DEFAULT", CACHE_DURATION, 30 * 60, 6 * 3600),
+    "genres": _cache_policy("GENRES", 6 * 3600, 24 * 3600, 7 * 24 * 3600),
+    "platforms": _cache_policy("PLATFORMS", 6 * 3600, 24 * 3600, 7 * 24 * 3600),
+    "games/": _cache_policy("DETAILS", 3600, 6 * 3600, 24 * 3600),  # detalhes e screenshots
+    "search": _cache_policy("SEARCH", 120, 600, 3600)
+}
+
+cache = TTLCache(
+    max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 2048)),
+    max_bytes=int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    default_ttl=CACHE_DURATION
+)
+
+# L2 compartilhado entre os workers do gunicorn (desative com CACHE_L2=off)
+if os.getenv("CACHE_L2", "sqlite") != "off":
+    cache = TieredCache(cache, SQLiteCache(
+        os.getenv("CACHE_DB_PATH", os.path.join(DATA_DIR, "rawg_cache.sqlite3")),
+        max_entries=int(os.getenv("CACHE_L2_MAX_ENTRIES", 50000))
+    ))
+
+# Incrementar quando o formato dos valores em cache mudar (o L2 sobrevive a deploys)
+CACHE_KEY_VERSION = 2  # 2: registros compactos (games.py) em vez do JSON do RAWG
 
 def get_cache_key(endpoint, params):
-    """Gera uma chave única para cache baseada no endpoint e parâmetros"""
-    sorted_params = sorted(params.items()) if params else []
-    return f"{endpoint}_{hash(str(sorted_params))}"
+    """Gera uma chave determinística para cache baseada no endpoint e parâmetros
+
+    Usa sha1 em vez de hash() (aleatório por processo) para que a mesma chave
+    seja gerada em todos os workers e após reinícios. A chave da API é ignorada.
+    Os parâmetros passam por canonical_params: consultas equivalentes ("Zelda"
+    e " zelda", gêneros em outra ordem, page=1) dão a mesma chave.
+    """
+    filtered = {k: v for k, v in canonical_params(endpoint, params).items() if k != "key"}
+    digest = hashlib.sha1(json.dumps(filtered, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"v{CACHE_KEY_VERSION}:{endpoint}_{digest[:24]}"
+
+def get_cache_policy(endpoint, params):
+    """Retorna a política de cache do endpoint (buscas expiram mais rápido)"""
+    if params and params.get("search"):
+        return CACHE_POLICIES["search"]
+    if endpoint in CACHE_POLICIES:
+        return CACHE_POLICIES[endpoint]
+    if endpoint.startswith("games/"):
+        return CACHE_POLICIES["games/"]
+    return CACHE_POLICIES["default"]
+
+# Cache negativo: falhas também ficam registradas por pouco tempo, para que um id
+# inexistente (404) ou um RAWG fora do ar não sejam consultados a cada requisição.
+# Negações da quota e do circuit breaker são decisões locais e não entram.
+NEGATIVE_TTL_NOT_FOUND = int(os.getenv("CACHE_NEGATIVE_TTL_NOT_FOUND", 300))
+NEGATIVE_TTL_ERROR = int(os.getenv("CACHE_NEGATIVE_TTL_ERROR", 15))
+
+def _failure_key(cache_key):
+    return f"{cache_key}:failed"
+
+def remember_failure(cache_key, error):
+    """Registra a falha de uma chave (404 por mais tempo que erros transitórios)"""
+    if isinstance(error, (QuotaExceeded, CircuitOpenError)):
+        return
+    status_code = getattr(error, "status_code", None)
+    ttl = NEGATIVE_TTL_NOT_FOUND if isinstance(error, RawgHTTPError) and status_code == 404 else NEGATIVE_TTL_ERROR
+    if ttl > 0:
+        cache.set(_failure_key(cache_key), status_code or 0, ttl=ttl)
+
+def recent_failure(cache_key):
+    return cache.get_entry(_failure_key(cache_key), count=False) is not None
+
+def derived_listing(endpoint, params):
+    """Página da listagem servida como fatia de uma página maior da mesma consulta já em cache.
+
+    Ex.: o typeahead (search=zelda, page_size=8) reaproveita a página de 40 da
+    busca feita pela listagem; page=2&page_size=20 sai da primeira página de 40.
+    Só usa páginas frescas; `params` já deve estar na forma canônica.
+    """
+    if endpoint != "games":
+        return None
+    for covering, offset in covering_pages(params):
+        cache_key = get_cache_key(endpoint, covering)
+        entry = cache.get_entry(cache_key, count=False)
+        if entry is not None and entry.is_fresh():
+            prefetcher.record_use(cache_key)
+            return entry.data.slice(offset, params.get("page_size", 20))
+    return None
+
+def stale_fallback(entry, policy, endpoint, error=None):
+    """Depois de uma falha: o último valor bom dentro da janela de max_stale, ou None.
+
+    Se a quota negou a chamada, serve qualquer valor que ainda estiver no cache.
+    """
+    if entry is not None and (isinstance(error, QuotaExceeded) or time.time() - entry.fresh_until <= policy.max_stale):
+        CACHE_RESULTS.inc("stale_fallback")
+        logger.info("Serving stale data", extra={"endpoint": endpoint})
+        return entry.data
+    return None
+
+# Coalescência de requisições: misses concorrentes da mesma chave esperam uma única chamada ao RAWG
+singleflight = SingleFlight()
+refresh_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CACHE_REFRESH_WORKERS", 4)),
+    thread_name_prefix="rawg-refresh"
+)
+
+def _fetch_and_store(endpoint, params, cache_key, policy, priority=NORMAL):
+    """Busca no RAWG e grava no cache, mantendo a entrada como stale até o fim da política"""
+    quota.acquire(priority)
+    # Cada nova tentativa também é uma chamada ao RAWG: passa pela quota
+    data = project(endpoint, rawg.get(endpoint, params, before_retry=functools.partial(quota.acquire, priority)))
+    index_fetched_games(endpoint, data)
+    
+    # Armazenar no cache
+    stale_ttl = max(policy.hard_ttl - policy.ttl, policy.max_stale)
+    cache.set(cache_key, data, ttl=policy.ttl, stale_ttl=stale_ttl)
+    
+    logger.info("RAWG call", extra={"endpoint": endpoint})
+    return data
+
+def _refresh_in_background(endpoint, params, cache_key, policy):
+    """Agenda uma revalidação da chave, a menos que já exista uma em andamento"""
+    if singleflight.in_flight(cache_key):
+        return
+
+    def refresh():
+        try:
+            # Já temos um valor (stale) para servir: a revalidação tem prioridade baixa
+            singleflight.do(cache_key, _fetch_and_store, endpoint, params, cache_key, policy, LOW)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Background refresh failed", extra={"endpoint": endpoint, "error": str(e)})
 
-def is_cache_valid(cache_entry):
-    """Verifica se o cache ainda é válido"""
-    return datetime.now() - cache_entry["timestamp"] < timedelta(seconds=CACHE_DURATION)
+    refresh_executor.submit(refresh)
 
 # Função para fazer requisições à API RAWG com cache
-def fetch_from_rawg(endpoint, params=None):
-    if params is None:
-        params = {}
-    params["key"] = RAWG_API_KEY
+def fetch_from_rawg(endpoint, params=None, priority=None):
+    params = canonical_params(endpoint, params)
+    if priority is None:
+        priority = call_priority(endpoint, params)
     
     # Verificar cache
     cache_key = get_cache_key(endpoint, params)
-    if cache_key in cache and is_cache_valid(cache[cache_key]):
-        print(f"Cache hit for {endpoint}")
-        return cache[cache_key]["data"]
+    policy = get_cache_policy(endpoint, params)
+    started = time.perf_counter()
+    entry = cache.get_entry(cache_key)
+    CACHE_LOOKUP_LATENCY.observe(time.perf_counter() - started, "data")
+    if entry is not None:
+        prefetcher.record_use(cache_key)
+        now = time.time()
+        if entry.is_fresh(now):
+            CACHE_RESULTS.inc("fresh")
+            logger.debug("Cache hit", extra={"endpoint": endpoint})
+            return entry.data
+        if now - entry.stored_at < policy.hard_ttl:
+            # Stale-while-revalidate: responde na hora e atualiza em segundo plano
+            CACHE_RESULTS.inc("stale")
+            logger.debug("Stale cache hit", extra={"endpoint": endpoint})
+            _refresh_in_background(endpoint, params, cache_key, policy)
+            return entry.data
+
+    derived = derived_listing(endpoint, params)
+    if derived is not None:
+        CACHE_RESULTS.inc("derived")
+        return derived
+    if recent_failure(cache_key):
+        CACHE_RESULTS.inc("negative")
+        return stale_fallback(entry, policy, endpoint)
     
+    CACHE_RESULTS.inc("miss")
     try:
-        response = requests.get(f"{RAWG_BASE_URL}/{endpoint}", params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Armazenar no cache
-        cache[cache_key] = {
-            "data": data,
-            "timestamp": datetime.now()
-        }
-        
-        print(f"API call made for {endpoint}")
+        data, shared = singleflight.do(cache_key, _fetch_and_store, endpoint, params, cache_key, policy, priority)
+        if shared:
+            logger.debug("Coalesced request", extra={"endpoint": endpoint})
         return data
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching from RAWG API: {e}")
-        return None
+        logger.warning("Error fetching from RAWG API", extra={"endpoint": endpoint, "error": str(e)})
+        remember_failure(cache_key, e)
+        # Se o RAWG falhar, serve o último valor bom dentro da janela de max_stale
+        data = stale_fallback(entry, policy, endpoint, e)
+        if data is None and isinstance(e, QuotaExceeded):
+            # Nada em cache e a quota negou: não é "não encontrado", a rota responde 503
+            raise
+        return data
+
+# Cache das respostas já serializadas (corpo + ETag) das rotas de leitura.
+# Um hit responde direto dos bytes guardados; com If-None-Match igual, 304 sem corpo.
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 4096)),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE", "on") != "off"
+
+def _cached_body_response(cached, max_age, stale_while_revalidate):
+    if cached.max_age is not None:
+        max_age, stale_while_revalidate = cached.max_age, 0
+    # Versão comprimida já pronta (gzip ou brotli), conforme o Accept-Encoding
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"), cached.encodings)
+    if etag_matches(request.headers.get("If-None-Match"), cached.etag):
+        RESPONSE_CACHE_RESULTS.inc("not_modified")
+        response = app.response_class(status=304)
+    else:
+        body = cached.encodings[encoding] if encoding else cached.body
+        RESPONSE_BYTES.inc(encoding or "identity", amount=len(body))
+        response = app.response_class(body, mimetype="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.headers["ETag"] = encoded_etag(cached.etag, encoding)
+    response.headers["Cache-Control"] = cache_control(max_age, stale_while_revalidate)
+    response.vary.add("Accept-Encoding")
+    return response
+
+# Respostas com parte dos dados faltando (RAWG fora do ar) ficam pouco tempo em
+# cache, no servidor e no cliente, para não prender a falha por minutos
+PARTIAL_RESPONSE_TTL = 10
+
+def degraded_max_age(ttl, server_ttl, max_age):
+    """max-age de uma resposta cujo TTL a rota encurtou (None = o max-age normal da rota)"""
+    return min(ttl, max_age) if ttl < server_ttl else None
+
+def cached_response(max_age, stale_while_revalidate=0, ttl=None):
+    """Decorator das rotas de leitura: guarda a resposta serializada por requisição canônica.
+
+    `max_age`/`stale_while_revalidate` vão no header Cache-Control; `ttl` é por
+    quanto tempo o servidor reaproveita os bytes (por padrão igual ao max_age).
+    Só respostas 200 são guardadas. Uma resposta degradada (parte do RAWG
+    falhou) define g.response_cache_ttl = PARTIAL_RESPONSE_TTL: fica pouco
+    tempo no servidor e o cliente recebe o mesmo max-age curto.
+    """
+    server_ttl = max_age if ttl is None else ttl
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = canonical_key(request.path, request.args.items(multi=True))
+            started = time.perf_counter()
+            cached = response_cache.get(key) if RESPONSE_CACHE_ENABLED else None
+            CACHE_LOOKUP_LATENCY.observe(time.perf_counter() - started, "response")
+            if cached is None:
+                RESPONSE_CACHE_RESULTS.inc("miss")
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                # A rota pode encurtar o TTL de uma resposta específica (ex.: /api/home parcial)
+                ttl = g.pop("response_cache_ttl", server_ttl)
+                cached = response_cache.put(key, response.get_data(), ttl if RESPONSE_CACHE_ENABLED else 0,
+                                            degraded_max_age(ttl, server_ttl, max_age))
+            else:
+                RESPONSE_CACHE_RESULTS.inc("hit")
+            return _cached_body_response(cached, max_age, stale_while_revalidate)
+        return wrapper
+    return decorator
+
+# A quota do RAWG negou a chamada e não havia nada local para servir: o dado
+# existe, só não pode ser buscado agora (503 com Retry-After, não 404 nem 500)
+def quota_exceeded_payload(error):
+    """Retorna (payload, headers) da resposta a uma QuotaExceeded"""
+    return {
+        "status": "error",
+        "message": "RAWG quota exhausted, try again later"
+    }, {"Retry-After": str(error.retry_after)}
+
+@app.errorhandler(QuotaExceeded)
+def quota_exceeded(error):
+    payload, headers = quota_exceeded_payload(error)
+    return jsonify(payload), 503, headers
+
+def health_payload():
+    return {
+        "status": "healthy",
+        "message": "Game Review API is running",
+        "cache_size": len(cache),
+        "cache": cache.stats(),
+        "singleflight": singleflight.stats(),
+        "rawg": rawg.stats(),
+        "reviews": review_store.stats(),
+        "response_cache": response_cache.stats(),
+        "prefetch": prefetcher.stats(),
+        "ranked_lists": ranked_lists.stats(),
+        "news": news_store.stats()
+    }
 
 # Rota de saúde
 @app.route("/api/health")
 def health():
-    return jsonify({
-        "status": "healthy",
-        "message": "Game Review API is running",
-        "cache_size": len(cache)
-    })
+    return jsonify(health_payload())
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+@metrics.collector
+def collect_component_stats():
+    """Converte os stats() dos componentes em métricas (lidos só na hora da coleta)"""
+    data_cache = cache.stats()
+    l2 = data_cache.get("l2", {})
+    responses = response_cache.stats()
+    flights = singleflight.stats()
+    upstream = rawg.stats()
+    prefetch = prefetcher.stats()
+    quota_stats = quota.stats()
+    reviews_stats = review_store.stats()
+    news_stats = news_store.stats()
+    return [
+        ("cache_entries", "gauge", "Entradas por cache",
+         [({"cache": "data_l1"}, data_cache["entries"]), ({"cache": "data_l2"}, l2.get("entries", 0)),
+          ({"cache": "response"}, responses["entries"])]),
+        ("cache_bytes", "gauge", "Bytes ocupados por cache em memória",
+         [({"cache": "data_l1"}, data_cache["bytes"]), ({"cache": "response"}, responses["bytes"])]),
+        ("cache_hits_total", "counter", "Hits por cache",
+         [({"cache": "data_l1"}, data_cache["hits"]), ({"cache": "data_l2"}, l2.get("hits", 0)),
+          ({"cache": "response"}, responses["hits"])]),
+        ("cache_misses_total", "counter", "Misses por cache",
+         [({"cache": "data_l1"}, data_cache["misses"]), ({"cache": "data_l2"}, l2.get("misses", 0)),
+          ({"cache": "response"}, responses["misses"])]),
+        ("cache_evictions_total", "counter", "Entradas descartadas por falta de espaço",
+         [({"cache": "data_l1"}, data_cache["evictions"]), ({"cache": "response"}, responses["evictions"])]),
+        ("singleflight_coalesced_total", "counter", "Requisições que aguardaram uma busca já em andamento",
+         [({}, flights["coalesced"])]),
+        ("rawg_calls_total", "counter", "Chamadas ao RAWG", [({}, upstream["calls"])]),
+        ("rawg_failures_total", "counter", "Chamadas ao RAWG que falharam", [({}, upstream["failures"])]),
+        ("rawg_retries_total", "counter", "Novas tentativas de chamadas ao RAWG", [({}, upstream["retries"])]),
+        ("rawg_breaker_state", "gauge", "Circuit breaker do RAWG: 0 fechado, 1 meio aberto, 2 aberto",
+         [({}, BREAKER_STATES.get(upstream["breaker"]["state"], 0))]),
+        ("prefetch_total", "counter", "Pré-buscas por resultado",
+         [({"result": key}, prefetch[key]) for key in ("scheduled", "fetched", "failed", "hits", "wasted",
+                                                        "skipped_busy", "skipped_budget")]),
+        ("rawg_quota_used", "gauge", "Chamadas ao RAWG consumidas no período (todos os workers)",
+         [({"period": "daily"}, quota_stats["daily"]["used"]), ({"period": "monthly"}, quota_stats["monthly"]["used"])]),
+        ("rawg_quota_budget", "gauge", "Orçamento de chamadas ao RAWG no período",
+         [({"period": "daily"}, quota_stats["daily"]["budget"]),
+          ({"period": "monthly"}, quota_stats["monthly"]["budget"])]),
+        ("rawg_quota_denied_total", "counter", "Chamadas negadas pelo governador de quota",
+         [({"priority": name}, count) for name, count in quota_stats["denied"].items()]),
+        ("reviews_pending", "gauge", "Avaliações na fila de escrita", [({}, reviews_stats["pending"])]),
+        ("reviews_rejected_total", "counter", "Avaliações recusadas com a fila cheia", [({}, reviews_stats["rejected"])]),
+        ("reviews_write_retries_total", "counter", "Lotes de avaliações regravados após erro do SQLite",
+         [({}, reviews_stats["retries"])]),
+        ("reviews_failed_total", "counter", "Avaliações que não puderam ser gravadas", [({}, reviews_stats["failed"])]),
+        ("news_items", "gauge", "Notícias no banco local", [({}, news_stats["items"])])
+    ]
+
+# Métricas deste worker no formato de texto do Prometheus (cada worker do
+# gunicorn tem as suas; o scraper deve coletar cada um ou agregar no proxy)
+@app.route("/api/metrics")
+@limiter.exempt
+def get_metrics():
+    return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# Catálogo local de jogos: permite responder listagens sem chamar o RAWG.
+# É preenchido pelo comando `flask sync-catalog` ou pela sincronização periódica abaixo.
+catalog = GameCatalog(os.getenv("CATALOG_DB_PATH", os.path.join(DATA_DIR, "catalog.sqlite3")))
+CATALOG_MIN_GAMES = int(os.getenv("CATALOG_MIN_GAMES", 200))  # abaixo disso o catálogo não é usado
+CATALOG_SYNC_INTERVAL = int(os.getenv("CATALOG_SYNC_INTERVAL", 0))  # segundos; 0 desativa
+CATALOG_SYNC_PAGES = int(os.getenv("CATALOG_SYNC_PAGES", 25))
+
+def query_catalog(params):
+    """Tenta responder uma listagem de games pelo catálogo local; retorna None se não souber.
+
+    Um catálogo ainda em preenchimento só responde o que já tem por inteiro
+    (GameCatalog.listing); o resto vai ao RAWG, para o total e o has_next
+    não saírem das poucas linhas locais.
+    """
+    if catalog.count() < CATALOG_MIN_GAMES:
+        return None
+    try:
+        return catalog.listing(params)
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning("Catalog query failed, falling back to RAWG", extra={"error": str(e)})
+        return None
+
+def fetch_games_listing(params):
+    """Listagem de games pelo catálogo local, com o RAWG como fallback para o que não temos"""
+    data = query_catalog(params)
+    if data is not None:
+        return data
+    try:
+        data = fetch_from_rawg("games", params)
+    except QuotaExceeded:
+        # Sem quota, só o catálogo local serve; sem ele, a negação chega à rota
+        data = query_local_fallback(params)
+        if data is None:
+            raise
+        return data
+    if data is None:
+        data = query_local_fallback(params)
+    return data
+
+def query_local_fallback(params):
+    """Sem RAWG (falha ou quota): responde pelo catálogo mesmo que ele ainda esteja incompleto"""
+    try:
+        if catalog.count() > 0:
+            return catalog.query(params)
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning("Catalog fallback failed", extra={"error": str(e)})
+    return None
+
+def _fetch_catalog_page(params):
+    # A sincronização é trabalho em segundo plano: prioridade LOW, inclusive nos retries
+    quota.acquire(LOW)
+    return rawg.get("games", params, before_retry=functools.partial(quota.acquire, LOW))
+
+@app.cli.command("sync-catalog")
+@click.option("--pages", default=CATALOG_SYNC_PAGES, show_default=True, help="Máximo de páginas do RAWG por execução")
+@click.option("--fixtures", default=None, help="Diretório com páginas gravadas (games_page_<n>.json), para rodar sem rede")
+def sync_catalog_command(pages, fixtures):
+    """Sincroniza o catálogo local com a listagem de games do RAWG"""
+    fetch_page = RecordedFetcher(fixtures) if fixtures else _fetch_catalog_page
+    print(sync_catalog(catalog, fetch_page, max_pages=pages))
+
+def _catalog_sync_loop():
+    lock_path = os.path.join(DATA_DIR, "catalog.lock")
+    while True:
+        try:
+            with open(lock_path, "w") as lock_file:
+                # Só um worker sincroniza por vez, e no máximo uma vez por intervalo
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if time.time() - float(catalog.get_state("last_sync_at", 0)) >= CATALOG_SYNC_INTERVAL:
+                    result = sync_catalog(catalog, _fetch_catalog_page, max_pages=CATALOG_SYNC_PAGES)
+                    logger.info("Catalog sync finished", extra=result)
+                    catalog.set_state("last_sync_at", time.time())
+        except BlockingIOError:
+            pass
+        except (requests.exceptions.RequestException, sqlite3.Error) as e:
+            logger.warning("Catalog sync failed", extra={"error": str(e)})
+        time.sleep(CATALOG_SYNC_INTERVAL)
+
+if CATALOG_SYNC_INTERVAL > 0:
+    threading.Thread(target=_catalog_sync_loop, name="catalog-sync", daemon=True).start()
+
+# Pré-busca da próxima página do scroll infinito: quando /api/games serve a página N
+# de um conjunto de filtros, a página N+1 é buscada no RAWG em segundo plano,
+# dentro de um orçamento de concorrência e de chamadas por minuto.
+prefetcher = Prefetcher(
+    max_in_flight=int(os.getenv("PREFETCH_MAX_IN_FLIGHT", 2)),
+    max_per_minute=int(os.getenv("PREFETCH_MAX_PER_MINUTE", 30))
+)
+PREFETCH_ENABLED = os.getenv("PREFETCH", "on") != "off"
+
+def _prefetch_listing(params, cache_key):
+    """Busca a página no RAWG se ela não estiver no catálogo nem fresca no cache"""
+    if query_catalog(params) is not None:
+        return False
+    entry = cache.get_entry(cache_key, count=False)
+    if entry is not None and entry.is_fresh():
+        return False
+    singleflight.do(cache_key, _fetch_and_store, "games", params, cache_key, get_cache_policy("games", params), LOW)
+    return True
+
+def prefetch_next_page(params, data):
+    """Agenda a pré-busca da página seguinte de uma listagem de games"""
+    if not PREFETCH_ENABLED or not data.has_next:
+        return
+    next_params = dict(params, page=params["page"] + 1)
+    cache_key = get_cache_key("games", next_params)
+    prefetcher.schedule(cache_key, _prefetch_listing, next_params, cache_key)
+
+# Índice de nomes em memória para o autocomplete (/api/games/suggest). É carregado
+# do catálogo por uma thread em segundo plano (nunca dentro de uma requisição) e
+# atualizado com cada jogo que buscamos no RAWG.
+name_index = NameIndex()
+SUGGEST_MAX_RESULTS = 20
+SUGGEST_UPSTREAM_FALLBACK = os.getenv("SUGGEST_UPSTREAM_FALLBACK", "1") != "0"
+NAME_INDEX_REFRESH_INTERVAL = int(os.getenv("NAME_INDEX_REFRESH_INTERVAL", 60))  # 0 desativa
+_name_index_lock = threading.Lock()
+_name_index_catalog_count = -1
+
+def refresh_name_index():
+    """Recarrega os jogos do catálogo no índice quando o catálogo mudou de tamanho"""
+    global _name_index_catalog_count
+    count = catalog.count()
+    if count == _name_index_catalog_count or not _name_index_lock.acquire(blocking=False):
+        return
+    try:
+        name_index.add_games(catalog.iter_games())
+        _name_index_catalog_count = count
+    except sqlite3.Error as e:
+        logger.warning("Failed to load catalog into name index", extra={"error": str(e)})
+    finally:
+        _name_index_lock.release()
+
+def _name_index_loop():
+    while True:
+        refresh_name_index()
+        time.sleep(NAME_INDEX_REFRESH_INTERVAL)
+
+if NAME_INDEX_REFRESH_INTERVAL > 0:
+    threading.Thread(target=_name_index_loop, name="name-index", daemon=True).start()
+
+def index_fetched_games(endpoint, data):
+    """Alimenta o índice de nomes com os jogos de uma resposta do RAWG (já projetada)"""
+    if endpoint == "games":
+        name_index.add_games(data.games)
+    elif endpoint.startswith("games/") and endpoint.count("/") == 1:
+        name_index.add_games([data])
+
+def suggest_params(args):
+    query = args.get("q", "").strip()
+    limit = min(max(args.get("limit", 8, type=int), 1), SUGGEST_MAX_RESULTS)
+    return query, limit
+
+def suggest_payload(query, games, media_opts=DEFAULT_MEDIA):
+    return {
+        "status": "success",
+        "query": query,
+        # Cópias: os dicts do índice de nomes são compartilhados entre requisições
+        "games": [media.apply(dict(game), "card", media_opts) for game in games]
+    }
+
+# Rota de autocomplete: responde pelo índice em memória, sem chamar o RAWG
+@app.route("/api/games/suggest")
+@cached_response(300, 600)
+def suggest_games():
+    query, limit = suggest_params(request.args)
+    if len(query) < 2:
+        return jsonify(suggest_payload(query, []))
+
+    games = name_index.search(query, limit)
+    if not games and SUGGEST_UPSTREAM_FALLBACK:
+        # Nome desconhecido: busca uma vez no RAWG (os resultados entram no índice)
+        try:
+            data = fetch_from_rawg("games", {"search": query, "page_size": limit})
+        except QuotaExceeded:
+            data = None
+        if data:
+            games = [suggestion(game) for game in data.games[:limit]]
+        else:
+            # RAWG falhou: a lista vazia não é a resposta de verdade
+            g.response_cache_ttl = PARTIAL_RESPONSE_TTL
+
+    return jsonify(suggest_payload(query, games, media_options(request.args)))
+
+# As rotas de leitura são divididas em duas partes: montar os parâmetros do RAWG
+# a partir da query string e montar o payload a partir da resposta do RAWG.
+# Assim o servidor assíncrono (async_app.py) reaproveita a mesma lógica.
+
+def popular_games_params(args):
+    return {
+        "ordering": "-added",
+        "page": args.get("page", 1, type=int),
+        "page_size": args.get("page_size", 12, type=int)
+    }
+
+def popular_games_payload(data, params, media_opts=DEFAULT_MEDIA):
+    return {
+        "status": "success",
+        "games": [media.apply(game.to_dict(), "card", media_opts) for game in data.games],
+        "page": params["page"],
+        "page_size": params["page_size"],
+        "total": data.count,
+        "next": data.has_next,
+        "previous": data.has_previous
+    }
 
 # Rota para jogos populares
 @app.route("/api/games/popular")
+@cached_response(60, 300)
 def get_popular_games():
-    page = request.args.get("page", 1, type=int)
-    page_size = request.args.get("page_size", 12, type=int)
-
-    data = fetch_from_rawg("games", {
-        "ordering": "-added",
-        "page": page,
-        "page_size": page_size
-    })
+    params = popular_games_params(request.args)
+    data = fetch_games_listing(params)
 
     if data:
-        games = []
-        for game in data.get("results", []):
-            games.append({
-                "id": game.get("id"),
-                "name": game.get("name"),
-                "background_image": game.get("background_image"),
-                "rating": game.get("rating"),
-                "released": game.get("released"),
-                "genres": [genre["name"] for genre in game.get("genres", [])],
-                "platforms": [platform["platform"]["name"] for platform in game.get("platforms", [])]
-            })
-
-        return jsonify({
-            "status": "success",
-            "games": games,
-            "page": page,
-            "page_size": page_size,
-            "total": data.get("count", 0),
-            "next": data.get("next") is not None,
-            "previous": data.get("previous") is not None
-        })
+        return jsonify(popular_games_payload(data, params, media_options(request.args)))
 
     return jsonify({
         "status": "error",
         "message": "Failed to fetch popular games"
     }), 500
 
-# Rota para jogos recentes (2024-2025)
-@app.route("/api/games/recent")
-def get_recent_games():
-    page = request.args.get("page", 1, type=int)
-    page_size = request.args.get("page_size", 12, type=int)
+# Listas ranqueadas materializadas: calculadas em segundo plano a partir da
+# listagem de games (catálogo ou RAWG, via cache) e servidas como fatias, com
+# páginas sempre cheias e sem depender do RAWG na hora da requisição. Um único
+# worker por vez atualiza as listas e publica os snapshots no cache compartilhado;
+# os outros só releem de lá.
+RANKED_LISTS_SIZE = int(os.getenv("RANKED_LISTS_SIZE", 200))
+# Páginas de 40 suficientes para a lista, mais uma de folga para o filtro e os repetidos
+RANKED_LISTS_MAX_PAGES = int(os.getenv("RANKED_LISTS_MAX_PAGES", -(-RANKED_LISTS_SIZE // UPSTREAM_PAGE_SIZE) + 1))
+# Fração do orçamento diário do RAWG que as atualizações podem gastar no pior caso
+# (todas as páginas vindo do RAWG); define o intervalo padrão entre atualizações
+RANKED_LISTS_BUDGET_SHARE = float(os.getenv("RANKED_LISTS_BUDGET_SHARE", 0.1))
+# Com o catálogo completo as listas saem dele, sem chamadas ao RAWG, e são atualizadas mais vezes
+RANKED_LISTS_LOCAL_REFRESH_INTERVAL = int(os.getenv("RANKED_LISTS_LOCAL_REFRESH_INTERVAL", 600))
 
-    # Buscar jogos lançados entre 2024 e 2025
+def recent_dates():
+    # Jogos lançados do início do ano passado até o fim deste ano
     current_year = datetime.now().year
-    start_date = f"{current_year - 1}-01-01"  # 2024-01-01
-    end_date = f"{current_year}-12-31"        # 2025-12-31
+    return f"{current_year - 1}-01-01", f"{current_year}-12-31"
 
-    data = fetch_from_rawg("games", {
-        "ordering": "-released",
-        "page": page,
-        "page_size": page_size,
-        "dates": f"{start_date},{end_date}"  # Filtro de data para jogos recentes
-    })
+def _released_recently(game):
+    return bool(game.released) and game.released >= recent_dates()[0]
 
-    if data:
-        games = []
-        for game in data.get("results", []):
-            # Verificar se o jogo foi realmente lançado em 2024 ou 2025
-            released_date = game.get("released")
-            if released_date:
-                try:
-                    release_year = datetime.strptime(released_date, "%Y-%m-%d").year
-                    if release_year >= 2024:  # Apenas jogos de 2024 em diante
-                        games.append({
-                            "id": game.get("id"),
-                            "name": game.get("name"),
-                            "background_image": game.get("background_image"),
-                            "rating": game.get("rating"),
-                            "released": game.get("released"),
-                            "genres": [genre["name"] for genre in game.get("genres", [])],
-                            "platforms": [platform["platform"]["name"] for platform in game.get("platforms", [])]
-                        })
-                except ValueError:
-                    # Se não conseguir parsear a data, incluir mesmo assim
-                    games.append({
-                        "id": game.get("id"),
-                        "name": game.get("name"),
-                        "background_image": game.get("background_image"),
-                        "rating": game.get("rating"),
-                        "released": game.get("released"),
-                        "genres": [genre["name"] for genre in game.get("genres", [])],
-                        "platforms": [platform["platform"]["name"] for platform in game.get("platforms", [])]
-                    })
+ranked_lists = RankedLists(
+    fetch_games_listing,
+    max_pages=RANKED_LISTS_MAX_PAGES,
+    store=cache,
+    store_prefix=f"v{CACHE_KEY_VERSION}:ranked_list:"
+)
+ranked_lists.define(RankedList(
+    "recent-popular",
+    lambda: {"ordering": "-added", "dates": ",".join(recent_dates())},
+    keep=_released_recently,
+    size=RANKED_LISTS_SIZE
+))
+ranked_lists.define(RankedList(
+    "recent",
+    lambda: {"ordering": "-released", "dates": ",".join(recent_dates())},
+    keep=_released_recently,
+    size=RANKED_LISTS_SIZE
+))
+ranked_lists.define(RankedList(
+    "critic-picks",
+    lambda: {"ordering": "-metacritic", "metacritic": "70,100"},
+    keep=lambda game: bool(game.metacritic),
+    size=RANKED_LISTS_SIZE
+))
 
-        return jsonify({
-            "status": "success",
-            "games": games,
-            "page": page,
-            "page_size": page_size,
-            "total": data.get("count", 0),
-            "next": data.get("next") is not None,
-            "previous": data.get("previous") is not None
-        })
+# Padrão: 3 listas x 6 páginas dentro de 10% de 1000 chamadas por dia -> a cada ~4h20
+RANKED_LISTS_REFRESH_INTERVAL = int(os.getenv("RANKED_LISTS_REFRESH_INTERVAL") or math.ceil(
+    len(ranked_lists) * RANKED_LISTS_MAX_PAGES * 86400 / max(quota.daily_budget * RANKED_LISTS_BUDGET_SHARE, 1)
+))  # segundos; 0 desativa
+
+def _ranked_lists_loop():
+    lock_path = os.path.join(DATA_DIR, "ranked_lists.lock")
+    while True:
+        try:
+            with open(lock_path, "w") as lock_file:
+                # Só um worker atualiza por vez, e cada lista no máximo uma vez por intervalo
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                # Do catálogo completo as listas saem sem chamadas ao RAWG
+                local = catalog.backfill_progress()[0] and catalog.count() >= CATALOG_MIN_GAMES
+                with background_calls():
+                    ranked_lists.refresh_all(max_age=RANKED_LISTS_LOCAL_REFRESH_INTERVAL if local
+                                             else RANKED_LISTS_REFRESH_INTERVAL)
+        except BlockingIOError:
+            pass
+        except sqlite3.Error as e:
+            logger.warning("Ranked lists refresh failed", extra={"error": str(e)})
+        time.sleep(max(min(RANKED_LISTS_LOCAL_REFRESH_INTERVAL, RANKED_LISTS_REFRESH_INTERVAL), 60))
+
+if RANKED_LISTS_REFRESH_INTERVAL > 0:
+    threading.Thread(target=_ranked_lists_loop, name="ranked-lists", daemon=True).start()
+
+def ranked_list_params(args, default_page_size=12):
+    return {
+        "page": max(args.get("page", 1, type=int), 1),
+        "page_size": min(max(args.get("page_size", default_page_size, type=int), 1), 40)
+    }
+
+def ranked_list_page(name, params):
+    """Página de uma lista ranqueada (GamePage) ou None se a lista não puder ser calculada"""
+    try:
+        return ranked_lists.page(name, params["page"], params["page_size"])
+    except QuotaExceeded:
+        raise
+    except (LookupError, requests.exceptions.RequestException) as e:
+        logger.warning("Ranked list unavailable", extra={"list": name, "error": str(e)})
+        return None
+
+# Rota para jogos recentes (lançados do ano passado para cá)
+@app.route("/api/games/recent")
+@cached_response(60, 300)
+def get_recent_games():
+    params = ranked_list_params(request.args)
+    data = ranked_list_page("recent", params)
+
+    if data:
+        return jsonify(popular_games_payload(data, params, media_options(request.args)))
 
     return jsonify({
         "status": "error",
         "message": "Failed to fetch recent games"
     }), 500
 
-# Rota principal para jogos com filtros e paginação otimizada
-@app.route("/api/games")
-def get_games():
+# Rota para os jogos recentes mais populares (usada na página de jogos)
+@app.route("/api/games/recent-popular")
+@cached_response(60, 300)
+def get_recent_popular_games():
+    params = ranked_list_params(request.args)
+    data = ranked_list_page("recent-popular", params)
+
+    if data:
+        return jsonify(popular_games_payload(data, params, media_options(request.args)))
+
+    return jsonify({
+        "status": "error",
+        "message": "Failed to fetch recent popular games"
+    }), 500
+
+# Páginas lógicas de /api/games: até GAMES_MAX_PAGE_SIZE jogos por requisição,
+# montados a partir de páginas de 40 do RAWG (ou do catálogo) buscadas em paralelo.
+# Cada resposta traz um cursor opaco (pagination.next_cursor) com a posição no
+# upstream e um filtro de Bloom dos ids já entregues: continuando por ele, o scroll
+# infinito não repete jogos mesmo que a ordenação do RAWG mude entre as páginas.
+GAMES_MAX_PAGE_SIZE = int(os.getenv("GAMES_MAX_PAGE_SIZE", 120))
+cursor_codec = CursorCodec(
+    os.getenv("PAGINATION_SECRET", app.config["SECRET_KEY"]),
+    bloom_capacity=int(os.getenv("CURSOR_BLOOM_CAPACITY", 1000)),
+    bloom_error_rate=float(os.getenv("CURSOR_BLOOM_ERROR_RATE", 0.01))
+)
+
+def games_params(args):
     # Parâmetros de filtro
-    search = request.args.get("search", "").strip()
-    genres = request.args.get("genres", "").strip()
-    platforms = request.args.get("platforms", "").strip()
-    ordering = request.args.get("ordering", "-added")
-    page = request.args.get("page", 1, type=int)
-    page_size = min(request.args.get("page_size", 20, type=int), 40)  # Limitar a 40 por página
+    search = args.get("search", "").strip()
+    genres = args.get("genres", "").strip()
+    platforms = args.get("platforms", "").strip()
+    ordering = args.get("ordering", "-added")
+    page = args.get("page", 1, type=int)
+    page_size = min(max(args.get("page_size", 20, type=int), 1), GAMES_MAX_PAGE_SIZE)
 
     # Validar página
     if page < 1:
@@ -225,156 +1092,283 @@ def get_games():
     if platforms:
         params["platforms"] = platforms
 
-    data = fetch_from_rawg("games", params)
+    return params
 
-    if data:
-        games = []
-        seen_ids = set()  # Para evitar duplicatas
-        
-        for game in data.get("results", []):
-            game_id = game.get("id")
-            if game_id and game_id not in seen_ids:
-                seen_ids.add(game_id)
-                games.append({
-                    "id": game_id,
-                    "name": game.get("name"),
-                    "background_image": game.get("background_image"),
-                    "rating": game.get("rating", 0),
-                    "released": game.get("released"),
-                    "genres": [genre["name"] for genre in game.get("genres", [])],
-                    "platforms": [platform["platform"]["name"] for platform in game.get("platforms", [])],
-                    "metacritic": game.get("metacritic"),
-                    "playtime": game.get("playtime", 0)
-                })
-
-        # Informações de paginação
-        total_count = data.get("count", 0)
-        has_next = data.get("next") is not None
-        has_previous = data.get("previous") is not None
-        
-        # Calcular total de páginas
-        total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 1
+def games_cursor(args, params):
+    """Cursor da requisição: o do parâmetro `cursor` ou um novo, na posição de `page`.
 
-        return jsonify({
-            "status": "success",
-            "games": games,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total": total_count,
-                "total_pages": total_pages,
-                "has_next": has_next,
-                "has_previous": has_previous,
-                "next_page": page + 1 if has_next else None,
-                "previous_page": page - 1 if has_previous else None
-            },
-            # Manter compatibilidade com versão anterior
+    Levanta InvalidCursor se o token não for válido para os filtros pedidos.
+    """
+    query = query_fingerprint(params)
+    token = args.get("cursor", "").strip()
+    if not token:
+        return cursor_codec.new(query, offset=(params["page"] - 1) * params["page_size"])
+    cursor = cursor_codec.decode(token, query)
+    params["page"] = cursor.delivered // params["page_size"] + 1
+    return cursor
+
+def upstream_page_params(params, number):
+    return dict(params, page=number, page_size=UPSTREAM_PAGE_SIZE)
+
+def assemble_games_page(params, cursor):
+    """Monta a página lógica buscando as páginas do upstream em paralelo (fan-out)"""
+    assembly = Assembly(cursor, params["page_size"])
+    while True:
+        numbers = assembly.pages_needed()
+        if not numbers:
+            return assembly
+        futures = [submit_listing(upstream_page_params(params, number)) for number in numbers]
+        assembly.merge(numbers, [future.result() for _, future in futures])
+
+GAMES_FIELDS = CARD_FIELDS + ("metacritic", "playtime")
+
+def games_payload(data, params, media_opts=DEFAULT_MEDIA, next_cursor=None):
+    page = params["page"]
+    page_size = params["page_size"]
+
+    games = []
+    seen_ids = set()  # Para evitar duplicatas
+    
+    for game in data.games:
+        if game.id and game.id not in seen_ids:
+            seen_ids.add(game.id)
+            games.append(media.apply(game.to_dict(GAMES_FIELDS), "card", media_opts))
+
+    # Informações de paginação
+    total_count = data.count
+    has_next = data.has_next
+    has_previous = data.has_previous
+    
+    # Calcular total de páginas
+    total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 1
+
+    return {
+        "status": "success",
+        "games": games,
+        "pagination": {
             "page": page,
             "page_size": page_size,
-            "total": total_count
-        })
+            "total": total_count,
+            "total_pages": total_pages,
+            "has_next": has_next,
+            "has_previous": has_previous,
+            "next_page": page + 1 if has_next else None,
+            "previous_page": page - 1 if has_previous else None,
+            # Para continuar o scroll sem repetidos: /api/games?<mesmos filtros>&cursor=...
+            "next_cursor": next_cursor if has_next else None
+        },
+        # Manter compatibilidade com versão anterior
+        "page": page,
+        "page_size": page_size,
+        "total": total_count,
+        "next": has_next
+    }
+
+def games_page_response(params, assembly, media_opts):
+    """Payload de /api/games a partir da página montada (e pré-busca da próxima página do upstream)"""
+    data = assembly.result()
+    if data is None:
+        return None
+    if assembly.last_data is not None:
+        prefetch_next_page(upstream_page_params(params, assembly.last_page), assembly.last_data)
+    return games_payload(data, params, media_opts, cursor_codec.encode(assembly.cursor))
+
+# Rota principal para jogos com filtros e paginação otimizada
+@app.route("/api/games")
+@cached_response(60, 300)
+def get_games():
+    params = games_params(request.args)
+    try:
+        cursor = games_cursor(request.args, params)
+    except InvalidCursor as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid cursor: {e}"
+        }), 400
+
+    payload = games_page_response(params, assemble_games_page(params, cursor), media_options(request.args))
+    if payload:
+        return jsonify(payload)
 
     return jsonify({
         "status": "error",
         "message": "Failed to fetch games"
     }), 500
 
+CRITIC_REVIEWS_FIELDS = ("id", "name", "background_image", "metacritic", "released", "genres")
+
+def critic_reviews_payload(data, media_opts=DEFAULT_MEDIA):
+    return {
+        "status": "success",
+        "games": [
+            media.apply(game.to_dict(CRITIC_REVIEWS_FIELDS), "card", media_opts)
+            for game in data.games if game.metacritic
+        ]
+    }
+
 # Rota para jogos com base na pontuação do Metacritic (para a página de reviews de críticos)
 @app.route("/api/games/critic-reviews")
+@cached_response(300, 3600)
 def get_critic_reviews():
-    data = fetch_from_rawg("games", {
-        "ordering": "-metacritic",
-        "page_size": 20,
-        "metacritic": "70,100"
-    })
+    data = ranked_list_page("critic-picks", ranked_list_params(request.args, default_page_size=20))
     
     if data:
-        games = []
-        for game in data.get("results", []):
-            if game.get("metacritic"):
-                games.append({
-                    "id": game.get("id"),
-                    "name": game.get("name"),
-                    "background_image": game.get("background_image"),
-                    "metacritic": game.get("metacritic"),
-                    "released": game.get("released"),
-                    "genres": [genre["name"] for genre in game.get("genres", [])]
-                })
-        
-        return jsonify({
-            "status": "success",
-            "games": games
-        })
+        return jsonify(critic_reviews_payload(data, media_options(request.args)))
     
     return jsonify({
         "status": "error",
         "message": "Failed to fetch critic reviews"
     }), 500
 
+def genres_payload(data):
+    return {
+        "status": "success",
+        "genres": data
+    }
+
 # Rota para gêneros
 @app.route("/api/games/genres")
+@cached_response(3600, 24 * 3600)
 def get_genres():
     data = fetch_from_rawg("genres", {"page_size": 50})
     
     if data:
-        genres = [genre["name"] for genre in data.get("results", [])]
-        return jsonify({
-            "status": "success",
-            "genres": genres
-        })
+        return jsonify(genres_payload(data))
     
     return jsonify({
         "status": "error",
         "message": "Failed to fetch genres"
     }), 500
 
+def platforms_payload(data):
+    return {
+        "status": "success",
+        "platforms": data
+    }
+
 # Rota para plataformas
 @app.route("/api/games/platforms")
+@cached_response(3600, 24 * 3600)
 def get_platforms():
     data = fetch_from_rawg("platforms", {"page_size": 50})
     
     if data:
-        platforms = [platform["name"] for platform in data.get("results", [])]
-        return jsonify({
-            "status": "success",
-            "platforms": platforms
-        })
+        return jsonify(platforms_payload(data))
     
     return jsonify({
         "status": "error",
         "message": "Failed to fetch platforms"
     }), 500
 
+# Executor para buscar sub-recursos do RAWG em paralelo dentro de uma requisição
+fanout_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FANOUT_WORKERS", 8)),
+    thread_name_prefix="rawg-fanout"
+)
+# Cada id custa até 2 chamadas (detalhes e screenshots): o batch cabe no burst da quota
+BATCH_MAX_IDS = max(min(int(os.getenv("BATCH_MAX_IDS", 40)), RAWG_RATE_BURST // 2), 1)
+
+def submit_fetch(endpoint, params=None):
+    """Agenda fetch_from_rawg no executor de fan-out, mantendo o contexto da requisição atual"""
+    return fanout_executor.submit(contextvars.copy_context().run, fetch_from_rawg, endpoint, params)
+
+def submit_listing(params):
+    """Agenda fetch_games_listing no executor de fan-out; retorna (params, future)"""
+    return params, fanout_executor.submit(contextvars.copy_context().run, fetch_games_listing, params)
+
+def submit_ranked_list(name, params):
+    """Agenda ranked_list_page no executor de fan-out; retorna (params, future)"""
+    return params, fanout_executor.submit(contextvars.copy_context().run, ranked_list_page, name, params)
+
+def submit_game_details(game_id):
+    """Dispara em paralelo as buscas de detalhes e screenshots de um jogo"""
+    return submit_fetch(f"games/{game_id}"), submit_fetch(f"games/{game_id}/screenshots")
+
+DETAILS_FIELDS = ("id", "name", "description", "background_image", "rating", "metacritic", "released",
+                  "genres", "platforms", "developers", "publishers", "playtime")
+
+def build_game_details(game_data, screenshots_data, media_opts=DEFAULT_MEDIA):
+    """Monta o dict de detalhes do jogo a partir dos registros em cache (GameDetails e screenshots)"""
+    details = game_data.to_dict(DETAILS_FIELDS)
+    details["esrb_rating"] = game_data.esrb_rating or "Not Rated"
+    details["screenshots"] = screenshots_data or []
+    media.apply(details, "hero", media_opts)
+    return media.apply_screenshots(details, media_opts)
+
+def parse_batch_ids(args):
+    """Lê o parâmetro ids=1,2,3 (sem repetições); retorna (ids, mensagem de erro ou None)"""
+    ids = []
+    for raw_id in args.get("ids", "").split(","):
+        raw_id = raw_id.strip()
+        if raw_id.isdigit() and int(raw_id) not in ids:
+            ids.append(int(raw_id))
+
+    if not ids:
+        return ids, "Missing or invalid parameter: ids"
+    if len(ids) > BATCH_MAX_IDS:
+        return ids, f"Too many ids (max {BATCH_MAX_IDS})"
+    return ids, None
+
+def batch_payload(ids, results):
+    """Monta a resposta do batch; retorna (payload, status HTTP, headers).
+
+    `results` traz, para cada id, o dict do jogo, None (o jogo não existe ou o
+    RAWG falhou) ou a QuotaExceeded que impediu a busca. Os negados pela quota
+    vêm em "throttled", não em "missing": existem, só não puderam ser buscados agora.
+    """
+    denied = [result for result in results if isinstance(result, QuotaExceeded)]
+    if denied and len(denied) == len(ids):
+        payload, headers = quota_exceeded_payload(denied[0])
+        return payload, 503, headers
+    headers = {"Retry-After": str(max(error.retry_after for error in denied))} if denied else {}
+    return {
+        "status": "success",
+        "games": [result for result in results if isinstance(result, dict)],
+        "missing": [game_id for game_id, result in zip(ids, results) if result is None],
+        "throttled": [game_id for game_id, result in zip(ids, results) if isinstance(result, QuotaExceeded)]
+    }, 200, headers
+
+# Rota para detalhes de vários jogos de uma vez (ex.: /api/games/batch?ids=3498,3328)
+@app.route("/api/games/batch")
+@cached_response(600, 3600)
+def get_games_batch():
+    ids, error = parse_batch_ids(request.args)
+    if error:
+        return jsonify({
+            "status": "error",
+            "message": error
+        }), 400
+
+    # Dispara todas as buscas antes de esperar por qualquer uma; as que estão em cache voltam na hora
+    futures = [(game_id, submit_game_details(game_id)) for game_id in ids]
+    media_opts = media_options(request.args)
+
+    results = []
+    for game_id, (details_future, screenshots_future) in futures:
+        try:
+            game_data = details_future.result()
+            results.append(build_game_details(game_data, screenshots_future.result(), media_opts)
+                           if game_data else None)
+        except QuotaExceeded as e:
+            results.append(e)
+
+    payload, status, headers = batch_payload(ids, results)
+    if payload.get("missing") or payload.get("throttled"):
+        # Um id pode faltar só porque o RAWG falhou agora: não prende a lista incompleta no cache
+        g.response_cache_ttl = PARTIAL_RESPONSE_TTL
+    return jsonify(payload), status, headers
+
 # Rota para detalhes de um jogo específico
 @app.route("/api/games/<int:game_id>")
+@cached_response(600, 3600)
 def get_game_details(game_id):
-    game_data = fetch_from_rawg(f"games/{game_id}")
+    details_future, screenshots_future = submit_game_details(game_id)
+    game_data = details_future.result()
     
     if game_data:
-        screenshots_data = fetch_from_rawg(f"games/{game_id}/screenshots")
-        
-        game = {
-            "id": game_data.get("id"),
-            "name": game_data.get("name"),
-            "description": game_data.get("description_raw", ""),
-            "background_image": game_data.get("background_image"),
-            "rating": game_data.get("rating"),
-            "metacritic": game_data.get("metacritic"),
-            "released": game_data.get("released"),
-            "genres": [genre["name"] for genre in game_data.get("genres", [])],
-            "platforms": [platform["platform"]["name"] for platform in game_data.get("platforms", [])],
-            "developers": [dev["name"] for dev in game_data.get("developers", [])],
-            "publishers": [pub["name"] for pub in game_data.get("publishers", [])],
-            "esrb_rating": game_data.get("esrb_rating", {}).get("name", "Not Rated") if game_data.get("esrb_rating") else "Not Rated",
-            "playtime": game_data.get("playtime"),
-            "screenshots": [
-                screenshot.get("image") for screenshot in screenshots_data.get("results", [])[:6]
-            ] if screenshots_data else []
-        }
-        
         return jsonify({
             "status": "success",
-            "game": game
+            "game": build_game_details(game_data, screenshots_future.result(), media_options(request.args))
         })
     
     return jsonify({
@@ -382,18 +1376,24 @@ def get_game_details(game_id):
         "message": "Game not found"
     }), 404
 
-# Nova rota para detalhes de reviews de um jogo específico
-@app.route("/api/games/<int:game_id>/reviews")
-def get_game_reviews(game_id):
-    game_data = fetch_from_rawg(f"games/{game_id}")
-    
-    if not game_data:
-        return jsonify({
-            "status": "error",
-            "message": "Game not found"
-        }), 404
-    
-    metacritic_score = game_data.get("metacritic", 75)
+# Reviews de usuários: SQLite com gravação em lote e agregados por jogo
+review_store = ReviewStore(
+    os.getenv("REVIEWS_DB_PATH", os.path.join(DATA_DIR, "reviews.sqlite3")),
+    batch_size=int(os.getenv("REVIEWS_BATCH_SIZE", 200)),
+    flush_interval=float(os.getenv("REVIEWS_FLUSH_INTERVAL", 0.2)),
+    max_pending=int(os.getenv("REVIEWS_MAX_PENDING", 10000))
+)
+REVIEW_MAX_USERNAME = 50
+REVIEW_MAX_LENGTH = 5000
+
+def user_reviews_section(game_id, args):
+    """Página de reviews de usuários e a nota agregada do jogo (lida em O(1))"""
+    page = max(args.get("page", 1, type=int), 1)
+    page_size = min(max(args.get("page_size", 10, type=int), 1), 50)
+    return review_store.list_reviews(game_id, page, page_size), review_store.get_aggregate(game_id)
+
+def game_reviews_payload(game_data, user_reviews, user_rating, media_opts=DEFAULT_MEDIA):
+    metacritic_score = game_data.metacritic or 75
     
     quality_words = ["excepcional", "sólida", "decente"]
     impact_words = ["define novos padrões", "atende às expectativas", "tem seus méritos"]
@@ -421,36 +1421,39 @@ def get_game_reviews(game_id):
         }
     ]
     
-    user_reviews = [
-        {
-            "id": 1,
-            "username": "GamerPro2024",
-            "rating": min(5, max(1, int(metacritic_score / 20))),
-            "review": "Jogo incrível! Recomendo para todos os fãs do gênero.",
-            "date": "2024-06-20",
-            "helpful": 15
-        }
-    ]
-    
-    return jsonify({
+    return {
         "status": "success",
         "game": {
-            "id": game_data.get("id"),
-            "name": game_data.get("name"),
-            "background_image": game_data.get("background_image"),
+            "id": game_data.id,
+            "name": game_data.name,
+            "background_image": media.image_url(game_data.background_image, "hero", media_opts),
             "metacritic": metacritic_score,
-            "released": game_data.get("released"),
-            "genres": [genre["name"] for genre in game_data.get("genres", [])],
-            "platforms": [platform["platform"]["name"] for platform in game_data.get("platforms", [])],
-            "description": game_data.get("description_raw", "")[:500] + "..." if game_data.get("description_raw") else "Descrição não disponível."
+            "released": game_data.released,
+            "genres": game_data.genres,
+            "platforms": game_data.platforms,
+            "description": game_data.description[:500] + "..." if game_data.description else "Descrição não disponível."
         },
         "criticReviews": critic_reviews,
         "userReviews": user_reviews,
-        "userRating": {
-            "average": round(sum([r["rating"] for r in user_reviews]) / len(user_reviews), 1) if user_reviews else 0,
-            "total": len(user_reviews)
-        }
-    })
+        "userRating": user_rating
+    }
+
+# Nova rota para detalhes de reviews de um jogo específico
+@app.route("/api/games/<int:game_id>/reviews")
+# Sem cópia no servidor (ttl=0): um review recém-enviado aparece na próxima leitura,
+# em qualquer worker. O ETag continua valendo, e o cliente revalida com 304.
+@cached_response(0, ttl=0)
+def get_game_reviews(game_id):
+    game_data = fetch_from_rawg(f"games/{game_id}")
+    
+    if not game_data:
+        return jsonify({
+            "status": "error",
+            "message": "Game not found"
+        }), 404
+    
+    user_reviews, user_rating = user_reviews_section(game_id, request.args)
+    return jsonify(game_reviews_payload(game_data, user_reviews, user_rating, media_options(request.args)))
 
 # Nova rota para adicionar review de usuário
 @app.route("/api/games/<int:game_id>/reviews", methods=["POST"])
@@ -463,76 +1466,238 @@ def add_user_review(game_id):
             "message": "Missing required fields: username, rating, review"
         }), 400
     
-    # Aqui você adicionaria a lógica para salvar o review no banco de dados
-    # Por enquanto, apenas retornamos o review enviado
+    username = str(data["username"]).strip()
+    text = str(data["review"]).strip()
+    rating = data["rating"]
+    if not isinstance(rating, int) or isinstance(rating, bool) or not MIN_RATING <= rating <= MAX_RATING:
+        return jsonify({
+            "status": "error",
+            "message": f"Rating must be an integer between {MIN_RATING} and {MAX_RATING}"
+        }), 400
+    if not username or not text or len(username) > REVIEW_MAX_USERNAME or len(text) > REVIEW_MAX_LENGTH:
+        return jsonify({
+            "status": "error",
+            "message": f"Username (max {REVIEW_MAX_USERNAME} chars) and review (max {REVIEW_MAX_LENGTH} chars) are required"
+        }), 400
+    
+    # O review é gravado em lote por uma thread em segundo plano: a resposta é 202 e
+    # o review ainda não tem id (aparece em GET .../reviews assim que o lote for gravado)
+    try:
+        review = review_store.submit(game_id, username, rating, text)
+    except ReviewQueueFull:
+        return jsonify({
+            "status": "error",
+            "message": "Too many reviews being submitted, try again later"
+        }), 503, {"Retry-After": "5"}
+    
     return jsonify({
         "status": "success",
-        "message": "Review added successfully",
-        "review": data
-    }), 201
+        "message": "Review accepted, it will be visible shortly",
+        "review": review
+    }), 202
+
+# Notícias: coletadas em segundo plano de feeds RSS/Atom (GET condicional, leitura
+# em streaming e dedupe por hash, em news.py) e servidas do SQLite local, com
+# paginação de verdade e índice por tag. Só um worker coleta por vez.
+DEFAULT_NEWS_FEEDS = (
+    "IGN|games|https://feeds.feedburner.com/ign/games-all,"
+    "The Verge|games|https://www.theverge.com/rss/games/index.xml,"
+    "Nintendo Life|consoles|https://www.nintendolife.com/feeds/latest,"
+    "Push Square|consoles|https://www.pushsquare.com/feeds/latest,"
+    "Pure Xbox|consoles|https://www.purexbox.com/feeds/latest"
+)
+NEWS_FEEDS = parse_feeds(os.getenv("NEWS_FEEDS", DEFAULT_NEWS_FEEDS))
+NEWS_REFRESH_INTERVAL = int(os.getenv("NEWS_REFRESH_INTERVAL", 900))  # segundos; 0 desativa
+NEWS_FIXTURES = os.getenv("NEWS_FIXTURES")  # diretório com feeds gravados (<nome>.xml), para rodar sem rede
+NEWS_MAX_PAGE_SIZE = 50
+news_store = NewsStore(
+    os.getenv("NEWS_DB_PATH", os.path.join(DATA_DIR, "news.sqlite3")),
+    max_items=int(os.getenv("NEWS_MAX_ITEMS", 5000))
+)
+NEWS_ERRORS = (requests.exceptions.RequestException, sqlite3.Error) + FEED_ERRORS
+
+def news_fetcher(fixtures=None):
+    fixtures = fixtures or NEWS_FIXTURES
+    return RecordedFeedFetcher(fixtures) if fixtures else HttpFeedFetcher(requests.Session())
+
+@app.cli.command("ingest-news")
+@click.option("--fixtures", default=None, help="Diretório com feeds gravados (<nome do feed>.xml), para rodar sem rede")
+def ingest_news_command(fixtures):
+    """Coleta agora todos os feeds de notícias configurados"""
+    print(ingest_feeds(news_store, NEWS_FEEDS, news_fetcher(fixtures), errors=NEWS_ERRORS))
 
-# Rota para notícias de jogos
+def _news_ingest_loop():
+    lock_path = os.path.join(DATA_DIR, "news.lock")
+    fetch = news_fetcher()
+    while True:
+        try:
+            with open(lock_path, "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                # Feeds coletados há menos de um intervalo (por outro worker) são pulados
+                result = ingest_feeds(news_store, NEWS_FEEDS, fetch, min_interval=NEWS_REFRESH_INTERVAL,
+                                      errors=NEWS_ERRORS)
+                if result["feeds"]:
+                    logger.info("News ingestion finished", extra=result)
+        except BlockingIOError:
+            pass
+        except sqlite3.Error as e:
+            logger.warning("News ingestion failed", extra={"error": str(e)})
+        time.sleep(NEWS_REFRESH_INTERVAL)
+
+if NEWS_REFRESH_INTERVAL > 0 and NEWS_FEEDS:
+    threading.Thread(target=_news_ingest_loop, name="news-ingest", daemon=True).start()
+
+def news_params(args, tag=None):
+    return {
+        "page": max(args.get("page", 1, type=int), 1),
+        "page_size": min(max(args.get("page_size", 10, type=int), 1), NEWS_MAX_PAGE_SIZE),
+        "tag": tag or news_fold(args.get("tag", "")) or None
+    }
+
+def news_payload(args, tag=None):
+    """Página de notícias (das mais novas para as mais antigas), opcionalmente de uma tag; None se o banco falhar"""
+    params = news_params(args, tag)
+    try:
+        items, total = news_store.page(params["page"], params["page_size"], params["tag"])
+    except sqlite3.Error as e:
+        logger.warning("News query failed", extra={"error": str(e)})
+        return None
+    return {
+        "status": "success",
+        "news": items,
+        "page": params["page"],
+        "page_size": params["page_size"],
+        "tag": params["tag"],
+        "total": total,
+        "has_next": params["page"] * params["page_size"] < total
+    }
+
+# Rota para notícias de jogos (?tag=... filtra por categoria)
 @app.route("/api/news")
+@cached_response(300, 3600)
 def get_news():
-    page = request.args.get("page", 1, type=int)
-    page_size = request.args.get("page_size", 10, type=int)
-    
-    # A API RAWG não tem uma rota de notícias, então vamos simular
-    # Em um projeto real, você usaria uma API de notícias de jogos
-    news_items = [
-        {
-            "id": 1,
-            "title": "Novo trailer de Elden Ring: Shadow of the Erdtree revelado",
-            "source": "IGN",
-            "date": "2024-05-21",
-            "image": "https://sm.ign.com/t/ign_br/news/e/elden-ring/elden-ring-shadow-of-the-erdtree-story-trailer-revealed_n5s9.1200.jpg",
-            "url": "https://br.ign.com/elden-ring-shadow-of-the-erdtree/122131/news/elden-ring-shadow-of-the-erdtree-ganha-trailer-de-historia-inedito-assista"
-        },
-        {
-            "id": 2,
-            "title": "PlayStation anuncia novo State of Play para esta semana",
-            "source": "The Verge",
-            "date": "2024-05-29",
-            "image": "https://duet-cdn.vox-cdn.com/thumbor/0x0:1920x1080/2400x1600/filters:focal(960x540:961x541 ):format(webp)/cdn.vox-cdn.com/uploads/chorus_asset/file/25470399/jbareham_240529_e_1001_0001.jpg",
-            "url": "https://www.theverge.com/2024/5/29/24166633/sony-state-of-play-playstation-may-2024-date-time"
-        }
-    ]
-    
+    payload = news_payload(request.args)
+    if payload:
+        return jsonify(payload)
+
     return jsonify({
-        "status": "success",
-        "news": news_items[(page - 1 ) * page_size : page * page_size],
-        "page": page,
-        "page_size": page_size,
-        "total": len(news_items)
-    })
+        "status": "error",
+        "message": "Failed to fetch news"
+    }), 500
+
+def console_news_payload(args=None):
+    return news_payload(args if args is not None else MultiDict(), tag=CONSOLE_TAG)
 
 # Rota para notícias de consoles
 @app.route("/api/news/consoles")
+@cached_response(300, 3600)
 def get_console_news():
-    # Simulação de notícias de consoles
-    console_news = [
-        {
-            "id": 3,
-            "title": "Nintendo Switch 2: Rumores apontam para lançamento em 2025",
-            "source": "Bloomberg",
-            "date": "2024-05-15",
-            "image": "https://bgr.com/wp-content/uploads/2024/02/nintendo-switch-2-1.jpg?quality=82&strip=all",
-            "url": "https://www.bloomberg.com/news/articles/2024-02-26/nintendo-shares-slump-on-reports-of-new-console-delay-to-2025"
-        },
-        {
-            "id": 4,
-            "title": "Xbox anuncia novo modelo Series X sem disco",
-            "source": "Windows Central",
-            "date": "2024-06-09",
-            "image": "https://www.windowscentral.com/sites/wp-content/uploads/2024/06/xbox-series-x-digital-edition-white.jpg",
-            "url": "https://www.windowscentral.com/gaming/xbox/phil-spencer-confirms-white-xbox-series-x-and-other-hardware-are-coming"
-        }
-    ]
-    
+    payload = console_news_payload(request.args)
+    if payload:
+        return jsonify(payload)
+
     return jsonify({
-        "status": "success",
-        "news": console_news
-    } )
+        "status": "error",
+        "message": "Failed to fetch console news"
+    }), 500
+
+# Home: todas as seções da página inicial em uma única resposta. As listagens são
+# buscadas em paralelo; se uma seção falhar, ela vem como null (listada em
+# "failed") e as demais são retornadas normalmente. Cada seção é a primeira página
+# da rota que ela substitui: "popular" sai de /api/games?ordering=-added e "recent"
+# da lista ranqueada de /api/games/recent (só lançamentos da janela de
+# recent_dates(), sem jogos futuros ou sem data).
+HOME_LISTINGS = {
+    "popular": "-added"
+}
+HOME_RANKED_LISTS = {
+    "recent": "recent"
+}
+HOME_PAGE_SIZE = 20
+
+def home_listing_params(ordering):
+    # Os mesmos parâmetros que o front usa em /api/games, para compartilhar o cache
+    return {"ordering": ordering, "page": 1, "page_size": HOME_PAGE_SIZE}
+
+def home_ranked_list_params():
+    return {"page": 1, "page_size": HOME_PAGE_SIZE}
+
+def home_listing_section(data, params, media_opts=DEFAULT_MEDIA):
+    return games_payload(data, params, media_opts)["games"] if data else None
+
+def home_news_sections():
+    news = news_payload(MultiDict())
+    console_news = console_news_payload()
+    return {
+        "news": news["news"] if news else None,
+        "consoleNews": console_news["news"] if console_news else None
+    }
+
+def home_payload(sections, denied=None):
+    """Monta a resposta da home; retorna (payload, status HTTP, headers).
+
+    `denied` mapeia as seções que a quota do RAWG negou para a QuotaExceeded:
+    elas vêm em "throttled" (além de "failed") e a resposta leva Retry-After.
+    """
+    denied = denied or {}
+    headers = {}
+    if denied:
+        headers["Retry-After"] = str(max(error.retry_after for error in denied.values()))
+    failed = [name for name, value in sections.items() if value is None]
+    if len(failed) == len(sections):
+        return {
+            "status": "error",
+            "message": "Failed to load home page"
+        }, 503 if denied else 500, headers
+    return dict(sections, status="success", failed=failed, throttled=list(denied)), 200, headers
+
+# Rota da página inicial (substitui as quatro requisições da home)
+@app.route("/api/home")
+@cached_response(60, 300)
+def get_home():
+    futures = {
+        name: submit_listing(home_listing_params(ordering))
+        for name, ordering in HOME_LISTINGS.items()
+    }
+    futures.update({
+        name: submit_ranked_list(list_name, home_ranked_list_params())
+        for name, list_name in HOME_RANKED_LISTS.items()
+    })
+    media_opts = media_options(request.args)
+    sections = {}
+    denied = {}
+    for name, (params, future) in futures.items():
+        try:
+            sections[name] = home_listing_section(future.result(), params, media_opts)
+        except Exception as e:
+            logger.warning("Home section failed", extra={"section": name, "error": str(e)})
+            sections[name] = None
+            if isinstance(e, QuotaExceeded):
+                denied[name] = e
+    sections.update(home_news_sections())
+
+    payload, status, headers = home_payload(sections, denied)
+    if payload.get("failed"):
+        g.response_cache_ttl = PARTIAL_RESPONSE_TTL
+    return jsonify(payload), status, headers
+
+# Rotas administrativas: exigem o header Authorization: Bearer <ADMIN_TOKEN>.
+# Sem ADMIN_TOKEN definido, ficam desativadas.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def is_admin_request(headers):
+    expected = f"Bearer {ADMIN_TOKEN}"
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(headers.get("Authorization", ""), expected)
+
+# Consumo da quota do RAWG e projeção de quando o orçamento acaba
+@app.route("/api/admin/quota")
+def get_quota():
+    if not is_admin_request(request.headers):
+        return jsonify({
+            "status": "error",
+            "message": "Forbidden"
+        }), 403
+    return jsonify(dict(quota.stats(), status="success"))
 
 # Rota para login (simulado)
 @app.route("/api/auth/login", methods=["POST"])
@@ -584,6 +1749,42 @@ def protected():
     current_user = get_jwt_identity()
     return jsonify(logged_in_as=current_user), 200
 
+# Warm-up: ao subir, carrega no cache as respostas mais acessadas (as da home e dos
+# filtros) em segundo plano, sem atrasar o início do servidor. Cada caminho passa
+# pela rota normal, então aquece o cache do RAWG e o de respostas serializadas.
+WARMUP_PATHS = [
+    path.strip() for path in os.getenv(
+        "WARMUP_PATHS",
+        "/api/games?ordering=-added&page_size=60,"
+        "/api/games?ordering=-released&page_size=60,"
+        "/api/home,/api/games/genres,/api/games/platforms,/api/games/critic-reviews"
+    ).split(",") if path.strip()
+]
+WARMUP_DELAY = float(os.getenv("WARMUP_DELAY", 1))
+
+def warm_up_cache(paths=None):
+    """Faz uma requisição interna para cada caminho; retorna {caminho: status}"""
+    results = {}
+    client = app.test_client()
+    for path in WARMUP_PATHS if paths is None else paths:
+        try:
+            with background_calls():
+                response = client.get(path, environ_overrides={"game_review.internal": True})
+            results[path] = response.status_code
+        except Exception as e:
+            logger.warning("Warm-up failed", extra={"path": path, "error": str(e)})
+            results[path] = None
+    return results
+
+def _warm_up_in_background():
+    time.sleep(WARMUP_DELAY)
+    started = time.time()
+    results = warm_up_cache()
+    logger.info("Cache warm-up finished", extra={"seconds": round(time.time() - started, 2), "results": results})
+
+if WARMUP_PATHS:
+    threading.Thread(target=_warm_up_in_background, name="cache-warmup", daemon=True).start()
+
 # Remova o bloco if __name__ == '__main__':
 # O Gunicorn ou Waitress irá iniciar a aplicação
 
@@ -0,0 +1,74 @@
+from collections import namedtuple
+
+# Imagens do RAWG: o CDN serve versões redimensionadas de qualquer original em
+# media/resize/<largura>/-/<caminho>. As larguras usadas abaixo são as mesmas do
+# site do RAWG (que já ficam em cache no CDN).
+RAWG_MEDIA_PREFIX = "https://media.rawg.io/media/"
+RESIZED_PREFIXES = ("resize/", "crop/")
+
+# Largura por contexto e classe de tamanho. "md" é o padrão; "original" não altera a URL.
+# card: grades da home e da listagem (~300px na tela, 640 cobre telas 2x)
+# hero: imagem de destaque da página de detalhes
+# screenshot: galeria da página de detalhes
+CONTEXTS = {
+    "card": {"sm": 420, "md": 640, "lg": 1280},
+    "hero": {"sm": 640, "md": 1280, "lg": 1920},
+    "screenshot": {"sm": 420, "md": 640, "lg": 1280}
+}
+SIZE_CLASSES = ("sm", "md", "lg", "original")
+DEFAULT_SIZE = "md"
+
+# Como o cliente quer as imagens: classe de tamanho e se quer o srcset junto
+MediaOptions = namedtuple("MediaOptions", ["size", "srcset"])
+DEFAULT_MEDIA = MediaOptions(DEFAULT_SIZE, False)
+
+
+def media_options(args):
+    """Lê ?image_size=sm|md|lg|original e ?image_srcset=1 da query string"""
+    size = args.get("image_size", DEFAULT_SIZE).strip().lower()
+    srcset = args.get("image_srcset", "").strip().lower() in ("1", "true", "yes")
+    return MediaOptions(size if size in SIZE_CLASSES else DEFAULT_SIZE, srcset)
+
+
+def resized(url, width):
+    """URL da versão do RAWG com a largura dada; URLs de outros hosts voltam iguais"""
+    if not url or not url.startswith(RAWG_MEDIA_PREFIX):
+        return url
+    path = url[len(RAWG_MEDIA_PREFIX):]
+    if path.startswith(RESIZED_PREFIXES):
+        return url
+    return f"{RAWG_MEDIA_PREFIX}resize/{width}/-/{path}"
+
+
+def image_url(url, context, media=DEFAULT_MEDIA):
+    if media.size == "original":
+        return url
+    return resized(url, CONTEXTS[context][media.size])
+
+
+def image_srcset(url, context):
+    """Valor para o atributo srcset: as larguras do contexto, com descritores `w`"""
+    if not url or not url.startswith(RAWG_MEDIA_PREFIX):
+        return None
+    widths = sorted(set(CONTEXTS[context].values()))
+    return ", ".join(f"{resized(url, width)} {width}w" for width in widths)
+
+
+def apply(record, context, media=DEFAULT_MEDIA, field="background_image"):
+    """Reescreve a imagem de um dict de jogo para o contexto (e adiciona <campo>_srcset se pedido)"""
+    url = record.get(field)
+    if url is None:
+        return record
+    record[field] = image_url(url, context, media)
+    if media.srcset:
+        record[f"{field}_srcset"] = image_srcset(url, context)
+    return record
+
+
+def apply_screenshots(record, media=DEFAULT_MEDIA):
+    """Reescreve a lista de screenshots de um dict de detalhes (e adiciona screenshots_srcset)"""
+    urls = record.get("screenshots") or []
+    record["screenshots"] = [image_url(url, "screenshot", media) for url in urls]
+    if media.srcset:
+        record["screenshots_srcset"] = [image_srcset(url, "screenshot") for url in urls]
+    return record
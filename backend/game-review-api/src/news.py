@@ -0,0 +1,457 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import contextlib
+from collections import namedtuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html import unescape
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from xml.etree.ElementTree import ParseError
+
+from defusedxml import DefusedXmlException
+from defusedxml.ElementTree import iterparse
+
+from catalog import fold
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    published INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    image TEXT,
+    summary TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_news_published ON news (published DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS news_tags (
+    tag TEXT NOT NULL,
+    published INTEGER NOT NULL,
+    news_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, published, news_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_news_tags_news ON news_tags (news_id);
+
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL DEFAULT 0,
+    status INTEGER,
+    new_items INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Um feed configurado: nome exibido como fonte, categoria (vira tag de todos os itens) e URL
+FeedSource = namedtuple("FeedSource", ["name", "category", "url"])
+# Item extraído de um feed, antes de ir para o banco
+NewsItem = namedtuple("NewsItem", ["title", "url", "published", "image", "summary", "tags"])
+# Resposta de um fetcher: status HTTP, corpo (arquivo aberto, só com 200) e validadores para o próximo GET
+FetchResult = namedtuple("FetchResult", ["status", "body", "etag", "last_modified"])
+
+# Itens com alguma destas palavras (no título ou nas categorias) ganham a tag "consoles"
+CONSOLE_KEYWORDS = ("playstation", "ps5", "ps4", "xbox", "nintendo", "switch 2", "steam deck", "console", "consoles")
+CONSOLE_TAG = "consoles"
+# Parâmetros de rastreamento removidos da URL antes de calcular o hash
+TRACKING_PARAMS = ("utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "ref", "cmpid")
+SUMMARY_MAX_CHARS = 300
+# Feeds vêm do mais novo para o mais antigo: depois de tantos itens seguidos já
+# conhecidos, o resto do feed também já está no banco e a leitura para
+KNOWN_STREAK_STOP = 20
+MAX_ITEMS_PER_FEED = 200
+# Teto do corpo de um feed (depois de descomprimido); feeds reais têm poucas centenas de KB
+MAX_FEED_BYTES = 5 * 1024 * 1024
+
+
+class FeedTooLarge(ValueError):
+    """O corpo do feed passou de MAX_FEED_BYTES"""
+
+
+# Falhas de um feed (rede, XML inválido, entidades/DTD externos recusados pelo
+# defusedxml, corpo grande demais): registradas no feed, sem parar os demais
+FEED_ERRORS = (OSError, ParseError, DefusedXmlException, FeedTooLarge)
+
+_tags_re = re.compile(r"<[^>]+>")
+_img_re = re.compile(r"<img[^>]+src=[\"']([^\"']+)[\"']", re.IGNORECASE)
+_keyword_re = re.compile(r"\b(" + "|".join(re.escape(keyword) for keyword in CONSOLE_KEYWORDS) + r")\b")
+
+
+def parse_feeds(value):
+    """Lê a configuração de feeds: "Nome|categoria|url" separados por vírgula"""
+    feeds = []
+    for entry in value.split(","):
+        parts = [part.strip() for part in entry.split("|")]
+        if len(parts) == 3 and all(parts):
+            feeds.append(FeedSource(*parts))
+    return feeds
+
+
+def canonical_url(url):
+    """URL sem fragmento e sem parâmetros de rastreamento (a mesma matéria com utm_* é a mesma matéria)"""
+    parts = urlsplit((url or "").strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in TRACKING_PARAMS])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def content_hash(title, url):
+    """Identidade de uma notícia: título normalizado + URL canônica.
+
+    A mesma matéria republicada por outro feed (ou relida na próxima coleta)
+    tem o mesmo hash e não é gravada de novo.
+    """
+    return hashlib.sha1(f"{fold(title)}\n{canonical_url(url)}".encode("utf-8")).hexdigest()[:32]
+
+
+def _local(tag):
+    """Nome do elemento sem namespace ({http://www.w3.org/2005/Atom}entry -> entry)"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(element):
+    return (element.text or "").strip() if element is not None else ""
+
+
+def _parse_date(value):
+    """pubDate do RSS (RFC 822) ou published/updated do Atom (ISO 8601) -> timestamp"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _summary(html):
+    text = " ".join(unescape(_tags_re.sub(" ", html or "")).split())
+    if len(text) > SUMMARY_MAX_CHARS:
+        text = text[:SUMMARY_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+    return text
+
+
+def _item_from_element(element, category):
+    """Extrai um NewsItem de um <item> (RSS) ou <entry> (Atom)"""
+    title = url = date = image = description = ""
+    tags = {fold(category)}
+    for child in element:
+        name = _local(child.tag)
+        if name == "title":
+            title = _text(child)
+        elif name == "link":
+            # RSS: <link>url</link>; Atom: <link rel="alternate" href="url"/>
+            rel = child.get("rel", "alternate")
+            if child.get("href") and rel == "alternate":
+                url = child.get("href")
+            elif child.get("href") and rel == "enclosure" and (child.get("type") or "").startswith("image/"):
+                image = image or child.get("href")
+            elif not child.get("href"):
+                url = url or _text(child)
+        elif name in ("pubDate", "published", "updated", "date"):
+            date = date or _text(child)
+        elif name in ("content", "thumbnail") and child.get("url"):
+            # media:content / media:thumbnail (Media RSS)
+            image = image or child.get("url")
+        elif name in ("description", "summary", "content", "encoded"):
+            description = description or (child.text or "")
+        elif name == "category":
+            term = child.get("term") or _text(child)
+            if term:
+                tags.add(fold(term))
+        elif name == "enclosure" and (child.get("type") or "").startswith("image/"):
+            image = image or child.get("url")
+        elif name == "group":
+            for media in child:
+                if _local(media.tag) in ("content", "thumbnail") and media.get("url"):
+                    image = image or media.get("url")
+    if not image:
+        match = _img_re.search(description)
+        if match:
+            image = unescape(match.group(1))
+    tags.discard("")
+    if _keyword_re.search(" ".join([fold(title)] + sorted(tags))):
+        tags.add(CONSOLE_TAG)
+    return NewsItem(unescape(title), url.strip(), _parse_date(date), image or None, _summary(description),
+                    tuple(sorted(tags)))
+
+
+def iter_feed_items(stream, category=""):
+    """Lê um feed RSS 2.0 ou Atom de forma incremental (iterparse), item a item.
+
+    Cada <item>/<entry> é removido da árvore assim que é lido, então a memória
+    usada não cresce com o tamanho do feed. Itens sem título ou sem link são
+    ignorados.
+    """
+    stack = []
+    # defusedxml: feeds vêm de URLs de terceiros, então declarações de entidade
+    # (billion laughs) e referências externas são recusadas
+    for event, element in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            continue
+        stack.pop()
+        if _local(element.tag) in ("item", "entry"):
+            item = _item_from_element(element, category)
+            if stack:
+                stack[-1].remove(element)
+            if item.title and item.url:
+                yield item
+
+
+class NewsStore:
+    """Notícias em SQLite, ordenadas por data, com índice por tag e dedupe por hash.
+
+    `news` guarda cada notícia uma vez (hash único) e é lida pelo índice de
+    data; `news_tags` é o índice tag -> notícia já na ordem de leitura
+    (tag, data), então uma página de uma tag é uma varredura de intervalo.
+    `feeds` guarda os validadores (ETag/Last-Modified) do último GET de cada feed.
+    """
+
+    def __init__(self, path, max_items=5000):
+        self.path = path
+        self.max_items = max_items
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        # Conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def known(self, item_hash):
+        return self._connect().execute("SELECT 1 FROM news WHERE hash = ?", (item_hash,)).fetchone() is not None
+
+    def add_items(self, source, items, now=None):
+        """Grava os itens ainda não conhecidos; retorna quantos eram novos"""
+        now = int(now or time.time())
+        conn = self._connect()
+        added = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for item in items:
+                published = min(item.published or now, now)
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO news (hash, published, title, source, url, image, summary, tags) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (content_hash(item.title, item.url), published, item.title, source, item.url, item.image,
+                     item.summary, json.dumps(item.tags))
+                )
+                if cursor.rowcount:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO news_tags (tag, published, news_id) VALUES (?, ?, ?)",
+                        [(tag, published, cursor.lastrowid) for tag in item.tags]
+                    )
+                    added += 1
+            if added:
+                self._prune(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def _prune(self, conn):
+        """Mantém só as `max_items` notícias mais recentes"""
+        row = conn.execute("SELECT published, id FROM news ORDER BY published DESC, id DESC LIMIT 1 OFFSET ?",
+                           (self.max_items,)).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM news_tags WHERE news_id IN "
+                     "(SELECT id FROM news WHERE published < ? OR (published = ? AND id <= ?))", (row[0], row[0], row[1]))
+        conn.execute("DELETE FROM news WHERE published < ? OR (published = ? AND id <= ?)", (row[0], row[0], row[1]))
+
+    def page(self, page=1, page_size=10, tag=None):
+        """(notícias como dicts, total) da página, das mais novas para as mais antigas"""
+        conn = self._connect()
+        offset = (page - 1) * page_size
+        columns = "n.id, n.published, n.title, n.source, n.url, n.image, n.summary, n.tags"
+        if tag:
+            total = conn.execute("SELECT COUNT(*) FROM news_tags WHERE tag = ?", (tag,)).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {columns} FROM news_tags t JOIN news n ON n.id = t.news_id "
+                f"WHERE t.tag = ? ORDER BY t.published DESC, t.news_id DESC LIMIT ? OFFSET ?",
+                (tag, page_size, offset)
+            ).fetchall()
+        else:
+            total = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {columns} FROM news n ORDER BY n.published DESC, n.id DESC LIMIT ? OFFSET ?",
+                (page_size, offset)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows], total
+
+    @staticmethod
+    def _row_to_dict(row):
+        news_id, published, title, source, url, image, summary, tags = row
+        return {
+            "id": news_id,
+            "title": title,
+            "source": source,
+            "date": datetime.fromtimestamp(published, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "image": image,
+            "url": url,
+            "summary": summary,
+            "tags": json.loads(tags)
+        }
+
+    def feed_state(self, url):
+        """(etag, last_modified, fetched_at) do último GET do feed"""
+        row = self._connect().execute("SELECT etag, last_modified, fetched_at FROM feeds WHERE url = ?", (url,)).fetchone()
+        return row or (None, None, 0)
+
+    def set_feed_state(self, url, status, etag, last_modified, new_items, now=None):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO feeds (url, etag, last_modified, fetched_at, status, new_items) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, now or time.time(), status, new_items)
+        )
+
+    def stats(self):
+        conn = self._connect()
+        return {
+            "items": conn.execute("SELECT COUNT(*) FROM news").fetchone()[0],
+            "feeds": [
+                {"url": url, "status": status, "fetched_at": fetched_at, "new_items": new_items}
+                for url, status, fetched_at, new_items in conn.execute(
+                    "SELECT url, status, fetched_at, new_items FROM feeds ORDER BY url")
+            ]
+        }
+
+
+class _LimitedReader:
+    """Corpo do feed lido pelo parser, com no máximo `limit` bytes"""
+
+    def __init__(self, stream, limit):
+        self._stream = stream
+        self._remaining = limit
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._remaining + 1
+        data = self._stream.read(min(size, self._remaining + 1))
+        self._remaining -= len(data)
+        if self._remaining < 0:
+            raise FeedTooLarge(f"feed body over {MAX_FEED_BYTES} bytes")
+        return data
+
+
+class HttpFeedFetcher:
+    """Busca feeds com GET condicional (If-None-Match/If-Modified-Since) e corpo em streaming"""
+
+    def __init__(self, session, timeout=(3.05, 10), user_agent="GameReviewNews/1.0"):
+        self.session = session
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+    def __call__(self, feed, etag=None, last_modified=None):
+        headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip"}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = self.session.get(feed.url, headers=headers, timeout=self.timeout, stream=True)
+        if response.status_code != 200:
+            response.close()
+            return FetchResult(response.status_code, None, etag, last_modified)
+        # O parser lê direto do socket (já descomprimido), sem carregar o feed inteiro
+        response.raw.decode_content = True
+        return FetchResult(200, response.raw, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+
+class RecordedFeedFetcher:
+    """Substitui a rede com feeds gravados em disco (<nome do feed>.xml, ex.: the_verge.xml).
+
+    Imita o GET condicional: o ETag é derivado do tamanho e da data de
+    modificação do arquivo, e um ETag igual ao anterior responde 304.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, feed):
+        return os.path.join(self.directory, fold(feed.name).replace(" ", "_") + ".xml")
+
+    def __call__(self, feed, etag=None, last_modified=None):
+        path = self.path(feed)
+        if not os.path.exists(path):
+            return FetchResult(404, None, etag, last_modified)
+        stat = os.stat(path)
+        current = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if current == etag:
+            return FetchResult(304, None, etag, last_modified)
+        return FetchResult(200, open(path, "rb"), current, None)
+
+
+def ingest_feed(store, feed, fetch, now=None):
+    """Busca um feed (condicional) e grava os itens novos; retorna (status, itens novos)"""
+    etag, last_modified, _ = store.feed_state(feed.url)
+    result = fetch(feed, etag, last_modified)
+    added = 0
+    if result.status == 200:
+        items = []
+        known_streak = 0
+        with contextlib.closing(result.body):
+            for item in iter_feed_items(_LimitedReader(result.body, MAX_FEED_BYTES), feed.category):
+                if store.known(content_hash(item.title, item.url)):
+                    known_streak += 1
+                    if known_streak >= KNOWN_STREAK_STOP:
+                        break
+                    continue
+                known_streak = 0
+                items.append(item)
+                if len(items) >= MAX_ITEMS_PER_FEED:
+                    break
+        added = store.add_items(feed.name, items, now)
+    store.set_feed_state(feed.url, result.status, result.etag, result.last_modified, added, now)
+    return result.status, added
+
+
+def ingest_feeds(store, feeds, fetch, min_interval=0, errors=FEED_ERRORS):
+    """Ingere todos os feeds (pulando os buscados há menos de `min_interval` segundos).
+
+    Um feed com erro (rede, XML inválido) é registrado e não impede os demais.
+    `errors` são as exceções tratadas como falha do feed.
+    """
+    summary = {"feeds": 0, "not_modified": 0, "new_items": 0, "failed": 0, "skipped": 0}
+    now = time.time()
+    for feed in feeds:
+        if min_interval and now - store.feed_state(feed.url)[2] < min_interval:
+            summary["skipped"] += 1
+            continue
+        summary["feeds"] += 1
+        try:
+            status, added = ingest_feed(store, feed, fetch)
+        except errors as e:
+            logger.warning("News feed failed", extra={"feed": feed.name, "error": str(e)})
+            etag, last_modified, _ = store.feed_state(feed.url)
+            store.set_feed_state(feed.url, 0, etag, last_modified, 0)
+            summary["failed"] += 1
+            continue
+        if status == 304:
+            summary["not_modified"] += 1
+        elif status != 200:
+            summary["failed"] += 1
+        summary["new_items"] += added
+    return summary
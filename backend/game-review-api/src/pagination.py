@@ -0,0 +1,207 @@
+import hmac
+import json
+import math
+import time
+import zlib
+import base64
+import struct
+import hashlib
+
+from games import GamePage
+from ranked_lists import UPSTREAM_PAGE_SIZE
+
+# Versão do formato do cursor (incrementar quando o layout binário mudar)
+CURSOR_VERSION = 1
+# versão, consulta, posição no upstream, jogos entregues, snapshot, total, k, bits do filtro
+_HEADER = struct.Struct(">B8sIIdIBI")
+_TAG_BYTES = 16
+
+# Ao continuar de um cursor, relê alguns itens antes da posição gravada: se a
+# ordenação do RAWG andou (jogos entraram ou saíram acima), os que já foram
+# entregues são descartados pelo filtro e os que subiram não se perdem
+OVERLAP = 8
+# Rodadas de busca por página lógica (repetidos descartados pedem mais páginas)
+MAX_ROUNDS = 3
+
+
+class InvalidCursor(ValueError):
+    """Cursor malformado, adulterado ou de outra consulta"""
+
+
+class BloomFilter:
+    """Filtro de Bloom dos ids já entregues: pertinência aproximada em poucos bytes.
+
+    Nunca dá falso negativo (um id entregue sempre é reconhecido); falsos
+    positivos (um jogo novo tomado por repetido) ficam abaixo de `error_rate`
+    enquanto o filtro tiver até `capacity` ids.
+    """
+
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, size, hashes, bits=None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray((size + 7) // 8) if bits is None else bytearray(bits)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(round(size / capacity * math.log(2)), 1)
+        return cls(size, hashes)
+
+    def _positions(self, item):
+        # Hash duplo (Kirsch-Mitzenmacher): k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class Cursor:
+    """Estado de uma sessão de scroll: onde parar no upstream e o que já foi entregue.
+
+    `snapshot_at` e `total` são do momento em que a sessão começou: o total
+    exibido não muda no meio do scroll, mesmo que o RAWG conte outro número.
+    """
+
+    __slots__ = ("query", "offset", "delivered", "snapshot_at", "total", "seen")
+
+    def __init__(self, query, offset, delivered, snapshot_at, total, seen):
+        self.query = query
+        self.offset = offset
+        self.delivered = delivered
+        self.snapshot_at = snapshot_at
+        self.total = total
+        self.seen = seen
+
+
+def query_fingerprint(params, ignore=("page", "page_size")):
+    """Identifica a consulta (filtros e ordenação) sem a paginação: 8 bytes de sha1"""
+    filtered = {k: v for k, v in params.items() if k not in ignore}
+    return hashlib.sha1(json.dumps(filtered, sort_keys=True, default=str).encode("utf-8")).digest()[:8]
+
+
+class CursorCodec:
+    """Cria, codifica e valida cursores opacos.
+
+    O token é base64 (url-safe, sem padding) de um cabeçalho binário com o
+    filtro de Bloom comprimido, assinado com HMAC-SHA256: o cliente não consegue
+    forjar posições nem trocar a consulta de um cursor.
+    """
+
+    def __init__(self, secret, bloom_capacity=1000, bloom_error_rate=0.01):
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+
+    def new(self, query, offset=0):
+        return Cursor(query, offset, 0, time.time(), 0,
+                      BloomFilter.for_capacity(self.bloom_capacity, self.bloom_error_rate))
+
+    def _sign(self, data):
+        return hmac.new(self.secret, data, hashlib.sha256).digest()[:_TAG_BYTES]
+
+    def encode(self, cursor):
+        data = _HEADER.pack(CURSOR_VERSION, cursor.query, cursor.offset, cursor.delivered,
+                            cursor.snapshot_at, cursor.total, cursor.seen.hashes, cursor.seen.size)
+        data += zlib.compress(bytes(cursor.seen.bits), 9)
+        return base64.urlsafe_b64encode(data + self._sign(data)).rstrip(b"=").decode("ascii")
+
+    def decode(self, token, query):
+        """Cursor do token; InvalidCursor se não for válido para a consulta `query`"""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError):
+            raise InvalidCursor("malformed cursor")
+        data, tag = raw[:-_TAG_BYTES], raw[-_TAG_BYTES:]
+        if len(data) < _HEADER.size or not hmac.compare_digest(tag, self._sign(data)):
+            raise InvalidCursor("bad cursor signature")
+        version, cursor_query, offset, delivered, snapshot_at, total, hashes, size = _HEADER.unpack_from(data)
+        if version != CURSOR_VERSION:
+            raise InvalidCursor("unsupported cursor version")
+        if cursor_query != query:
+            raise InvalidCursor("cursor belongs to another query")
+        try:
+            bits = zlib.decompress(data[_HEADER.size:])
+        except zlib.error:
+            raise InvalidCursor("malformed cursor")
+        return Cursor(query, offset, delivered, snapshot_at, total, BloomFilter(size, hashes, bits))
+
+
+def upstream_pages(start, count):
+    """Números das páginas de UPSTREAM_PAGE_SIZE que cobrem os itens [start, start + count)"""
+    first = start // UPSTREAM_PAGE_SIZE + 1
+    last = (start + count - 1) // UPSTREAM_PAGE_SIZE + 1
+    return list(range(first, last + 1))
+
+
+class Assembly:
+    """Monta uma página lógica de `limit` jogos a partir de páginas de 40 do upstream.
+
+    Não faz I/O: quem chama busca as páginas de `pages_needed()` (em paralelo,
+    com threads ou asyncio) e entrega os resultados, na mesma ordem, a
+    `merge()`, até `pages_needed()` voltar vazio. Os jogos são juntados na ordem
+    do upstream, pulando os que o filtro do cursor já viu; ao final, `cursor`
+    aponta para o primeiro item não consumido.
+    """
+
+    def __init__(self, cursor, limit):
+        self.cursor = cursor
+        self.limit = limit
+        self.games = []
+        self.position = max(cursor.offset - OVERLAP, 0) if cursor.delivered else cursor.offset
+        self.start = self.position
+        self.has_next = True
+        self.failed = False
+        self.last_page = None
+        self.last_data = None
+        self._rounds = 0
+        self._done = False
+
+    def pages_needed(self):
+        if self._done or self._rounds >= MAX_ROUNDS or len(self.games) >= self.limit:
+            return []
+        self._rounds += 1
+        return upstream_pages(self.position, self.limit - len(self.games))
+
+    def merge(self, numbers, pages):
+        for number, data in zip(numbers, pages):
+            if not data:
+                # Falha no upstream: entrega o que já juntou; o cursor fica onde parou
+                self.failed = not self.games
+                self._done = True
+                break
+            if not self.cursor.total:
+                self.cursor.total = data.count
+            self.last_page, self.last_data = number, data
+            page_start = (number - 1) * UPSTREAM_PAGE_SIZE
+            for game in data.games[max(self.position - page_start, 0):]:
+                if len(self.games) >= self.limit:
+                    break
+                self.position += 1
+                if game.id and game.id not in self.cursor.seen:
+                    self.cursor.seen.add(game.id)
+                    self.cursor.delivered += 1
+                    self.games.append(game)
+            if len(self.games) >= self.limit:
+                self.has_next = self.position < page_start + len(data.games) or data.has_next
+                self._done = True
+                break
+            if not data.has_next or len(data.games) < UPSTREAM_PAGE_SIZE:
+                self.has_next = False
+                self._done = True
+                break
+        self.cursor.offset = self.position
+
+    def result(self):
+        """GamePage com os jogos montados (total do início da sessão) ou None se o upstream falhou"""
+        if self.failed:
+            return None
+        return GamePage(self.cursor.total, self.has_next, self.start > 0, tuple(self.games))
@@ -0,0 +1,104 @@
+import logging
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Busca chaves antecipadamente (ex.: a próxima página do scroll infinito).
+
+    Tem dois limites: no máximo `max_in_flight` buscas ao mesmo tempo e no máximo
+    `max_per_minute` buscas agendadas por minuto, para que a antecipação não
+    consuma a quota do RAWG. Pedidos além dos limites são descartados, nunca
+    enfileirados. As chaves buscadas ficam registradas até serem usadas (ou
+    descartadas por LRU) para medir quantas antecipações foram aproveitadas.
+    """
+
+    def __init__(self, max_in_flight=4, max_per_minute=60, max_tracked=2048):
+        self.max_in_flight = max_in_flight
+        self.max_per_minute = max_per_minute
+        self.max_tracked = max_tracked
+
+        self._executor = ThreadPoolExecutor(max_workers=max(max_in_flight, 1), thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._prefetched = OrderedDict()  # chave -> quando foi buscada, até o primeiro uso
+        self._window_started = time.time()
+        self._window_count = 0
+
+        self.scheduled = 0
+        self.completed = 0
+        self.fetched = 0
+        self.failed = 0
+        self.hits = 0
+        self.wasted = 0
+        self.skipped_busy = 0
+        self.skipped_budget = 0
+
+    def schedule(self, key, fn, *args):
+        """Agenda fn(*args) para buscar `key`; retorna False se já buscada ou fora do orçamento"""
+        now = time.time()
+        with self._lock:
+            if key in self._in_flight or key in self._prefetched:
+                return False
+            if len(self._in_flight) >= self.max_in_flight:
+                self.skipped_busy += 1
+                return False
+            if now - self._window_started >= 60:
+                self._window_started = now
+                self._window_count = 0
+            if self._window_count >= self.max_per_minute:
+                self.skipped_budget += 1
+                return False
+            self._window_count += 1
+            self._in_flight.add(key)
+            self.scheduled += 1
+        self._executor.submit(self._run, key, fn, args)
+        return True
+
+    def _run(self, key, fn, args):
+        # fn retorna True se buscou algo no upstream; False se não foi preciso (já em cache, catálogo...)
+        try:
+            fetched = fn(*args)
+        except Exception as e:
+            logger.warning("Prefetch failed", extra={"key": key, "error": str(e)})
+            with self._lock:
+                self._in_flight.discard(key)
+                self.failed += 1
+            return
+        with self._lock:
+            self._in_flight.discard(key)
+            self.completed += 1
+            if fetched:
+                self.fetched += 1
+                self._prefetched[key] = time.time()
+                while len(self._prefetched) > self.max_tracked:
+                    self._prefetched.popitem(last=False)
+                    self.wasted += 1
+
+    def record_use(self, key):
+        """Chamado quando uma requisição usa `key`; conta um hit se ela foi antecipada"""
+        if key not in self._prefetched:
+            return
+        with self._lock:
+            if self._prefetched.pop(key, None) is not None:
+                self.hits += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "scheduled": self.scheduled,
+                "completed": self.completed,
+                "fetched": self.fetched,
+                "failed": self.failed,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.fetched, 4) if self.fetched else 0.0,
+                "wasted": self.wasted,
+                "pending": len(self._prefetched),
+                "in_flight": len(self._in_flight),
+                "skipped_busy": self.skipped_busy,
+                "skipped_budget": self.skipped_budget
+            }
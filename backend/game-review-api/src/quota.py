@@ -0,0 +1,222 @@
+import logging
+import os
+import sqlite3
+import math
+import calendar
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from rawg_client import RawgError
+
+logger = logging.getLogger(__name__)
+
+# Classes de prioridade das chamadas ao RAWG (menor valor = mais importante)
+HIGH = 0     # detalhes de jogos, primeiras páginas, gêneros e plataformas
+NORMAL = 1   # buscas
+LOW = 2      # páginas profundas, pré-busca e revalidações em segundo plano
+
+PRIORITY_NAMES = {HIGH: "high", NORMAL: "normal", LOW: "low"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    period TEXT PRIMARY KEY,
+    calls INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class QuotaExceeded(RawgError):
+    """Chamada ao RAWG negada pelo governador de quota (quem chamou deve usar dados locais).
+
+    `retry_after` é a espera sugerida, em segundos, até a chamada voltar a passar.
+    """
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Limita a taxa de chamadas: `rate` fichas por segundo, acumulando até `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, reserve=0.0):
+        """Consome uma ficha se sobrar mais que `reserve` (fração da capacidade) depois disso"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens - 1 < self.capacity * reserve:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self, reserve=0.0):
+        """Segundos até take(reserve) voltar a passar"""
+        missing = 1 + self.capacity * reserve - self.tokens
+        return max(missing / self.rate, 0.0) if self.rate > 0 else 86400.0
+
+
+class QuotaGovernor:
+    """Controla as chamadas ao RAWG com um token bucket e orçamentos diário e mensal.
+
+    Cada classe de prioridade tem uma reserva: chamadas LOW só passam enquanto
+    o consumo do dia e do mês está abaixo de (1 - reserva) do orçamento, e só
+    usam fichas do bucket acima da reserva. Assim as chamadas HIGH continuam
+    passando quando a quota aperta. As chamadas LOW (pré-busca, revalidações,
+    warm-up, listas e sincronizações em segundo plano) tiram fichas de um bucket
+    próprio (`background_rate`, `background_burst`) e nunca esvaziam o das
+    requisições. Os token buckets são por processo; o consumo é gravado em
+    SQLite e somado entre todos os workers, com atraso de no máximo
+    `sync_interval` segundos.
+    """
+
+    def __init__(self, path, daily_budget, monthly_budget, rate=5, burst=80, background_rate=1,
+                 background_burst=40, reserves=None, sync_interval=1.0):
+        self.path = path
+        self.daily_budget = daily_budget
+        self.monthly_budget = monthly_budget
+        self.reserves = reserves or {HIGH: 0.0, NORMAL: 0.1, LOW: 0.3}
+        self.sync_interval = sync_interval
+
+        self._bucket = TokenBucket(rate, burst)
+        self._background = TokenBucket(background_rate, background_burst)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = 0
+        self._totals = {}
+        self._synced_at = 0
+        self.allowed = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.denied = {name: 0 for name in PRIORITY_NAMES.values()}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        # Conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _periods(now=None):
+        now = now or datetime.now(timezone.utc)
+        return f"day:{now:%Y-%m-%d}", f"month:{now:%Y-%m}"
+
+    def _sync(self, force=False):
+        """Grava o consumo local pendente e relê os totais de todos os workers"""
+        if not force and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, 0
+        periods = self._periods()
+        conn = self._connect()
+        try:
+            if pending:
+                conn.executemany(
+                    "INSERT INTO usage (period, calls) VALUES (?, ?) "
+                    "ON CONFLICT (period) DO UPDATE SET calls = calls + excluded.calls",
+                    [(period, pending) for period in periods]
+                )
+            rows = conn.execute(
+                f"SELECT period, calls FROM usage WHERE period IN ({','.join('?' * len(periods))})", periods
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Quota usage sync failed", extra={"error": str(e)})
+            with self._lock:
+                self._pending += pending
+            return
+        with self._lock:
+            self._totals = dict(rows)
+            self._synced_at = time.monotonic()
+
+    def usage(self):
+        """(chamadas hoje, chamadas no mês), incluindo as ainda não gravadas"""
+        self._sync()
+        day, month = self._periods()
+        with self._lock:
+            return self._totals.get(day, 0) + self._pending, self._totals.get(month, 0) + self._pending
+
+    def acquire(self, priority=NORMAL):
+        """Autoriza uma chamada ao RAWG ou levanta QuotaExceeded"""
+        reserve = self.reserves.get(priority, 0.0)
+        used_day, used_month = self.usage()
+        name = PRIORITY_NAMES.get(priority, "normal")
+        # O bucket de segundo plano é só das chamadas LOW: a reserva dele não se aplica
+        bucket, bucket_reserve = (self._background, 0.0) if priority == LOW else (self._bucket, reserve)
+        with self._lock:
+            if used_day >= self.daily_budget * (1 - reserve):
+                reason, retry_after = "budget", self._seconds_until_next("daily")
+            elif used_month >= self.monthly_budget * (1 - reserve):
+                reason, retry_after = "budget", self._seconds_until_next("monthly")
+            elif not bucket.take(bucket_reserve):
+                reason, retry_after = "rate", bucket.wait_time(bucket_reserve)
+            else:
+                self.allowed[name] += 1
+                return
+            self.denied[name] += 1
+        raise QuotaExceeded(f"RAWG quota governor denied {name} priority call ({reason})",
+                            retry_after=max(math.ceil(retry_after), 1))
+
+    @staticmethod
+    def _seconds_until_next(period):
+        """Segundos até o início do próximo dia ou mês (UTC), quando o orçamento volta"""
+        now = datetime.now(timezone.utc)
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if period == "daily":
+            next_start = start + timedelta(days=1)
+        else:
+            next_start = start.replace(day=1) + timedelta(days=calendar.monthrange(now.year, now.month)[1])
+        return (next_start - now).total_seconds()
+
+    def record_calls(self, count=1):
+        """Contabiliza chamadas feitas de fato ao RAWG (inclui retries)"""
+        with self._lock:
+            self._pending += count
+
+    def stats(self):
+        self._sync(force=True)
+        now = datetime.now(timezone.utc)
+        used_day, used_month = self.usage()
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        month_start = day_start.replace(day=1)
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        return {
+            "daily": self._budget_stats(used_day, self.daily_budget, now, day_start, 86400),
+            "monthly": self._budget_stats(used_month, self.monthly_budget, now, month_start, days_in_month * 86400),
+            "rate": {"per_second": self._bucket.rate, "burst": self._bucket.capacity, "tokens": round(self._bucket.tokens, 2)},
+            "background_rate": {"per_second": self._background.rate, "burst": self._background.capacity,
+                                "tokens": round(self._background.tokens, 2)},
+            "allowed": dict(self.allowed),
+            "denied": dict(self.denied)
+        }
+
+    @staticmethod
+    def _budget_stats(used, budget, now, period_start, period_seconds):
+        elapsed = max((now - period_start).total_seconds(), 1)
+        rate = used / elapsed
+        projected = used + rate * max(period_seconds - elapsed, 0)
+        stats = {
+            "used": used,
+            "budget": budget,
+            "remaining": max(budget - used, 0),
+            "projected_use": round(projected),
+            "exhausted": used >= budget,
+            "projected_exhaustion": None
+        }
+        # No ritmo atual, quando o orçamento acaba (só se acabar antes do fim do período)
+        if rate > 0 and used < budget < projected:
+            exhaustion = now.timestamp() + (budget - used) / rate
+            stats["projected_exhaustion"] = datetime.fromtimestamp(exhaustion, timezone.utc).isoformat(timespec="seconds")
+        return stats
@@ -0,0 +1,161 @@
+import logging
+import time
+
+from games import GamePage
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo de página do RAWG: cada página buscada rende o máximo de jogos
+UPSTREAM_PAGE_SIZE = 40
+
+
+class RankedList:
+    """Definição de uma lista ranqueada materializada.
+
+    `params()` retorna os parâmetros da listagem de games (sem page/page_size),
+    calculados a cada atualização para que filtros de data acompanhem o tempo.
+    `keep(game)` descarta jogos que o filtro do RAWG deixa passar mas a lista não
+    quer. `size` é quantos jogos a lista guarda.
+    """
+
+    def __init__(self, name, params, keep=None, size=200):
+        self.name = name
+        self.params = params
+        self.keep = keep or (lambda game: True)
+        self.size = size
+
+
+class Snapshot:
+    """Conteúdo calculado de uma lista; imutável, substituído inteiro a cada atualização"""
+
+    __slots__ = ("games", "built_at", "pages_fetched")
+
+    def __init__(self, games, built_at, pages_fetched):
+        self.games = games
+        self.built_at = built_at
+        self.pages_fetched = pages_fetched
+
+    def page(self, page, page_size):
+        start = (page - 1) * page_size
+        return GamePage(len(self.games), start + page_size < len(self.games), page > 1,
+                        self.games[start:start + page_size])
+
+
+class RankedLists:
+    """Listas ranqueadas pré-calculadas em segundo plano; leituras são fatias de tupla.
+
+    Cada atualização busca páginas da listagem (`fetch_page(params)` retorna um
+    GamePage) até juntar `size` jogos que passam no filtro da lista, pulando
+    repetidos, e então troca o snapshot de uma vez. Leitores veem o snapshot
+    antigo ou o novo, nunca um parcial. Se uma atualização falhar, o snapshot
+    anterior continua valendo.
+
+    Com `store` (um cache compartilhado entre os workers, como o TieredCache do
+    app), cada snapshot calculado é publicado com a chave `store_prefix + nome`;
+    os workers que não calculam as listas releem o publicado a cada
+    `reload_interval` segundos, em vez de buscar as páginas de novo.
+    """
+
+    def __init__(self, fetch_page, max_pages=10, store=None, store_prefix="ranked_list:", reload_interval=60,
+                 store_ttl=7 * 86400):
+        self.fetch_page = fetch_page
+        self.max_pages = max_pages
+        self.store = store
+        self.store_prefix = store_prefix
+        self.reload_interval = reload_interval
+        self.store_ttl = store_ttl
+        self._lists = {}
+        self._snapshots = {}
+        self._checked_at = {}
+        self._singleflight = SingleFlight()
+        self.refreshes = 0
+        self.failures = 0
+
+    def define(self, ranked_list):
+        self._lists[ranked_list.name] = ranked_list
+
+    def __contains__(self, name):
+        return name in self._lists
+
+    def __len__(self):
+        return len(self._lists)
+
+    def refresh(self, name):
+        """Recalcula a lista (chamadas concorrentes para a mesma lista esperam uma só)"""
+        snapshot, _ = self._singleflight.do(name, self._build, self._lists[name])
+        return snapshot
+
+    def _build(self, ranked_list):
+        params = ranked_list.params()
+        games = []
+        seen = set()
+        pages = 0
+        # Busca além do necessário: o filtro e os repetidos descartam parte de cada página
+        while len(games) < ranked_list.size and pages < self.max_pages:
+            pages += 1
+            data = self.fetch_page(dict(params, page=pages, page_size=UPSTREAM_PAGE_SIZE))
+            if not data:
+                if pages == 1:
+                    raise LookupError(f"no data for ranked list {ranked_list.name}")
+                break
+            for game in data.games:
+                if game.id not in seen and ranked_list.keep(game):
+                    seen.add(game.id)
+                    games.append(game)
+            if not data.has_next:
+                break
+
+        snapshot = Snapshot(tuple(games[:ranked_list.size]), time.time(), pages)
+        self._snapshots[ranked_list.name] = snapshot
+        if self.store is not None:
+            self.store.set(self.store_prefix + ranked_list.name, snapshot, ttl=self.store_ttl)
+        self.refreshes += 1
+        return snapshot
+
+    def snapshot(self, name, reload=False):
+        """Snapshot mais novo da lista (o deste processo ou o publicado por outro worker), ou None"""
+        snapshot = self._snapshots.get(name)
+        now = time.time()
+        if self.store is not None and (reload or now - self._checked_at.get(name, 0) >= self.reload_interval):
+            self._checked_at[name] = now
+            # Direto do L2: o L1 deste processo pode guardar uma publicação antiga
+            read = getattr(self.store, "get_entry_l2", None) or self.store.get_entry
+            entry = read(self.store_prefix + name)
+            if entry is not None and (snapshot is None or entry.data.built_at > snapshot.built_at):
+                snapshot = self._snapshots[name] = entry.data
+        return snapshot
+
+    def refresh_all(self, max_age=0):
+        """Recalcula as listas cujo snapshot mais novo tem `max_age` segundos ou mais"""
+        for name in list(self._lists):
+            snapshot = self.snapshot(name, reload=True)
+            if snapshot is not None and time.time() - snapshot.built_at < max_age:
+                continue
+            try:
+                self.refresh(name)
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Ranked list refresh failed", extra={"list": name, "error": str(e)})
+
+    def page(self, name, page=1, page_size=20):
+        """Página da lista como GamePage; calcula a lista na hora só se ainda não existir"""
+        snapshot = self.snapshot(name)
+        if snapshot is None:
+            snapshot = self.refresh(name)
+        return snapshot.page(page, page_size)
+
+    def stats(self):
+        now = time.time()
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "lists": {
+                name: {
+                    "games": len(snapshot.games),
+                    "age": round(now - snapshot.built_at, 1),
+                    "pages_fetched": snapshot.pages_fetched
+                }
+                for name, snapshot in list(self._snapshots.items())
+            }
+        }
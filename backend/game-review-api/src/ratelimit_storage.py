@@ -0,0 +1,191 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS windows (
+    key TEXT PRIMARY KEY,
+    window INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    previous INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# A cada tantas escritas, apaga as chaves vencidas
+PRUNE_EVERY = 1000
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport):
+    """Storage do `limits` (e do Flask-Limiter) em SQLite, compartilhado entre workers.
+
+    Cada chave é uma linha: um contador por janela fixa ou, na estratégia
+    sliding-window-counter, o par (janela anterior, janela atual). Cada hit é
+    uma transação curta, O(1) por chave, serializada entre processos pelo lock
+    de escrita do SQLite (WAL). Uso:
+
+        Limiter(..., storage_uri="sqlite:////app/data/ratelimit.sqlite3",
+                strategy="sliding-window-counter")
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # sqlite:///relativo ou sqlite:////absoluto, como no SQLAlchemy
+        self.path = uri.split("://", 1)[1][1:] or ":memory:"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        # Conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Contadores de rate limit não precisam sobreviver a uma queda do
+            # sistema; sem fsync, cada hit custa cerca de um terço
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn, *args):
+        """Roda fn(conn, now, *args) em uma transação de escrita (BEGIN IMMEDIATE)"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn, now, *args)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM windows WHERE expires_at <= ?", (now,))
+        return result
+
+    # Janela fixa
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        def run(conn, now):
+            row = conn.execute("SELECT count, expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                count, expires_at = amount, now + expiry
+            else:
+                count, expires_at = row[0] + amount, now + expiry if elastic_expiry else row[1]
+            conn.execute("INSERT OR REPLACE INTO counters (key, count, expires_at) VALUES (?, ?, ?)",
+                         (key, count, expires_at))
+            return count
+
+        return self._write(run)
+
+    def decr(self, key, amount=1):
+        def run(conn, now):
+            conn.execute("UPDATE counters SET count = MAX(count - ?, 0) WHERE key = ? AND expires_at > ?",
+                         (amount, key, now))
+        self._write(run)
+        return self.get(key)
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT count FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connect().execute("SELECT expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def clear(self, key):
+        conn = self._connect()
+        conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+        conn.execute("DELETE FROM windows WHERE key = ?", (key,))
+
+    # Janela deslizante aproximada: a contagem da janela anterior pesa pela
+    # fração dela que ainda cabe na janela de `expiry` segundos que termina agora
+
+    @staticmethod
+    def _window_state(row, now, expiry):
+        """(anterior, atual) da janela que contém `now`, a partir da linha gravada"""
+        window = math.floor(now / expiry)
+        if row is None:
+            return window, 0, 0
+        stored_window, current, previous = row
+        if stored_window == window:
+            return window, previous, current
+        if stored_window == window - 1:
+            return window, current, 0
+        return window, 0, 0
+
+    @staticmethod
+    def _ttls(now, expiry, previous):
+        elapsed = (now / expiry) % 1
+        previous_ttl = (1 - elapsed) * expiry if previous else 0.0
+        return previous_ttl, (1 - elapsed) * expiry + expiry
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+
+        def run(conn, now):
+            row = conn.execute("SELECT window, current, previous FROM windows WHERE key = ?", (key,)).fetchone()
+            window, previous, current = self._window_state(row, now, expiry)
+            previous_ttl, _ = self._ttls(now, expiry, previous)
+            if math.floor(previous * previous_ttl / expiry + current) + amount > limit:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO windows (key, window, current, previous, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, window, current + amount, previous, (window + 2) * expiry)
+            )
+            return True
+
+        return self._write(run)
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT window, current, previous FROM windows WHERE key = ?", (key,)
+        ).fetchone()
+        _, previous, current = self._window_state(row, now, expiry)
+        previous_ttl, current_ttl = self._ttls(now, expiry, previous)
+        return previous, previous_ttl, current, current_ttl
+
+    def clear_sliding_window(self, key, expiry):
+        self._connect().execute("DELETE FROM windows WHERE key = ?", (key,))
+
+    def check(self):
+        try:
+            self._connect().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        conn = self._connect()
+        count = conn.execute("SELECT (SELECT COUNT(*) FROM counters) + (SELECT COUNT(*) FROM windows)").fetchone()[0]
+        conn.execute("DELETE FROM counters")
+        conn.execute("DELETE FROM windows")
+        return count
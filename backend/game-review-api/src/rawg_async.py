@@ -0,0 +1,137 @@
+import time
+import random
+import asyncio
+
+import aiohttp
+
+from rawg_client import (
+    RETRY_STATUS_CODES, RawgError, RawgHTTPError, CircuitOpenError, CallTiming, CircuitBreaker
+)
+
+
+class AsyncRawgClient:
+    """Versão asyncio do RawgClient: mesmas regras de timeout, retries e circuit breaker,
+    mas com centenas de chamadas em andamento ao mesmo tempo em um único processo.
+
+    A sessão aiohttp é criada na primeira chamada (precisa de um event loop rodando)
+    e deve ser fechada com `close()` ao desligar o servidor.
+    """
+
+    def __init__(self, base_url, api_key, pool_size=100, connect_timeout=3.05, read_timeout=10,
+                 max_retries=2, backoff_base=0.5, backoff_max=4, breaker=None, on_call=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.on_call = on_call
+
+        self._session = None
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.last_ms = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def get(self, endpoint, params=None, before_retry=None):
+        """Faz um GET em `endpoint` e retorna o JSON decodificado.
+
+        `before_retry` (opcional) é aguardado antes de cada nova tentativa, para que
+        a quota cobre também os retries; se ele levantar (ex.: QuotaExceeded), as
+        tentativas param ali com essa exceção.
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"RAWG circuit open, skipping {endpoint}")
+
+        # aiohttp só aceita str/int/float nos parâmetros
+        params = {k: str(v) for k, v in (params or {}).items()}
+        params["key"] = self.api_key
+        session = self._get_session()
+        started = time.perf_counter()
+        attempt = 0
+        status_code = None
+        # Como no RawgClient: saída sem sucesso registrado no breaker conta como falha
+        settled = succeeded = False
+        try:
+            while True:
+                attempt += 1
+                retry_after = None
+                try:
+                    async with session.get(f"{self.base_url}/{endpoint}", params=params) as response:
+                        status_code = response.status
+                        if status_code not in RETRY_STATUS_CODES:
+                            if status_code >= 400:
+                                # Erro do cliente (ex.: 404): não adianta repetir nem abrir o circuito
+                                self.breaker.record_success()
+                                settled = True
+                                raise RawgHTTPError(f"RAWG returned {status_code} for {endpoint}", status_code)
+                            try:
+                                data = await response.json(content_type=None)
+                            except ValueError as e:
+                                raise RawgError(f"Invalid JSON from RAWG for {endpoint}: {e}")
+                            self.breaker.record_success()
+                            settled = succeeded = True
+                            return data
+                        retry_after = response.headers.get("Retry-After")
+                        error = RawgHTTPError(f"RAWG returned {status_code} for {endpoint}", status_code)
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                    error = RawgError(f"Error fetching {endpoint}: {e!r}")
+                except aiohttp.ClientError as e:
+                    # Redirecionamentos demais, URL inválida...: não adianta repetir
+                    raise RawgError(f"Error fetching {endpoint}: {e!r}")
+
+                if attempt > self.max_retries:
+                    raise error
+                if before_retry is not None:
+                    await before_retry()
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        finally:
+            if not settled:
+                self.breaker.record_failure()
+            self._record(endpoint, status_code, attempt, started, ok=succeeded)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Backoff exponencial com jitter completo, respeitando Retry-After quando presente"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _record(self, endpoint, status_code, attempts, started, ok):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        if not ok:
+            self.failures += 1
+        if self.on_call is not None:
+            self.on_call(CallTiming(endpoint, status_code, attempts, elapsed_ms, ok))
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected_by_breaker": self.rejected,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+            "breaker": self.breaker.stats()
+        }
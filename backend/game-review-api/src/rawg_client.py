@@ -0,0 +1,224 @@
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Falhas transitórias de rede que valem nova tentativa; os outros erros do requests
+# (TooManyRedirects, InvalidURL...) falham direto
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+
+class RawgError(requests.exceptions.RequestException):
+    """Erro ao consultar a API RAWG"""
+
+
+class RawgHTTPError(RawgError):
+    """Resposta HTTP de erro do RAWG (depois de esgotadas as tentativas)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(RawgError):
+    """O circuit breaker está aberto: a chamada nem foi feita"""
+
+
+class CallTiming:
+    """Tempo gasto em uma chamada ao RAWG (incluindo as novas tentativas)"""
+    __slots__ = ("endpoint", "status_code", "attempts", "elapsed_ms", "ok")
+
+    def __init__(self, endpoint, status_code, attempts, elapsed_ms, ok):
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.attempts = attempts
+        self.elapsed_ms = elapsed_ms
+        self.ok = ok
+
+
+class CircuitBreaker:
+    """Circuit breaker simples: abre após N falhas seguidas e testa uma chamada após `reset_timeout`"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow(self):
+        """Indica se uma chamada pode ser feita agora"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                # Apenas uma chamada de teste por vez no estado half-open
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.time()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened
+            }
+
+
+class RawgClient:
+    """Cliente HTTP para a API RAWG com pool de conexões keep-alive, timeouts,
+    novas tentativas com backoff e circuit breaker.
+
+    `on_call` (opcional) recebe um CallTiming ao fim de cada chamada, para que a
+    aplicação possa medir quanto da latência de cada requisição vem do RAWG.
+    """
+
+    def __init__(self, base_url, api_key, pool_size=10, connect_timeout=3.05, read_timeout=10,
+                 max_retries=2, backoff_base=0.5, backoff_max=4, breaker=None, on_call=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.on_call = on_call
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.last_ms = None
+
+    def get(self, endpoint, params=None, before_retry=None):
+        """Faz um GET em `endpoint` e retorna o JSON decodificado.
+
+        `before_retry` (opcional) é chamado antes de cada nova tentativa, para que
+        a quota cobre também os retries; se ele levantar (ex.: QuotaExceeded), as
+        tentativas param ali com essa exceção.
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpenError(f"RAWG circuit open, skipping {endpoint}")
+
+        params = dict(params or {})
+        params["key"] = self.api_key
+        started = time.perf_counter()
+        attempt = 0
+        status_code = None
+        # Toda saída que não registrou sucesso no breaker conta como falha (inclusive
+        # erros inesperados do requests), para que uma tentativa meio-aberta nunca fique pendente
+        settled = succeeded = False
+        try:
+            while True:
+                attempt += 1
+                retry_after = None
+                try:
+                    response = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=self.timeout)
+                    status_code = response.status_code
+                    if status_code not in RETRY_STATUS_CODES:
+                        if status_code >= 400:
+                            # Erro do cliente (ex.: 404): não adianta repetir nem abrir o circuito
+                            self.breaker.record_success()
+                            settled = True
+                            raise RawgHTTPError(f"RAWG returned {status_code} for {endpoint}", status_code)
+                        try:
+                            data = response.json()
+                        except ValueError as e:
+                            raise RawgError(f"Invalid JSON from RAWG for {endpoint}: {e}")
+                        self.breaker.record_success()
+                        settled = succeeded = True
+                        return data
+                    retry_after = response.headers.get("Retry-After")
+                    error = RawgHTTPError(f"RAWG returned {status_code} for {endpoint}", status_code)
+                except RETRY_EXCEPTIONS as e:
+                    error = e
+
+                if attempt > self.max_retries:
+                    raise error
+                if before_retry is not None:
+                    before_retry()
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self._backoff(attempt, retry_after))
+        finally:
+            if not settled:
+                self.breaker.record_failure()
+            self._record(endpoint, status_code, attempt, started, ok=succeeded)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Backoff exponencial com jitter completo, respeitando Retry-After quando presente"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _record(self, endpoint, status_code, attempts, started, ok):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.calls += 1
+            self.total_ms += elapsed_ms
+            self.last_ms = elapsed_ms
+            if not ok:
+                self.failures += 1
+        if self.on_call is not None:
+            self.on_call(CallTiming(endpoint, status_code, attempts, elapsed_ms, ok))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "rejected_by_breaker": self.rejected,
+                "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+                "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+                "breaker": self.breaker.stats()
+            }
@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from cache import TTLCache
+
+# brotli é opcional; sem ele, só gzip é oferecido
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Corpo final da resposta (bytes já serializados), o ETag calculado sobre ele,
+# as versões comprimidas do corpo por Content-Encoding ({"br": bytes, "gzip": bytes})
+# e, para respostas degradadas, o max-age curto que substitui o da rota (None = o da rota)
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "encodings", "max_age"], defaults=(None,))
+
+# Abaixo disso comprimir não compensa (o corpo cabe em um pacote de qualquer jeito)
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+# A compressão roda uma vez por resposta guardada, então vale um nível acima do padrão de servidores web
+BROTLI_QUALITY = 6
+# Preferência do servidor quando o cliente aceita mais de uma
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def canonical_key(path, query_items):
+    """Chave da requisição: caminho + parâmetros da query string em ordem"""
+    query = urlencode(sorted(query_items))
+    return f"{path}?{query}" if query else path
+
+
+def make_etag(body):
+    """ETag forte: o conteúdo é idêntico byte a byte sempre que o ETag for igual"""
+    return '"' + hashlib.sha1(body).hexdigest()[:32] + '"'
+
+
+def encoded_etag(etag, encoding):
+    """ETag de uma versão comprimida: bytes diferentes pedem um ETag diferente"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def etag_matches(if_none_match, etag):
+    """Verifica o header If-None-Match (lista de ETags ou *) contra o ETag atual.
+
+    Aceita o ETag de qualquer versão comprimida do mesmo corpo, já que o
+    conteúdo é o mesmo (o 304 não tem corpo, então a codificação não importa).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca, como pede a RFC 9110 para If-None-Match
+    accepted = {etag} | {encoded_etag(etag, encoding) for encoding in SUPPORTED_ENCODINGS}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in accepted:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Escolhe a codificação do corpo pelo header Accept-Encoding (None = sem compressão)"""
+    if not accept_encoding or not available:
+        return None
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    best = None
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if encoding in available and weight > 0 and (best is None or weight > best[1]):
+            best = (encoding, weight)
+    return best[0] if best else None
+
+
+def compress(body):
+    """Versões comprimidas do corpo, calculadas uma vez quando a resposta é guardada"""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return {}
+    # mtime=0: o mesmo corpo gera sempre os mesmos bytes
+    encodings = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return encodings
+
+
+def cache_control(max_age, stale_while_revalidate=0):
+    """Valor do header Cache-Control para uma rota de leitura"""
+    if max_age <= 0:
+        # O cliente sempre revalida (com If-None-Match), mas pode reaproveitar o corpo
+        return "no-cache"
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+class ResponseCache:
+    """Cache das respostas já serializadas das rotas de leitura.
+
+    Guarda os bytes do corpo, o ETag e as versões gzip/brotli por requisição
+    canônica, então um hit não remonta o payload, não chama o jsonify e não
+    comprime nada: custa uma busca no dicionário. Usa o mesmo TTLCache (LRU
+    limitado por entradas e bytes) do cache de dados do RAWG; o limite de bytes
+    inclui as versões comprimidas.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=32 * 1024 * 1024):
+        self._cache = TTLCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        # Não conta como hit/miss nem mexe na ordem do LRU
+        return key in self._cache
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def put(self, key, body, ttl, max_age=None):
+        """Guarda o corpo serializado e retorna o CachedResponse (com o ETag e as versões comprimidas)"""
+        cached = CachedResponse(body, make_etag(body), compress(body), max_age)
+        if ttl > 0:
+            self._cache.set(key, cached, ttl=ttl)
+        return cached
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,243 @@
+import logging
+import os
+import queue
+import atexit
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    review TEXT NOT NULL,
+    helpful INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_game ON reviews (game_id, id DESC);
+
+CREATE TABLE IF NOT EXISTS review_aggregates (
+    game_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    r1 INTEGER NOT NULL DEFAULT 0,
+    r2 INTEGER NOT NULL DEFAULT 0,
+    r3 INTEGER NOT NULL DEFAULT 0,
+    r4 INTEGER NOT NULL DEFAULT 0,
+    r5 INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+MIN_RATING = 1
+MAX_RATING = 5
+
+# Um lote que falha por erro transitório (banco travado, disco) é regravado com
+# backoff exponencial até dar certo: o cliente já recebeu 201 por esses reviews
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 30
+# No encerramento do worker, quanto tempo esperar a fila esvaziar
+SHUTDOWN_FLUSH_TIMEOUT = 30
+
+
+class ReviewQueueFull(Exception):
+    """A fila de gravação está cheia; o cliente deve tentar novamente mais tarde"""
+
+
+class ReviewStore:
+    """Reviews de usuários em SQLite (modo WAL) com gravação em lote (write-behind).
+
+    `submit` só coloca o review em uma fila em memória; uma thread grava os reviews
+    pendentes em lotes, cada lote em uma única transação, atualizando também a linha
+    de agregados do jogo (quantidade, soma e histograma das notas). Assim a nota
+    média de um jogo é uma leitura O(1) e os leitores nunca esperam pelos escritores.
+    """
+
+    def __init__(self, path, batch_size=200, flush_interval=0.2, max_pending=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._local = threading.local()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.batches = 0
+        self.rejected = 0
+        self.retries = 0
+        self.failed = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+        self._writer = threading.Thread(target=self._write_loop, name="review-writer", daemon=True)
+        self._writer.start()
+        # Grava o que ainda estiver na fila quando o worker for encerrado
+        atexit.register(self.flush, SHUTDOWN_FLUSH_TIMEOUT)
+
+    def _connect(self):
+        # Conexões SQLite não devem ser compartilhadas entre threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, game_id, username, rating, review):
+        """Enfileira um review para gravação e retorna como ele será salvo.
+
+        O id só existe depois que o lote é gravado, então o item retornado não o traz.
+        """
+        item = {
+            "game_id": game_id,
+            "username": username,
+            "rating": rating,
+            "review": review,
+            "helpful": 0,
+            "date": datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        }
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.rejected += 1
+            raise ReviewQueueFull()
+        return item
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Junta o que chegar durante a janela de flush, até o tamanho do lote
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_with_retry(self, batch):
+        """Grava o lote sem perder reviews já aceitos.
+
+        Erros operacionais (banco travado, disco cheio ou com falha) são
+        repetidos com backoff até a gravação passar; enquanto isso a fila enche
+        e o submit passa a recusar novos reviews (ReviewQueueFull). Um erro que
+        repetir não resolve (ex.: restrição violada) grava o lote um a um, para
+        só o review com problema ficar de fora.
+        """
+        attempt = 0
+        while True:
+            try:
+                self._write(batch)
+                return
+            except sqlite3.OperationalError as e:
+                attempt += 1
+                self.retries += 1
+                delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt - 1))
+                logger.warning("Failed to write reviews, retrying",
+                               extra={"reviews": len(batch), "attempt": attempt, "retry_in": delay, "error": str(e)})
+                time.sleep(delay)
+            except sqlite3.Error as e:
+                if len(batch) > 1:
+                    for item in batch:
+                        self._write_with_retry([item])
+                    return
+                self.failed += 1
+                logger.error("Failed to write review", extra={
+                    "game_id": batch[0]["game_id"], "username": batch[0]["username"], "error": str(e)
+                })
+                return
+
+    def _write(self, batch):
+        aggregates = {}
+        for item in batch:
+            agg = aggregates.setdefault(item["game_id"], [0, 0, 0, 0, 0, 0, 0])
+            agg[0] += 1
+            agg[1] += item["rating"]
+            agg[1 + item["rating"]] += 1
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO reviews (game_id, username, rating, review, helpful, created_at) "
+                "VALUES (:game_id, :username, :rating, :review, :helpful, :date)",
+                batch
+            )
+            conn.executemany(
+                "INSERT INTO review_aggregates (game_id, count, rating_sum, r1, r2, r3, r4, r5) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (game_id) DO UPDATE SET "
+                "count = count + excluded.count, rating_sum = rating_sum + excluded.rating_sum, "
+                "r1 = r1 + excluded.r1, r2 = r2 + excluded.r2, r3 = r3 + excluded.r3, "
+                "r4 = r4 + excluded.r4, r5 = r5 + excluded.r5",
+                [(game_id, *agg) for game_id, agg in aggregates.items()]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.written += len(batch)
+        self.batches += 1
+
+    def flush(self, timeout=None):
+        """Espera até que todos os reviews enfileirados tenham sido gravados.
+
+        Com `timeout`, desiste depois de tantos segundos; retorna se a fila esvaziou.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.error("Reviews still pending at shutdown", extra={"reviews": self._queue.unfinished_tasks})
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def get_aggregate(self, game_id):
+        """Quantidade, média e histograma das notas de um jogo (uma única linha)"""
+        row = self._connect().execute(
+            "SELECT count, rating_sum, r1, r2, r3, r4, r5 FROM review_aggregates WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        count, rating_sum, *histogram = row or (0, 0, 0, 0, 0, 0, 0)
+        return {
+            "average": round(rating_sum / count, 1) if count else 0,
+            "total": count,
+            "histogram": {str(rating): histogram[rating - 1] for rating in range(MIN_RATING, MAX_RATING + 1)}
+        }
+
+    def list_reviews(self, game_id, page=1, page_size=10):
+        """Reviews de um jogo, do mais recente para o mais antigo"""
+        rows = self._connect().execute(
+            "SELECT id, username, rating, review, created_at, helpful FROM reviews "
+            "WHERE game_id = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (game_id, page_size, (page - 1) * page_size)
+        ).fetchall()
+        return [
+            {"id": row[0], "username": row[1], "rating": row[2], "review": row[3], "date": row[4], "helpful": row[5]}
+            for row in rows
+        ]
+
+    def stats(self):
+        return {
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "failed": self.failed
+        }
@@ -0,0 +1,153 @@
+import math
+import heapq
+import bisect
+import threading
+
+from catalog import fold
+
+
+def _trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+SUGGESTION_FIELDS = ("id", "name", "background_image", "rating", "released", "genres")
+
+def suggestion(game):
+    """Dados exibidos no dropdown de busca, a partir de um registro Game"""
+    return game.to_dict(SUGGESTION_FIELDS)
+
+
+class _Doc:
+    __slots__ = ("id", "name", "folded", "tokens", "grams", "popularity", "payload")
+
+    def __init__(self, game_id, name, popularity, payload):
+        self.id = game_id
+        self.name = name
+        self.folded = fold(name)
+        self.tokens = self.folded.split()
+        self.grams = _trigrams(self.folded)
+        self.popularity = popularity
+        self.payload = payload
+
+
+class NameIndex:
+    """Índice de nomes de jogos em memória para autocomplete.
+
+    Combina um índice de prefixos (lista ordenada de tokens + bisect) com um índice
+    invertido de trigramas para tolerar erros de digitação. Nomes e consultas são
+    normalizados sem acentos e sem diferença de maiúsculas. O ranking pondera a
+    qualidade do casamento pela popularidade do jogo (campo `added` do RAWG).
+    """
+
+    # Similaridade mínima (Dice sobre trigramas) para aceitar um casamento aproximado
+    FUZZY_THRESHOLD = 0.4
+    POPULARITY_WEIGHT = 0.15
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}
+        self._tokens = []        # tokens únicos, ordenados, para busca por prefixo
+        self._token_ids = {}     # token -> ids dos jogos
+        self._gram_ids = {}      # trigrama -> ids dos jogos
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, game_id, name, popularity=0, payload=None):
+        """Insere ou atualiza um jogo no índice"""
+        if not game_id or not name:
+            return
+        doc = _Doc(game_id, name, popularity or 0, payload or {"id": game_id, "name": name})
+        with self._lock:
+            old = self._docs.get(game_id)
+            if old is not None:
+                if old.folded == doc.folded:
+                    # Mesmo nome: só atualiza popularidade e dados exibidos
+                    old.popularity = doc.popularity
+                    old.payload = doc.payload
+                    return
+                self._unindex(old)
+            self._docs[game_id] = doc
+            for token in doc.tokens:
+                ids = self._token_ids.get(token)
+                if ids is None:
+                    ids = self._token_ids[token] = set()
+                    bisect.insort(self._tokens, token)
+                ids.add(game_id)
+            for gram in doc.grams:
+                self._gram_ids.setdefault(gram, set()).add(game_id)
+
+    def add_games(self, games):
+        """Adiciona registros Game (da listagem do RAWG ou do catálogo)"""
+        for game in games:
+            self.add(game.id, game.name, game.added, suggestion(game))
+
+    def _unindex(self, doc):
+        for token in doc.tokens:
+            ids = self._token_ids.get(token)
+            if ids is not None:
+                ids.discard(doc.id)
+                if not ids:
+                    del self._token_ids[token]
+                    index = bisect.bisect_left(self._tokens, token)
+                    if index < len(self._tokens) and self._tokens[index] == token:
+                        del self._tokens[index]
+        for gram in doc.grams:
+            ids = self._gram_ids.get(gram)
+            if ids is not None:
+                ids.discard(doc.id)
+                if not ids:
+                    del self._gram_ids[gram]
+
+    def _prefix_ids(self, prefix):
+        ids = set()
+        index = bisect.bisect_left(self._tokens, prefix)
+        while index < len(self._tokens) and self._tokens[index].startswith(prefix):
+            ids |= self._token_ids[self._tokens[index]]
+            index += 1
+        return ids
+
+    def search(self, query, limit=8):
+        """Retorna os `limit` melhores jogos para o texto digitado (payloads, em ordem)"""
+        folded = fold(query)
+        if not folded:
+            return []
+        tokens = folded.split()
+
+        with self._lock:
+            scores = {}
+
+            # 1) Casamento por prefixo: todos os tokens da consulta são prefixo de algum token do nome
+            candidates = None
+            for token in tokens:
+                ids = self._prefix_ids(token)
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+            for game_id in candidates or ():
+                doc = self._docs[game_id]
+                scores[game_id] = 3.0 if doc.folded.startswith(folded) else 2.0
+
+            # 2) Casamento aproximado por trigramas, para erros de digitação
+            if len(scores) < limit and len(folded) >= 3:
+                query_grams = _trigrams(folded)
+                shared = {}
+                for gram in query_grams:
+                    for game_id in self._gram_ids.get(gram, ()):
+                        shared[game_id] = shared.get(game_id, 0) + 1
+                for game_id, count in shared.items():
+                    if game_id in scores:
+                        continue
+                    doc = self._docs[game_id]
+                    # Compara com o início do nome, do tamanho da consulta, para não punir nomes longos
+                    similarity = 2 * count / (len(query_grams) + min(len(doc.grams), len(query_grams) + 2))
+                    if similarity >= self.FUZZY_THRESHOLD:
+                        scores[game_id] = similarity
+
+            ranked = heapq.nlargest(
+                limit,
+                scores.items(),
+                key=lambda item: item[1] * (1 + self.POPULARITY_WEIGHT * math.log1p(self._docs[item[0]].popularity))
+            )
+            return [self._docs[game_id].payload for game_id, _ in ranked]
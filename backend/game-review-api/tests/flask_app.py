@@ -0,0 +1,37 @@
+"""App Flask (main.py) configurado para os testes: sem rede e sem threads de fundo.
+
+Os dados ficam em um diretório temporário e o catálogo local é preenchido com as
+páginas gravadas em fixtures/rawg, então as listagens não chamam o RAWG. As
+variáveis de ambiente precisam estar definidas antes do import de main.
+"""
+import os
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+TEST_ENV = {
+    "RAWG_API_KEY": "test",
+    "RAWG_BASE_URL": "http://127.0.0.1:9/api",  # porta fechada: nada sai para a rede
+    "RAWG_MAX_RETRIES": "0",
+    "DATA_DIR": tempfile.mkdtemp(prefix="game-review-tests-"),
+    "CATALOG_MIN_GAMES": "1",
+    "RATELIMIT_ENABLED": "0",
+    "WARMUP_PATHS": "",
+    "RANKED_LISTS_REFRESH_INTERVAL": "0",
+    "NEWS_REFRESH_INTERVAL": "0",
+    "NAME_INDEX_REFRESH_INTERVAL": "0",
+    "LOG_LEVEL": "ERROR"
+}
+
+
+def load_main():
+    """Importa main.py uma única vez, com o catálogo sincronizado das fixtures"""
+    if "main" not in sys.modules:
+        os.environ.update(TEST_ENV)
+        import main
+        from catalog import RecordedFetcher, sync_catalog
+        sync_catalog(main.catalog, RecordedFetcher(os.path.join(ROOT_DIR, "fixtures", "rawg")))
+    return sys.modules["main"]
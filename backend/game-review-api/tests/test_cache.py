@@ -0,0 +1,64 @@
+"""Testes do tamanho estimado das entradas do cache (cache.approx_size).
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+import json
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from cache import TTLCache, approx_size  # noqa: E402
+from games import project_page, project_details  # noqa: E402
+
+
+def rawg_page(count=40):
+    """Página da listagem de games no formato do RAWG, com os campos que a projeção usa"""
+    return {
+        "count": 10000,
+        "next": "https://api.rawg.io/api/games?page=2",
+        "previous": None,
+        "results": [
+            {
+                "id": 1000 + i,
+                "slug": f"game-number-{i}",
+                "name": f"Game Number {i}: The Sequel",
+                "released": "2021-06-15",
+                "rating": 4.21,
+                "metacritic": 85,
+                "added": 15000 + i,
+                "playtime": 20,
+                "background_image": f"https://media.rawg.io/media/games/{i:03d}/{i:03d}a1b2c3d4e5f6a7b8c9d0.jpg",
+                "genres": [{"id": 4, "name": "Action"}, {"id": 5, "name": f"Genre {i}"}],
+                "platforms": [{"platform": {"id": 4, "name": "PC"}}, {"platform": {"id": i, "name": f"Console {i}"}}]
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def test_projected_page_is_sized_close_to_its_footprint():
+    page = project_page(rawg_page())
+    # Piso: as strings guardadas (nomes, slugs, URLs das imagens) já somam isto
+    stored_text = sum(len(game.name) + len(game.slug) + len(game.background_image) for game in page.games)
+    size = approx_size(page)
+    assert size > stored_text
+    # Da mesma ordem do JSON de que a página foi projetada, não dos 56 bytes do objeto GamePage
+    assert size > len(json.dumps([game.to_dict() for game in page.games])) // 2
+    assert size < 10 * len(json.dumps(rawg_page()))
+
+
+def test_details_size_counts_the_description():
+    details = project_details({"id": 1, "name": "Long", "description_raw": "x" * 50000})
+    assert approx_size(details) > 50000
+
+
+def test_max_bytes_bounds_projected_pages():
+    # 10 páginas de 40 jogos passam de 100 KB: o limite tem que descartar as mais antigas
+    cache = TTLCache(max_entries=1000, max_bytes=100 * 1024)
+    for page in range(10):
+        cache.set(f"games?page={page}", project_page(rawg_page()))
+    assert len(cache) < 10
+    assert cache.stats()["bytes"] <= 100 * 1024
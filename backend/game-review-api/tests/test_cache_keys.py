@@ -0,0 +1,69 @@
+"""Testes da forma canônica dos parâmetros e das páginas que cobrem outras (cache_keys.py).
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from cache_keys import canonical_params, covering_pages  # noqa: E402
+from games import Game, GamePage  # noqa: E402
+
+
+@pytest.mark.parametrize("endpoint, params, expected", [
+    # Ordem dos parâmetros e das listas não importa
+    ("games", {"platforms": "4,1", "genres": "rpg,action"}, {"genres": "action,rpg", "platforms": "1,4"}),
+    ("games", {"genres": "action,rpg", "platforms": "1,4"}, {"genres": "action,rpg", "platforms": "1,4"}),
+    # Repetidos, maiúsculas e espaços
+    ("games", {"genres": "Action, action ,RPG,"}, {"genres": "action,rpg"}),
+    ("games", {"search": "  The   Witcher "}, {"search": "the witcher"}),
+    # Números como int; iguais ao padrão do RAWG saem da chave
+    ("games", {"page": "1", "page_size": "20", "ordering": "-added"}, {"ordering": "-added"}),
+    ("games", {"page": "2", "page_size": 40}, {"page": 2, "page_size": 40}),
+    # Vazios e None saem
+    ("games", {"search": "  ", "genres": None, "ordering": ""}, {}),
+    # Fora da listagem de games os padrões continuam na chave
+    ("genres", {"page_size": 20, "page": 1}, {"page_size": 20, "page": 1}),
+])
+def test_canonical_params(endpoint, params, expected):
+    assert canonical_params(endpoint, params) == expected
+
+
+def test_equivalent_queries_share_one_key():
+    variants = [
+        {"genres": "rpg,action", "page": 1, "search": "zelda"},
+        {"search": " Zelda", "genres": "action,RPG,rpg"},
+        {"page_size": "20", "genres": "action, rpg", "search": "ZELDA "},
+    ]
+    assert len({tuple(sorted(canonical_params("games", v).items())) for v in variants}) == 1
+
+
+@pytest.mark.parametrize("params, expected", [
+    # Dentro da primeira página de 40 (e da primeira de 20)
+    ({"page_size": 8}, [({"page_size": 40}, 0), ({}, 0)]),
+    # 16..24 cabe na página 1 de 40, mas atravessa a fronteira das páginas de 20
+    ({"page": 3, "page_size": 8}, [({"page_size": 40}, 16)]),
+    # 40..48: começa exatamente na fronteira, página 2 de 40 e página 3 de 20
+    ({"page": 6, "page_size": 8}, [({"page": 2, "page_size": 40}, 0), ({"page": 3}, 0)]),
+    # 36..48 atravessa a fronteira de 40 (e a de 20): nenhuma página sozinha cobre
+    ({"page": 4, "page_size": 12}, []),
+    # Do tamanho da maior página: nada maior a reaproveitar
+    ({"page": 2, "page_size": 40}, []),
+])
+def test_covering_pages(params, expected):
+    assert covering_pages(params) == expected
+
+
+def test_covering_slice_matches_the_requested_window():
+    games = tuple(Game(i, f"game-{i}", f"Game {i}", None, None, None, 0, None, None, (), ()) for i in range(40, 80))
+    covering = GamePage(500, True, True, games)  # página 2 de 40: itens 40..80
+    [(params, offset)] = [c for c in covering_pages({"page": 9, "page_size": 6}) if c[0].get("page_size") == 40]
+    assert params == {"page": 2, "page_size": 40}
+    window = covering.slice(offset, 6)
+    assert [game.id for game in window.games] == list(range(48, 54))
+    assert window.has_previous and window.has_next
@@ -0,0 +1,83 @@
+"""Testes do catálogo local (catalog.py): sincronização com páginas gravadas e listagens.
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from catalog import GameCatalog, RecordedFetcher, sync_catalog  # noqa: E402
+
+# Duas páginas de 8 jogos da listagem do RAWG (count = 16)
+FIXTURES_DIR = os.path.join(os.path.dirname(TESTS_DIR), "fixtures", "rawg")
+FIXTURE_TOTAL = 16
+
+
+def synced_catalog(tmp_path):
+    catalog = GameCatalog(str(tmp_path / "catalog.sqlite3"))
+    sync_catalog(catalog, RecordedFetcher(FIXTURES_DIR))
+    return catalog
+
+
+def test_sync_upserts_every_fixture_game(tmp_path):
+    catalog = GameCatalog(str(tmp_path / "catalog.sqlite3"))
+    result = sync_catalog(catalog, RecordedFetcher(FIXTURES_DIR))
+    assert result == {"pages": 2, "games": FIXTURE_TOTAL, "total": FIXTURE_TOTAL}
+    # A página 2 não tem "next": o preenchimento inicial terminou
+    assert catalog.get_state("backfill_next_page") == "0"
+    assert catalog.get_state("backfill_total") == str(FIXTURE_TOTAL)
+    assert catalog.get_state("updated_watermark")
+
+
+def test_second_sync_is_idempotent(tmp_path):
+    catalog = synced_catalog(tmp_path)
+    before = sorted((game.id, game.name, game.added) for game in catalog.iter_games())
+    result = sync_catalog(catalog, RecordedFetcher(FIXTURES_DIR))
+    # A segunda execução só relê os atualizados (-updated) e regrava os mesmos jogos
+    assert result["total"] == FIXTURE_TOTAL
+    assert sorted((game.id, game.name, game.added) for game in catalog.iter_games()) == before
+
+
+def test_listing_pages_follow_the_ordering(tmp_path):
+    catalog = synced_catalog(tmp_path)
+    first = catalog.listing({"ordering": "-added", "page": 1, "page_size": 5})
+    second = catalog.listing({"ordering": "-added", "page": 2, "page_size": 5})
+    assert [game.id for game in first.games] == [3498, 3328, 4200, 5286, 4291]
+    assert [game.id for game in second.games] == [5679, 12020, 4062, 58175, 3939]
+    assert first.count == FIXTURE_TOTAL and first.has_next and not first.has_previous
+    assert second.has_previous
+
+    last = catalog.listing({"ordering": "-added", "page": 4, "page_size": 5})
+    assert [game.id for game in last.games] == [958412]
+    assert not last.has_next
+    # Página além do que o catálogo tem
+    assert catalog.listing({"ordering": "-added", "page": 5, "page_size": 5}) is None
+
+
+def test_listing_filters_locally(tmp_path):
+    catalog = synced_catalog(tmp_path)
+    strategy = catalog.listing({"genres": "strategy", "page": 1, "page_size": 20})
+    assert [game.id for game in strategy.games] == [958412]
+    recent = catalog.listing({"ordering": "-released", "dates": "2024-01-01,2025-12-31", "page": 1, "page_size": 20})
+    assert [game.id for game in recent.games] == [958412, 963218, 846303]
+
+
+def test_listing_returns_none_for_what_it_cannot_answer(tmp_path):
+    catalog = synced_catalog(tmp_path)
+    assert catalog.listing({"tags": "multiplayer", "page": 1, "page_size": 20}) is None
+    assert catalog.listing({"ordering": "-updated", "page": 1, "page_size": 20}) is None
+    assert catalog.listing({"search": "no such game", "page": 1, "page_size": 20}) is None
+
+
+def test_partial_backfill_only_answers_the_unfiltered_prefix(tmp_path):
+    catalog = GameCatalog(str(tmp_path / "catalog.sqlite3"))
+    sync_catalog(catalog, RecordedFetcher(FIXTURES_DIR), max_pages=1)
+    assert catalog.get_state("backfill_next_page") == "2"
+    # Enquanto o preenchimento anda, total e filtros não saem das poucas linhas locais
+    assert catalog.listing({"genres": "action", "page": 1, "page_size": 5}) is None
+    assert catalog.listing({"ordering": "-rating", "page": 1, "page_size": 5}) is None
+    page = catalog.listing({"ordering": "-added", "page": 1, "page_size": 5})
+    assert page.count == FIXTURE_TOTAL
@@ -0,0 +1,32 @@
+"""Testes de /api/home: cada seção é a primeira página da rota que ela substitui.
+
+Uso:
+    python -m pytest tests
+"""
+from flask_app import load_main
+
+main = load_main()
+
+
+def ids(games):
+    return [game["id"] for game in games]
+
+
+def test_home_sections_match_the_old_endpoints():
+    client = main.app.test_client()
+    home = client.get("/api/home").get_json()
+    assert home["status"] == "success"
+    assert home["failed"] == []
+
+    popular = client.get("/api/games?ordering=-added&page_size=20").get_json()
+    assert home["popular"] == popular["games"]
+
+    recent = client.get("/api/games/recent?page_size=20").get_json()
+    assert ids(home["recent"]) == ids(recent["games"])
+
+
+def test_home_recent_has_no_future_or_undated_games():
+    home = main.app.test_client().get("/api/home").get_json()
+    start, end = main.recent_dates()
+    assert home["recent"]
+    assert all(game["released"] and start <= game["released"] <= end for game in home["recent"])
@@ -0,0 +1,182 @@
+"""Testes da ingestão de notícias (news): parsing RSS/Atom, dedupe, GET condicional e feeds hostis.
+
+Uso:
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+import shutil
+from xml.etree.ElementTree import ParseError
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from defusedxml import DefusedXmlException  # noqa: E402
+
+import news  # noqa: E402
+from news import (  # noqa: E402
+    FeedSource, FetchResult, FeedTooLarge, HttpFeedFetcher, NewsStore, RecordedFeedFetcher,
+    ingest_feed, ingest_feeds, iter_feed_items
+)
+
+FIXTURES_DIR = os.path.join(TESTS_DIR, "..", "fixtures", "news")
+
+# Os mesmos feeds de DEFAULT_NEWS_FEEDS, com os nomes dos arquivos gravados em fixtures/news
+FEEDS = [
+    FeedSource("IGN", "games", "https://feeds.feedburner.com/ign/all"),
+    FeedSource("The Verge", "games", "https://www.theverge.com/rss/games/index.xml"),
+    FeedSource("Nintendo Life", "consoles", "https://www.nintendolife.com/feeds/latest"),
+    FeedSource("Push Square", "consoles", "https://www.pushsquare.com/feeds/latest"),
+    FeedSource("Pure Xbox", "consoles", "https://www.purexbox.com/feeds/latest"),
+]
+
+HOSTILE_FEED = FeedSource("Hostile", "games", "https://hostile.example.com/feed")
+
+BILLION_LAUGHS = b"""<?xml version="1.0"?>
+<!DOCTYPE rss [
+  <!ENTITY lol "lol">
+  <!ENTITY lol2 "&lol;&lol;&lol;&lol;&lol;&lol;&lol;&lol;&lol;&lol;">
+  <!ENTITY lol3 "&lol2;&lol2;&lol2;&lol2;&lol2;&lol2;&lol2;&lol2;&lol2;&lol2;">
+]>
+<rss version="2.0"><channel><item><title>&lol3;</title><link>https://x.example.com/a</link></item></channel></rss>
+"""
+
+
+def fixture_items(name, category="games"):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as stream:
+        return list(iter_feed_items(stream, category))
+
+
+def body_fetcher(body):
+    """Fetcher que sempre responde 200 com o corpo dado"""
+    def fetch(feed, etag=None, last_modified=None):
+        return FetchResult(200, io.BytesIO(body), '"hostile"', None)
+    return fetch
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NewsStore(str(tmp_path / "news.db"))
+
+
+def test_rss_items_are_parsed():
+    items = fixture_items("ign.xml")
+    # O quarto <item> do feed não tem link e é ignorado
+    assert len(items) == 3
+    assert "Untitled link-less item" not in [item.title for item in items]
+    first = items[0]
+    assert first.title == "Elden Ring: Shadow of the Erdtree Gets a New Story Trailer"
+    assert first.url == "https://www.ign.com/articles/elden-ring-shadow-of-the-erdtree-story-trailer"
+    assert first.image == "https://assets-prd.ignimgs.com/2024/05/21/erdtree-story-trailer.jpg"
+    assert first.published > 0
+    assert "<" not in first.summary and "Shadow of the Erdtree" in first.summary
+    assert all("games" in item.tags for item in items)
+
+
+def test_atom_entries_are_parsed():
+    items = fixture_items("the_verge.xml")
+    assert len(items) == 3
+    for item in items:
+        assert item.title and item.url.startswith("https://")
+        assert item.published > 0
+        assert "games" in item.tags
+
+
+def test_ingest_stores_every_fixture_feed(store):
+    summary = ingest_feeds(store, FEEDS, RecordedFeedFetcher(FIXTURES_DIR))
+    assert summary["feeds"] == 5 and summary["failed"] == 0
+    assert summary["new_items"] == store.stats()["items"] > 0
+    items, total = store.page(1, 50)
+    assert total == len(items) == summary["new_items"]
+    # Mais novas primeiro
+    assert [item["date"] for item in items] == sorted((item["date"] for item in items), reverse=True)
+    for feed in FEEDS:
+        etag, _, fetched_at = store.feed_state(feed.url)
+        assert etag and fetched_at > 0
+
+
+def test_unchanged_feeds_answer_304_and_change_nothing(store):
+    fetcher = RecordedFeedFetcher(FIXTURES_DIR)
+    ingest_feeds(store, FEEDS, fetcher)
+    items_before = store.page(1, 50)
+    states_before = [store.feed_state(feed.url)[:2] for feed in FEEDS]
+
+    sent = []
+
+    def recording_fetch(feed, etag=None, last_modified=None):
+        sent.append((feed.url, etag, last_modified))
+        return fetcher(feed, etag, last_modified)
+
+    summary = ingest_feeds(store, FEEDS, recording_fetch)
+    assert summary["not_modified"] == 5 and summary["new_items"] == 0
+    # O GET condicional levou os validadores guardados na ingestão anterior
+    assert sent == [(feed.url,) + state for feed, state in zip(FEEDS, states_before)]
+    assert store.page(1, 50) == items_before
+    assert [store.feed_state(feed.url)[:2] for feed in FEEDS] == states_before
+
+
+def test_reingest_of_a_changed_feed_dedupes(store, tmp_path):
+    directory = tmp_path / "feeds"
+    shutil.copytree(FIXTURES_DIR, directory)
+    fetcher = RecordedFeedFetcher(str(directory))
+    ingest_feeds(store, FEEDS, fetcher)
+    total = store.stats()["items"]
+    old_etag = store.feed_state(FEEDS[0].url)[0]
+
+    # Mesmo conteúdo com outro mtime: o ETag muda, o feed volta com 200, mas nada é novo
+    path = fetcher.path(FEEDS[0])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    status, added = ingest_feed(store, FEEDS[0], fetcher)
+    assert status == 200 and added == 0
+    assert store.stats()["items"] == total
+    new_etag = store.feed_state(FEEDS[0].url)[0]
+    assert new_etag and new_etag != old_etag
+
+
+def test_http_fetcher_sends_the_validators():
+    class Response:
+        status_code = 304
+
+        def close(self):
+            pass
+
+    class Session:
+        def get(self, url, headers, timeout, stream):
+            self.headers = headers
+            return Response()
+
+    session = Session()
+    result = HttpFeedFetcher(session)(FEEDS[0], '"abc"', "Tue, 21 May 2024 15:00:00 GMT")
+    assert session.headers["If-None-Match"] == '"abc"'
+    assert session.headers["If-Modified-Since"] == "Tue, 21 May 2024 15:00:00 GMT"
+    # Um 304 devolve os mesmos validadores, para que o estado do feed não mude
+    assert result == FetchResult(304, None, '"abc"', "Tue, 21 May 2024 15:00:00 GMT")
+
+
+def test_oversized_body_is_rejected(store, monkeypatch):
+    with open(os.path.join(FIXTURES_DIR, "ign.xml"), "rb") as stream:
+        body = stream.read()
+    monkeypatch.setattr(news, "MAX_FEED_BYTES", len(body) // 2)
+    with pytest.raises(FeedTooLarge):
+        ingest_feed(store, HOSTILE_FEED, body_fetcher(body))
+    summary = ingest_feeds(store, [HOSTILE_FEED], body_fetcher(body))
+    assert summary["failed"] == 1 and summary["new_items"] == 0
+    assert store.stats()["items"] == 0
+
+
+@pytest.mark.parametrize("body, error", [
+    (b"<rss><channel><item><title>Broken</title></channel>", ParseError),
+    (BILLION_LAUGHS, DefusedXmlException),
+])
+def test_malformed_or_entity_expanding_xml_is_rejected(store, body, error):
+    with pytest.raises(error):
+        ingest_feed(store, HOSTILE_FEED, body_fetcher(body))
+    summary = ingest_feeds(store, [HOSTILE_FEED], body_fetcher(body))
+    assert summary["failed"] == 1 and summary["new_items"] == 0
+    assert store.stats()["items"] == 0
+    # A tentativa fica registrada no estado do feed, para o intervalo mínimo entre buscas
+    assert store.feed_state(HOSTILE_FEED.url)[2] > 0
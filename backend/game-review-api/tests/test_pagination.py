@@ -0,0 +1,100 @@
+"""Testes dos cursores opacos de /api/games (pagination.py).
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from games import Game, GamePage  # noqa: E402
+from pagination import CursorCodec, InvalidCursor, Assembly, query_fingerprint  # noqa: E402
+from ranked_lists import UPSTREAM_PAGE_SIZE  # noqa: E402
+from flask_app import load_main  # noqa: E402
+
+QUERY = query_fingerprint({"ordering": "-added", "page": 1, "page_size": 30})
+
+
+def game(game_id):
+    return Game(game_id, f"game-{game_id}", f"Game {game_id}", "2024-01-01", 4.0, 80, 1000, 10, None, (), ())
+
+
+def upstream(ids):
+    """Listagem paginada (páginas de 40) sobre a lista de ids, na ordem dada"""
+    def fetch(number):
+        start = (number - 1) * UPSTREAM_PAGE_SIZE
+        games = tuple(game(game_id) for game_id in ids[start:start + UPSTREAM_PAGE_SIZE])
+        return GamePage(len(ids), start + UPSTREAM_PAGE_SIZE < len(ids), number > 1, games)
+    return fetch
+
+
+def assemble(cursor, limit, fetch):
+    assembly = Assembly(cursor, limit)
+    while True:
+        numbers = assembly.pages_needed()
+        if not numbers:
+            return assembly
+        assembly.merge(numbers, [fetch(number) for number in numbers])
+
+
+def test_round_trip_keeps_position_and_seen_ids():
+    codec = CursorCodec("secret")
+    cursor = codec.new(QUERY, offset=30)
+    cursor.delivered, cursor.total = 30, 500
+    for game_id in range(100, 130):
+        cursor.seen.add(game_id)
+
+    decoded = codec.decode(codec.encode(cursor), QUERY)
+    assert (decoded.offset, decoded.delivered, decoded.total) == (30, 30, 500)
+    assert decoded.snapshot_at == cursor.snapshot_at
+    assert all(game_id in decoded.seen for game_id in range(100, 130))
+
+
+def test_tampered_or_foreign_cursors_are_rejected():
+    codec = CursorCodec("secret")
+    token = codec.encode(codec.new(QUERY, offset=30))
+    # Troca um caractere no meio do token (posição, filtro ou assinatura)
+    middle = len(token) // 2
+    tampered = token[:middle] + ("A" if token[middle] != "A" else "B") + token[middle + 1:]
+    with pytest.raises(InvalidCursor):
+        codec.decode(tampered, QUERY)
+    with pytest.raises(InvalidCursor):
+        CursorCodec("another secret").decode(token, QUERY)
+    with pytest.raises(InvalidCursor):
+        codec.decode(token, query_fingerprint({"ordering": "-rating"}))
+    with pytest.raises(InvalidCursor):
+        codec.decode("not a cursor!", QUERY)
+
+
+def test_games_route_answers_400_for_a_cursor_from_another_key():
+    main = load_main()
+    params = main.games_params(MultiDict())
+    token = CursorCodec("another secret").encode(CursorCodec("another secret").new(query_fingerprint(params)))
+    response = main.app.test_client().get(f"/api/games?cursor={token}")
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+
+@pytest.mark.parametrize("change", ["none", "inserted above", "removed above"])
+def test_consecutive_pages_neither_drop_nor_repeat_games(change):
+    codec = CursorCodec("secret")
+    ids = list(range(1, 201))
+    first = assemble(codec.new(QUERY), 30, upstream(ids))
+    token = codec.encode(first.cursor)
+
+    # Entre as duas requisições a ordenação do upstream muda acima da posição do cursor
+    if change == "inserted above":
+        ids = [1000] + ids
+    elif change == "removed above":
+        ids = [game_id for game_id in ids if game_id != 5]
+    second = assemble(codec.decode(token, QUERY), 30, upstream(ids))
+
+    delivered = [g.id for g in first.games] + [g.id for g in second.games]
+    assert len(delivered) == len(set(delivered)) == 60
+    assert [g.id for g in second.games] == list(range(31, 61))
+    assert second.result().has_previous and second.result().has_next
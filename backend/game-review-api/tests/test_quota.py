@@ -0,0 +1,63 @@
+"""Testes do governador de quota do RAWG (quota.py) e da cobrança dos retries.
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from quota import QuotaGovernor, QuotaExceeded, HIGH, LOW  # noqa: E402
+from rawg_client import RawgClient  # noqa: E402
+
+
+def governor(tmp_path, **kwargs):
+    options = dict(daily_budget=1000, monthly_budget=20000, rate=0.001, burst=3,
+                   background_rate=0.001, background_burst=2)
+    options.update(kwargs)
+    return QuotaGovernor(str(tmp_path / "quota.sqlite3"), **options)
+
+
+def test_background_calls_do_not_drain_the_request_bucket(tmp_path):
+    quota = governor(tmp_path)
+    quota.acquire(LOW)
+    quota.acquire(LOW)
+    with pytest.raises(QuotaExceeded) as denied:
+        quota.acquire(LOW)
+    assert "(rate)" in str(denied.value)
+    assert denied.value.retry_after >= 1
+    # O bucket das requisições continua cheio
+    for _ in range(3):
+        quota.acquire(HIGH)
+    with pytest.raises(QuotaExceeded):
+        quota.acquire(HIGH)
+
+
+def test_budget_denial_retries_after_the_period(tmp_path):
+    quota = governor(tmp_path, daily_budget=5)
+    quota.record_calls(5)
+    with pytest.raises(QuotaExceeded) as denied:
+        quota.acquire(HIGH)
+    assert "(budget)" in str(denied.value)
+    assert 1 <= denied.value.retry_after <= 86400
+
+
+def test_each_retry_goes_through_the_quota():
+    # Porta fechada: toda tentativa falha com ConnectionError e seria repetida
+    client = RawgClient("http://127.0.0.1:9", "key", max_retries=3, backoff_base=0, connect_timeout=0.5)
+    charged = []
+
+    def before_retry():
+        charged.append(1)
+        if len(charged) == 2:
+            raise QuotaExceeded("denied", retry_after=3)
+
+    with pytest.raises(QuotaExceeded):
+        client.get("games", before_retry=before_retry)
+    # 1ª tentativa + 1 retry autorizado; o segundo retry foi negado e não aconteceu
+    assert len(charged) == 2
+    assert client.stats()["retries"] == 1
@@ -0,0 +1,60 @@
+"""Testes das listas ranqueadas (ranked_lists.py) compartilhadas entre workers.
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+from cache import TTLCache  # noqa: E402
+from games import Game, GamePage  # noqa: E402
+from ranked_lists import RankedList, RankedLists  # noqa: E402
+
+
+class CountingFetcher:
+    """Listagem falsa de 100 jogos em páginas; conta as páginas buscadas"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, params):
+        self.calls += 1
+        start = (params["page"] - 1) * params["page_size"]
+        games = tuple(Game(i, f"game-{i}", f"Game {i}", "2025-01-01", 4.0, 80, 1000 - i, 10, None, (), ())
+                      for i in range(start, min(start + params["page_size"], 100)))
+        return GamePage(100, start + params["page_size"] < 100, start > 0, games)
+
+
+def worker(store, fetch):
+    lists = RankedLists(fetch, max_pages=5, store=store)
+    lists.define(RankedList("top", lambda: {"ordering": "-added"}, size=50))
+    return lists
+
+
+def test_snapshot_published_by_one_worker_is_read_by_the_others():
+    store = TTLCache()
+    refresher_fetch, reader_fetch = CountingFetcher(), CountingFetcher()
+    refresher = worker(store, refresher_fetch)
+    reader = worker(store, reader_fetch)
+
+    refresher.refresh_all()
+    assert refresher_fetch.calls == 2  # 50 jogos = 2 páginas de 40
+    page = reader.page("top", 2, 20)
+    assert [game.id for game in page.games] == list(range(20, 40))
+    assert reader_fetch.calls == 0
+
+
+def test_refresh_all_skips_lists_newer_than_max_age():
+    store = TTLCache()
+    fetch = CountingFetcher()
+    lists = worker(store, fetch)
+    lists.refresh_all()
+    # Outro worker (ou um reinício) encontra o snapshot publicado ainda novo
+    restarted = worker(store, fetch)
+    restarted.refresh_all(max_age=3600)
+    assert fetch.calls == 2
+    restarted.refresh_all(max_age=0)
+    assert fetch.calls == 4
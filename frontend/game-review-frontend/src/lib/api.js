@@ -70,9 +70,19 @@ export const fetchRecentGames = (page = 1, pageSize = 12) => {
   });
 };
 
+// Função para buscar todas as seções da home em uma única requisição
+export const fetchHome = () => fetchData('home');
+
 // Função para buscar um jogo específico
 export const fetchGameDetails = (gameId) => fetchData(`games/${gameId}`);
 
+// Função para buscar detalhes de vários jogos em uma única requisição
+export const fetchGamesBatch = (gameIds) => fetchData(`games/batch?ids=${gameIds.join(',')}`);
+
+// Função para autocomplete de nomes de jogos
+export const fetchGameSuggestions = (query, limit = 8) =>
+  fetchData(`games/suggest?q=${encodeURIComponent(query)}&limit=${limit}`);
+
 // Função para buscar gêneros
 export const fetchGenres = () => fetchData('games/genres');
 
@@ -12,7 +12,7 @@ function GamesPage() {
   const [loadingRecent, setLoadingRecent] = useState(true)
   const [loadingMore, setLoadingMore] = useState(false)
   const [hasMore, setHasMore] = useState(true)
-  const [currentPage, setCurrentPage] = useState(1)
+  const [nextCursor, setNextCursor] = useState(null)
   const [totalGames, setTotalGames] = useState(0)
   const [filters, setFilters] = useState({
     genre: '',
@@ -87,7 +87,7 @@ function GamesPage() {
     try {
       if (resetGames) {
         setLoading(true)
-        setCurrentPage(1)
+        setNextCursor(null)
       } else {
         setLoadingMore(true)
       }
@@ -95,12 +95,13 @@ function GamesPage() {
       const params = new URLSearchParams()
       let url = `${import.meta.env.VITE_API_BASE_URL}/games`
       
-      params.append('page', resetGames ? '1' : currentPage.toString())
+      // O cursor continua de onde a página anterior parou, sem repetir jogos
+      if (!resetGames && nextCursor) params.append('cursor', nextCursor)
       if (filters.search) params.append('search', filters.search)
       if (filters.genre) params.append('genres', filters.genre)
       if (filters.platform) params.append('platforms', filters.platform)
       params.append('ordering', filters.ordering)
-      params.append('page_size', '20')
+      params.append('page_size', '60')
 
       if (params.toString()) {
         url += `?${params.toString()}`
@@ -112,13 +113,12 @@ function GamesPage() {
       if (data.status === 'success') {
         if (resetGames) {
           setGames(data.games)
-          setCurrentPage(2)
         } else {
           setGames(prev => [...prev, ...data.games])
-          setCurrentPage(prev => prev + 1)
         }
-        setTotalGames(data.total)
-        setHasMore(data.next)
+        setTotalGames(data.pagination.total)
+        setNextCursor(data.pagination.next_cursor)
+        setHasMore(data.pagination.has_next && Boolean(data.pagination.next_cursor))
       }
     } catch (error) {
       console.error(t('games.errors.fetchGames'), error)
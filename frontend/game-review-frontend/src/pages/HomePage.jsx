@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react'
 import { useTranslation } from 'react-i18next'
 import { Link, useNavigate } from 'react-router-dom'
-import { fetchPopularGames, fetchRecentGames, fetchNews, fetchConsoleNews } from '../lib/api'
+import { fetchHome } from '../lib/api'
 import { format } from 'date-fns'
 import { pt, enUS, es } from 'date-fns/locale'
 
@@ -33,16 +33,14 @@ function HomePage() {
       try {
         setLoadingGames(true)
         setLoadingNews(true)
-        const [popularData, recentData, newsData, consoleNewsData] = await Promise.all([
-          fetchPopularGames(1, 20),
-          fetchRecentGames(1, 20),
-          fetchNews(),
-          fetchConsoleNews()
-        ])
-        if (popularData.status === 'success') setPopularGames(popularData.games)
-        if (recentData.status === 'success') setRecentGames(recentData.games)
-        if (newsData.status === 'success') setGamingNews(newsData.news || [])
-        if (consoleNewsData.status === 'ok') setConsoleNews(consoleNewsData.articles || [])
+        // Uma única requisição; seções que falharam no servidor vêm como null
+        const homeData = await fetchHome()
+        if (homeData.status === 'success') {
+          setPopularGames(homeData.popular || [])
+          setRecentGames(homeData.recent || [])
+          setGamingNews(homeData.news || [])
+          setConsoleNews(homeData.consoleNews || [])
+        }
       } catch (error) {
         console.error('Error loading data:', error)
       } finally {
@@ -62,7 +60,7 @@ function HomePage() {
       }
       setSearchLoading(true)
       try {
-        const response = await fetch(`${API_BASE_URL}/games?search=${encodeURIComponent(searchQuery.trim())}&page_size=8`)
+        const response = await fetch(`${API_BASE_URL}/games/suggest?q=${encodeURIComponent(searchQuery.trim())}&limit=8`)
         const data = await response.json()
         if (data.status === 'success') {
           setSearchResults(data.games)
@@ -401,11 +399,11 @@ function HomePage() {
               </button>
               <div ref={newsRef} className="flex space-x-6 overflow-x-auto pb-4 scroll-smooth">
                 {consoleNews.slice(0, 10).map((article, index) => (
-                  <div key={index} className="flex-shrink-0 w-80">
+                  <div key={article.id ?? index} className="flex-shrink-0 w-80">
                     <div className="card-shadow rounded-lg overflow-hidden bg-white hover:transform hover:scale-105 transition-all duration-300">
                       <div className="h-48 bg-gray-200 overflow-hidden">
                         <img 
-                          src={article.urlToImage || 'data:image/svg+xml;base64,...'} 
+                          src={article.image || 'data:image/svg+xml;base64,...'} 
                           alt={article.title}
                           className="w-full h-full object-cover"
                           onError={(e) => { e.target.src = 'data:image/svg+xml;base64,...' }}
@@ -413,13 +411,13 @@ function HomePage() {
                       </div>
                       <div className="p-6">
                         <div className="flex items-center justify-between mb-3">
-                          <span className="text-blue-600 text-sm font-medium">{article.source.name}</span>
-                          <span className="text-gray-500 text-sm">{formatTimeAgo(article.publishedAt)}</span>
+                          <span className="text-blue-600 text-sm font-medium">{article.source}</span>
+                          <span className="text-gray-500 text-sm">{formatTimeAgo(article.date)}</span>
                         </div>
                         <h3 className="font-bold text-lg mb-3 text-gray-800 line-clamp-2">{article.title}</h3>
-                        <p className="text-gray-600 text-sm mb-4 line-clamp-3">{article.description}</p>
+                        <p className="text-gray-600 text-sm mb-4 line-clamp-3">{article.summary}</p>
                         <button
-                          onClick={() => window.open(`https://www.google.com/search?q=${encodeURIComponent(article.title)}`, '_blank')}
+                          onClick={() => window.open(article.url, '_blank', 'noopener,noreferrer')}
                           className="text-blue-600 hover:text-blue-800 font-medium text-sm transition-colors duration-200"
                         >
                           {t('homepage.news.readMore')} →